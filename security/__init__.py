@@ -1,7 +1,89 @@
+from importlib import import_module
+
 from .forwardKinematics import *
 from .workingAreaChecking import *
-from .collisionChecking import *
-from .globalRobotChecking import *
 from .manualCheckingRobotPositon import *
 from .checkAnglesVariation import *
-from .interpolation import *
\ No newline at end of file
+from .interpolation import *
+from .capsules import *
+from .batchCollisionChecking import *
+from .backends import *
+from .solutionSelection import *
+from .sweptVolume import *
+from .singularityChecking import *
+
+# Modules outside of the core checks, imported on first use of one of their names to keep `import security` light
+_LAZY_MODULES = {
+    ".logReplay": (
+        "DEFAULT_LOG_DIR", "DATA_LOG_NAME", "EVENT_LOG_NAME", "EVENT_PATTERN", "RTDE_LOSS_PATTERN", "FLOAT_PATTERN",
+        "TIME_COLUMNS", "JOINT_COLUMNS", "readUrEvents", "iterUrDataLog", "UrLogReplay",
+    ),
+    ".fakeRobot": (
+        "FakeJoint6D", "loadTrajectorySamples", "syntheticSamples", "FakeRobotControl", "FakeISCoin", "runLoadTest",
+    ),
+    ".multiRobotChecking": (
+        "MultiRobotChecking",
+    ),
+    ".scene": (
+        "readStl", "BoxObstacle", "CylinderObstacle", "SphereObstacle", "MeshObstacle", "UrdfObstacle", "OtherRobot",
+        "UniformGrid", "OBSTACLE_TYPES", "Scene",
+    ),
+    ".trajectorySession": (
+        "TrajectoryValidationSession",
+    ),
+    ".hierarchicalChecking": (
+        "HierarchicalCollisionCheck",
+    ),
+    ".tcpSpeedMonitoring": (
+        "TCP_SPEED_LIMIT", "REDUCED_TCP_SPEED_LIMIT", "getTipPositions", "getTipSpeeds", "TcpSpeedMonitor",
+    ),
+    ".collisionGeometry": (
+        "PACKAGE_DIR", "DEFAULT_URDF", "DEFAULT_CACHE_DIR", "meshHash", "meshVolume", "fitCapsule", "capsuleVolume",
+        "writeObj", "CollisionGeometryCache", "generateSimplifiedUrdf", "compareGeometry",
+    ),
+    ".reachabilityMap": (
+        "VOXEL_DTYPE", "ReachabilityMap",
+    ),
+    ".retiming": (
+        "ACCELERATION_LIMITS", "retimeTrajectory", "toModTraj",
+    ),
+    ".shortcutting": (
+        "getJointTravel", "PathShortcutting", "shortcutPath",
+    ),
+    ".motionBudget": (
+        "MotionBudget",
+    ),
+    ".asyncChecking": (
+        "AsyncRobotChecker",
+    ),
+    ".segmentRepair": (
+        "RrtConnectPlanner", "repairTrajectory",
+    ),
+    ".conformance": (
+        "COUNTEREXAMPLES_DIR", "parseBackend", "sampleBoundaryConfigurations", "runConformance",
+        "saveCounterexamples", "loadCounterexamples",
+    ),
+    ".trajectoryPlot": (
+        "JOINT_NAMES", "VIOLATION_COLORS", "DownsamplingPyramid", "lttbIndexes", "getViolationIndexes",
+        "plotTrajectory", "getHemisphereSurface", "plotWorkingArea", "exportFigure",
+    ),
+}
+
+# Modules needing pybullet and the simulator, only imported when one of their names is used
+_LAZY_NAMES = {
+    "RobotCollisionCheck": ".collisionChecking",
+    "GlobalRobotChecking": ".globalRobotChecking",
+}
+_LAZY_NAMES.update({name: module for module, names in _LAZY_MODULES.items() for name in names})
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        value = getattr(import_module(_LAZY_NAMES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
@@ -0,0 +1,188 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import inspect
+import time
+
+import numpy as np
+
+from .backends import getChecker
+from .checkAnglesVariation import SPEED_LIMITS, getBatchVariation
+from .motionBudget import MotionBudget
+from .singularityChecking import getNearSingularities
+from .tcpSpeedMonitoring import TcpSpeedMonitor
+
+""" asyncio entry points of the checks for asynchronous robot controllers: the checks run in a bounded
+executor so that they never block the event loop talking to the robot """
+
+
+class AsyncRobotChecker():
+    def __init__(self, backend: str = "analytic", margin: float = 0.0, scene=None, maxConcurrency: int = 2,
+                 maxPending: int = 64, singularityThresholds: dict = None, tcpSpeedLimit: float = None,
+                 eventDriven: bool = False, logs: bool = False):
+        """
+        Initializes the AsyncRobotChecker class.
+
+        Parameters:
+        - backend: Collision backend (see backends.getChecker). PyBullet runs one simulation per process, so its
+          checks run one at a time.
+        - margin: Minimum clearance in meters.
+        - scene: Scene with the obstacles and other robots of the cell.
+        - maxConcurrency: Number of checks running at the same time in the executor.
+        - maxPending: Number of checks running or waiting for the executor, the next callers wait for a free
+          place (backpressure).
+        - singularityThresholds: Positions closer to a singularity than these thresholds are not valid
+          (see singularityChecking.SINGULARITY_THRESHOLDS), not checked if None.
+        - tcpSpeedLimit: Maximum speed of the pen tip in mm/s in the monitor, not checked if None.
+        - eventDriven: Skip the collision checks of the monitor for the positions proven safe by the last one
+          (see MotionBudget).
+        - logs: Print the logs of the checks.
+        """
+        self.backend = backend
+        self.margin = margin
+        self.logs = logs
+        self.singularityThresholds = singularityThresholds
+        self.tcpSpeedLimit = tcpSpeedLimit
+        self.eventDriven = eventDriven
+        self.scene = scene
+        self.checker = getChecker(backend, logs, margin=margin, scene=scene)
+        self.maxConcurrency = 1 if backend != "analytic" else maxConcurrency
+        self.executor = ThreadPoolExecutor(self.maxConcurrency, thread_name_prefix="asyncChecking")
+        self._pending = asyncio.Semaphore(maxPending)
+
+        # Statistics of the monitor, as in GlobalRobotChecking
+        self.stats = {"ticks": 0, "totalCheckTime": 0.0, "maxCheckTime": 0.0, "overruns": 0,
+                      "fullChecks": 0, "skippedChecks": 0}
+
+    async def _run(self, function, *args):
+        """
+        Runs a blocking function in the executor, waiting first for a free place when maxPending checks are
+        already running or waiting.
+        """
+        async with self._pending:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def _checkBatch(self, configs):
+        configs = np.asarray(configs, dtype=float).reshape(-1, 6)
+        valid, clearances = self.checker.checkBatch(configs)
+        if self.singularityThresholds is not None:
+            valid = valid & ~getNearSingularities(configs, self.singularityThresholds)
+        return valid, clearances
+
+    async def checkBatch(self, configs):
+        """
+        Checks a batch of configurations without blocking the event loop.
+
+        Returns:
+        - (valid, clearances) arrays of shape (N,), see BatchCollisionCheck.checkBatch.
+        """
+        return await self._run(self._checkBatch, configs)
+
+    async def check(self, angles: list):
+        """
+        Returns whether a configuration is valid.
+        """
+        valid, _ = await self.checkBatch([angles])
+        return bool(valid[0])
+
+    async def checkTrajectory(self, angles: list[list[float]], stopAtFirstError: bool = True):
+        """
+        Checks the interpolated segments of a trajectory, see Interpolation.checkSafeTrajectories.
+        """
+        from .interpolation import Interpolation
+
+        interpolation = Interpolation(self.logs, stopAtFirstError, self.backend, self.margin,
+                                      singularityThresholds=self.singularityThresholds)
+        interpolation.checker = self.checker
+        return await self._run(interpolation.checkSafeTrajectories, angles)
+
+    async def monitor(self, getAngles, interval: float, onViolation=None, stopOnViolation: bool = True,
+                      getTimestamp=None):
+        """
+        Checks the position of the robot every interval seconds, as GlobalRobotChecking does in its thread.
+
+        Parameters:
+        - getAngles: Function or coroutine function returning the current joint angles of the robot.
+        - interval: Time between two checks in seconds.
+        - onViolation: Function or coroutine function called with the angles and the list of violated checks
+          ("speed", "tcpSpeed", "singularity", "collision").
+        - stopOnViolation: End the monitor at the first violation.
+        - getTimestamp: Function or coroutine function returning the time in seconds at which the robot acquired
+          the angles just read. The speeds are measured between the times of the reads if None.
+
+        Returns:
+        - The number of violations.
+        """
+        tcpSpeedMonitor = TcpSpeedMonitor(self.tcpSpeedLimit) if self.tcpSpeedLimit is not None else None
+        # The budget covers the scene too, a check skipped within it is still proven safe against the obstacles
+        motionBudget = MotionBudget(self.margin, scene=self.scene) if self.eventDriven else None
+        previous, previousTime = None, None
+        violations = 0
+        while True:
+            start = time.perf_counter()
+            angles = getAngles()
+            if inspect.isawaitable(angles):
+                angles = await angles
+            angles = [float(angle) for angle in angles]
+            timestamp = start
+            if getTimestamp is not None:
+                timestamp = getTimestamp()
+                if inspect.isawaitable(timestamp):
+                    timestamp = await timestamp
+
+            # Speeds over the time actually elapsed between both samples, a late tick is not a fast motion
+            reasons = []
+            isNewSample = previousTime is None or timestamp > previousTime
+            if previous is not None and getBatchVariation([previous, angles], [previousTime, timestamp], SPEED_LIMITS).any():
+                reasons.append("speed")
+            if tcpSpeedMonitor is not None and isNewSample and not tcpSpeedMonitor.update(angles, timestamp)[0]:
+                reasons.append("tcpSpeed")
+            if self.singularityThresholds is not None and getNearSingularities(angles, self.singularityThresholds)[0]:
+                reasons.append("singularity")
+            if motionBudget is not None and motionBudget.isWithinBudget(angles):
+                self.stats["skippedChecks"] += 1
+            else:
+                valid, _ = await self._run(self.checker.checkBatch, [angles])
+                self.stats["fullChecks"] += 1
+                if motionBudget is not None and valid[0]:
+                    motionBudget.reset(angles)
+                elif motionBudget is not None:
+                    motionBudget.invalidate()
+                if not valid[0]:
+                    reasons.append("collision")
+            previous, previousTime = angles, timestamp
+
+            elapsed = time.perf_counter() - start
+            self.stats["ticks"] += 1
+            self.stats["totalCheckTime"] += elapsed
+            self.stats["maxCheckTime"] = max(self.stats["maxCheckTime"], elapsed)
+            if elapsed > interval:
+                self.stats["overruns"] += 1
+
+            if reasons:
+                violations += 1
+                if self.logs:
+                    print(f"Position {angles} not valid: {', '.join(reasons)}")
+                if onViolation is not None:
+                    result = onViolation(angles, reasons)
+                    if inspect.isawaitable(result):
+                        await result
+                if stopOnViolation:
+                    return violations
+            await asyncio.sleep(max(0.0, interval - elapsed))
+
+    def startMonitor(self, getAngles, interval: float, onViolation=None, stopOnViolation: bool = True,
+                     getTimestamp=None):
+        """
+        Starts the monitor as a task of the running event loop, cancel the task to stop it.
+        """
+        return asyncio.get_running_loop().create_task(self.monitor(getAngles, interval, onViolation, stopOnViolation,
+                                                                          getTimestamp))
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
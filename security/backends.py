@@ -0,0 +1,28 @@
+""" Collision checking backends sharing the checkBatch(configs) -> (valid, clearances) interface """
+
+BACKENDS = ["pybullet", "analytic", "hierarchical"]
+
+
+def getChecker(backend: str = "pybullet", logs: bool = False, gui: bool = False, margin: float = 0.0, scene=None):
+    """
+    Creates the collision checker of a backend.
+
+    Parameters:
+    - backend: "pybullet" for the simulation of the robot meshes (RobotCollisionCheck), "analytic" for the
+      vectorized capsule model (BatchCollisionCheck), "hierarchical" for the capsule model with the simulation
+      only where it is not conclusive (HierarchicalCollisionCheck).
+    - logs: Print the logs of the checker.
+    - gui: Show the PyBullet simulation.
+    - margin: Minimum clearance in meters (analytic backend, and scene objects for the pybullet backend).
+    - scene: Scene with the obstacles and other robots of the cell.
+    """
+    if backend == "pybullet":
+        from .collisionChecking import RobotCollisionCheck
+        return RobotCollisionCheck(gui, logs, scene=scene, sceneMargin=margin)
+    if backend == "analytic":
+        from .batchCollisionChecking import BatchCollisionCheck
+        return BatchCollisionCheck(margin=margin, scene=scene, logs=logs)
+    if backend == "hierarchical":
+        from .hierarchicalChecking import HierarchicalCollisionCheck
+        return HierarchicalCollisionCheck(margin=margin, scene=scene, logs=logs, gui=gui)
+    raise ValueError(f"Unknown backend {backend}, available backends: {', '.join(BACKENDS)}")
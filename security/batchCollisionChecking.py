@@ -0,0 +1,117 @@
+import numpy as np
+
+from .capsules import LINK_RADII, TOOL_LENGTH, getCapsules, segmentDistances
+
+""" Analytic collision checking of many configurations at once with the capsule model,
+every configuration and link pair is evaluated in one broadcasted NumPy computation """
+
+# Pairs of non adjacent links that can collide (indexes in capsules.LINK_NAMES). The wrists and the tool
+# are kept apart by the fixed offsets between their axes, as are the second wrist and the base or the forearm
+WRIST_LINKS = [3, 4, 5, 6, 7]
+SEPARATED_PAIRS = [(0, 4), (2, 4)]
+SELF_COLLISION_PAIRS = np.array([(i, j) for i in range(len(LINK_RADII)) for j in range(i + 2, len(LINK_RADII))
+                                 if not (i in WRIST_LINKS and j in WRIST_LINKS) and (i, j) not in SEPARATED_PAIRS])
+# Non adjacent links kept at a distance that does not depend on the joint angles by the offsets between the wrist
+# axes, no motion can bring them into collision
+RIGID_PAIRS = [(2, 4), (3, 5), (4, 6), (4, 7), (5, 7)]
+# Every other non adjacent pair, as in the simulation: the capsules inflated to enclose the meshes overlap on
+# pairs left out of SELF_COLLISION_PAIRS
+COARSE_PAIRS = np.array([(i, j) for i in range(len(LINK_RADII)) for j in range(i + 2, len(LINK_RADII))
+                         if (i, j) not in RIGID_PAIRS])
+# Links checked against the ground, the base stands on it and the pen is allowed to touch it
+GROUND_LINKS = np.arange(1, len(LINK_RADII) - 1)
+
+# Working area of the pen, same box as RobotCollisionCheck.check_working_area
+AREA_BOUNDS = np.array([[-0.62, -0.62, 0.0], [0.62, 0.62, 0.62]])
+
+
+class BatchCollisionCheck():
+    def __init__(self, margin: float = 0.0, chunkSize: int = 4096, groundHeight: float = 0.0, checkArea: bool = True,
+                 scene=None, radii=LINK_RADII, toolLength: float = TOOL_LENGTH, logs: bool = False,
+                 pairs=SELF_COLLISION_PAIRS):
+        """
+        Initializes the BatchCollisionCheck class.
+
+        Parameters:
+        - margin: Minimum clearance in meters between two links, a link and the ground or the scene.
+        - chunkSize: Number of configurations evaluated together, bounds the memory used.
+        - groundHeight: Height of the ground.
+        - checkArea: Check that the pen stays in the working area.
+        - scene: Scene with the obstacles and other robots of the cell.
+        - radii: Radius of each capsule.
+        - toolLength: Length of the pen capsule.
+        - logs: Print the number of invalid configurations of each batch.
+        - pairs: Pairs of links checked against each other, indexes in capsules.LINK_NAMES.
+        """
+        self.margin = margin
+        self.chunkSize = chunkSize
+        self.groundHeight = groundHeight
+        self.checkArea = checkArea
+        self.scene = scene
+        self.radii = np.asarray(radii, dtype=float)
+        self.toolLength = toolLength
+        self.logs = logs
+
+        self.pairs = np.asarray(pairs, dtype=int).reshape(-1, 2)
+        self._pairRadii = self.radii[self.pairs[:, 0]] + self.radii[self.pairs[:, 1]]
+
+    def _checkChunk(self, configs):
+        starts, ends = getCapsules(configs, toolLength=self.toolLength)
+
+        # (N, pairs) distances between the non adjacent links
+        first, second = self.pairs[:, 0], self.pairs[:, 1]
+        selfClearances = segmentDistances(starts[:, first], ends[:, first], starts[:, second], ends[:, second]) - self._pairRadii
+
+        lowest = np.minimum(starts[:, GROUND_LINKS, 2], ends[:, GROUND_LINKS, 2]) - self.radii[GROUND_LINKS]
+        groundClearances = lowest - self.groundHeight
+
+        clearances = np.minimum(selfClearances.min(axis=1), groundClearances.min(axis=1))
+        if self.scene is not None:
+            sceneClearances = self.scene.capsuleClearances(starts, ends, self.radii, self.scene.getMaxDistance(self.margin))
+            clearances = np.minimum(clearances, sceneClearances.min(axis=1))
+
+        valid = clearances > self.margin
+        if self.checkArea:
+            tip = ends[:, -1]
+            valid &= np.all((tip >= AREA_BOUNDS[0]) & (tip <= AREA_BOUNDS[1]), axis=1)
+        return valid, clearances
+
+    def checkBatch(self, configs):
+        """
+        Checks a batch of configurations.
+
+        Parameters:
+        - configs: Array-like of shape (N, 6) with the joint angles.
+
+        Returns:
+        - (valid, clearances) arrays of shape (N,): True where the configuration is safe, and the smallest
+          distance in meters between two links, a link and the ground or the scene (negative when they overlap).
+        """
+        configs = np.asarray(configs, dtype=float).reshape(-1, 6)
+        valid = np.empty(len(configs), dtype=bool)
+        clearances = np.empty(len(configs))
+
+        for start in range(0, len(configs), self.chunkSize):
+            chunk = slice(start, start + self.chunkSize)
+            valid[chunk], clearances[chunk] = self._checkChunk(configs[chunk])
+
+        if self.logs and not valid.all():
+            print(f"{np.count_nonzero(~valid)} of {len(configs)} configurations are not valid")
+        return valid, clearances
+
+    def isValidConfiguration(self, angles):
+        """
+        Same interface as RobotCollisionCheck.isValidConfiguration for a single configuration.
+        """
+        return bool(self.checkBatch([angles])[0][0])
+
+
+if __name__ == "__main__":
+    import time
+
+    checker = BatchCollisionCheck()
+    configs = np.random.default_rng(0).uniform(-np.pi, np.pi, (200000, 6))
+    start = time.perf_counter()
+    valid, clearances = checker.checkBatch(configs)
+    elapsed = time.perf_counter() - start
+    print(f"{len(configs) / elapsed:.0f} configurations/s, {valid.mean():.1%} valid")
@@ -0,0 +1,104 @@
+import numpy as np
+
+from .forwardKinematics import BatchForwardKinematic
+
+""" Approximation of the UR3e links by capsules (segment + radius) placed on the DH frames,
+used for the analytic distance computations """
+
+LINK_NAMES = ["base", "upperArm", "forearm", "wrist1", "wrist2", "wrist3", "gripper", "pen"]
+# Radius of each capsule in meters, chosen to enclose the links of the UR3e and its gripper
+LINK_RADII = np.array([0.065, 0.06, 0.05, 0.04, 0.04, 0.04, 0.045, 0.01])
+# Offset of the upper arm and the forearm along the axis of the shoulder and elbow joints, the links of the
+# UR3e are not on the DH lines
+UPPER_ARM_OFFSET = 0.12
+FOREARM_OFFSET = 0.03
+# Length of the gripper, then of the pen, along the z axis of the last joint
+GRIPPER_LENGTH = 0.1
+TOOL_LENGTH = 0.1
+# Added to the radii when the capsules must enclose the meshes of the PyBullet simulation
+MESH_INFLATION = 0.02
+
+
+def makeBaseTransform(position=(0.0, 0.0, 0.0), yaw: float = 0.0):
+    """
+    Returns the 4x4 transform of a robot base placed at position and rotated by yaw around z.
+    """
+    transform = np.eye(4)
+    transform[:2, :2] = [[np.cos(yaw), -np.sin(yaw)], [np.sin(yaw), np.cos(yaw)]]
+    transform[:3, 3] = position
+    return transform
+
+
+def getCapsules(angles, baseTransform=None, toolLength: float = TOOL_LENGTH):
+    """
+    Computes the capsule segments of a batch of configurations.
+
+    Parameters:
+    - angles: Array-like of shape (N, 6) with the joint angles.
+    - baseTransform: 4x4 transform of the robot base in the world, identity if None.
+    - toolLength: Length of the pen capsule.
+
+    Returns:
+    - (starts, ends) arrays of shape (N, 8, 3) with the end points of each capsule, in LINK_NAMES order.
+    """
+    frames = BatchForwardKinematic(angles).getFrames()
+    joints = frames[:, :, :3, 3]
+    gripper = joints[:, -1] + GRIPPER_LENGTH * frames[:, -1, :3, 2]
+    tip = gripper + toolLength * frames[:, -1, :3, 2]
+
+    starts = np.concatenate((np.zeros((len(joints), 1, 3)), joints, gripper[:, None]), axis=1)
+    ends = np.concatenate((joints, gripper[:, None], tip[:, None]), axis=1)
+
+    # Joints 2 and 3 rotate around the z axis of frame 1 and 2
+    axis = frames[:, 0, :3, 2]
+    starts[:, 1] += UPPER_ARM_OFFSET * axis
+    ends[:, 1] += UPPER_ARM_OFFSET * axis
+    starts[:, 2] += FOREARM_OFFSET * axis
+    ends[:, 2] += FOREARM_OFFSET * axis
+
+    if baseTransform is not None:
+        rotation, translation = baseTransform[:3, :3], baseTransform[:3, 3]
+        starts = starts @ rotation.T + translation
+        ends = ends @ rotation.T + translation
+    return starts, ends
+
+
+def segmentDistances(p0, p1, q0, q1):
+    """
+    Computes the distance between segments [p0, p1] and [q0, q1], broadcasting over the leading dimensions.
+
+    Parameters:
+    - p0, p1, q0, q1: Arrays of shape (..., 3).
+
+    Returns:
+    - An array of shape (...) with the minimum distance between each pair of segments.
+    """
+    d1 = p1 - p0
+    d2 = q1 - q0
+    r = p0 - q0
+    a = np.sum(d1 * d1, axis=-1)
+    e = np.sum(d2 * d2, axis=-1)
+    f = np.sum(d2 * r, axis=-1)
+    c = np.sum(d1 * r, axis=-1)
+    b = np.sum(d1 * d2, axis=-1)
+
+    eps = 1e-12
+    safeA = np.where(a > eps, a, 1.0)
+    safeE = np.where(e > eps, e, 1.0)
+    denom = a * e - b * b
+
+    # General case: closest point on the first segment for the infinite lines (0 when parallel),
+    # then the matching point on the second segment, both clamped to the segments
+    s = np.where(denom > eps, np.clip((b * f - c * e) / np.where(denom > eps, denom, 1.0), 0.0, 1.0), 0.0)
+    t = (b * s + f) / safeE
+    s = np.where(t < 0.0, np.clip(-c / safeA, 0.0, 1.0), np.where(t > 1.0, np.clip((b - c) / safeA, 0.0, 1.0), s))
+    t = np.clip(t, 0.0, 1.0)
+
+    # Degenerate segments reduced to a point
+    firstIsPoint = a <= eps
+    secondIsPoint = e <= eps
+    s = np.where(firstIsPoint, 0.0, np.where(secondIsPoint, np.clip(-c / safeA, 0.0, 1.0), s))
+    t = np.where(secondIsPoint, 0.0, np.where(firstIsPoint, np.clip(f / safeE, 0.0, 1.0), t))
+
+    closest = (p0 + s[..., None] * d1) - (q0 + t[..., None] * d2)
+    return np.sqrt(np.sum(closest * closest, axis=-1))
@@ -1,8 +1,13 @@
+import numpy as np
+
+SPEED_LIMITS = [6.4, 2.4, 6.5,10.15,6.15,10.15] # rad/s this parameter could be lowered --> spped limit 1.15°/s
+
+
 class checkAngleVariation(): 
     def __init__(self, angles:list, holdAngles:list, time):
         self.angles = angles
         self.holdangles = holdAngles
-        self.speedLimits = [6.4, 2.4, 6.5,10.15,6.15,10.15] # rad/s this parameter could be lowered --> spped limit 1.15°/s
+        self.speedLimits = list(SPEED_LIMITS)
         self.deltaT = time # seconds 
     
     def _angleVariation(self):
@@ -24,5 +29,22 @@ class checkAngleVariation():
         return highVariations, self.holdangles
 
 
+def getBatchVariation(angles, timestamps, speedLimits=SPEED_LIMITS):
+    """
+    Vectorized version of checkAngleVariation for a stream of samples.
 
+    Parameters:
+    - angles: Array of shape (N, 6) with the joint angles of each sample.
+    - timestamps: Array of shape (N,) with the time of each sample in seconds.
+    - speedLimits: Speed limit of each joint in rad/s.
 
+    Returns:
+    - A boolean array of shape (N-1, 6), True where the joint moved faster than its limit
+      between sample i and sample i+1.
+    """
+    angles = np.asarray(angles, dtype=float)
+    deltaT = np.diff(np.asarray(timestamps, dtype=float))
+    speeds = np.abs(np.diff(angles, axis=0)) / deltaT[:, None]
+    # Samples sharing the same timestamp carry no speed information
+    speeds[deltaT <= 0] = 0.0
+    return speeds > np.asarray(speedLimits)
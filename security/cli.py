@@ -0,0 +1,210 @@
+import argparse
+from contextlib import redirect_stdout
+import csv
+import io
+import json
+import sys
+import time
+
+import numpy as np
+
+from .backends import BACKENDS
+
+""" Command line validation of trajectories and inverse kinematics solution sets """
+
+CSV_COLUMNS = ["input", "kind", "waypoints", "safe", "unsafe", "time", "error"]
+INPUT_FORMATS = ["json", "npy", "binary"]
+
+
+def getInputFormat(path: str):
+    """
+    Returns the format of an input from its extension: "json" for .json files and stdin, "npy" for .npy files,
+    "binary" otherwise.
+    """
+    if path == "-" or path.endswith(".json"):
+        return "json"
+    return "npy" if path.endswith(".npy") else "binary"
+
+
+def loadInput(path: str, inputFormat: str = None):
+    """
+    Reads a trajectory or a set of inverse kinematics solutions.
+
+    Supported inputs:
+    - JSON: a trajectory file ({"modTraj": [{"positions": [...]}, ...]}), a list of waypoints, or a list with
+      the solutions of each waypoint.
+    - .npy: an array of shape (N, 6) for a trajectory or (N, K, 6) for solution sets.
+    - Any other binary file: little endian float64 values, 6 per waypoint.
+
+    Parameters:
+    - path: Path of the input, "-" for stdin.
+    - inputFormat: "json", "npy" or "binary", from the extension of the path if None (see getInputFormat).
+
+    Returns:
+    - ("trajectory", waypoints) or ("solutions", solutions of each waypoint).
+
+    Raises:
+    - ValueError: When the input is not a list of at least one waypoint of 6 joint angles, or a list of solution
+      sets of 6 joint angles each.
+    """
+    inputFormat = inputFormat or getInputFormat(path)
+    if inputFormat not in INPUT_FORMATS:
+        raise ValueError(f"Unknown input format {inputFormat}, use one of {', '.join(INPUT_FORMATS)}")
+    if path == "-":
+        source = sys.stdin if inputFormat == "json" else io.BytesIO(sys.stdin.buffer.read())
+    else:
+        source = path
+
+    if inputFormat == "json":
+        if path == "-":
+            data = json.load(source)
+        else:
+            with open(path, "r") as file:
+                data = json.load(file)
+    elif inputFormat == "npy":
+        data = np.load(source).tolist()
+    elif path == "-":
+        data = np.frombuffer(source.getvalue(), dtype="<f8").reshape(-1, 6).tolist()
+    else:
+        data = np.fromfile(path, dtype="<f8").reshape(-1, 6).tolist()
+
+    if isinstance(data, dict):
+        data = [point["positions"] for point in data["modTraj"]]
+    if not isinstance(data, list) or not data:
+        raise ValueError("The input must be a non empty list of waypoints")
+    if any(isinstance(waypoint, list) and waypoint and isinstance(waypoint[0], list) for waypoint in data):
+        return "solutions", [_toConfigurations(waypoint, f"Solutions of waypoint {i}") for i, waypoint in enumerate(data)]
+    return "trajectory", _toConfigurations(data, "Trajectory")
+
+
+def _toConfigurations(values, name: str):
+    """
+    Returns the configurations as a list of lists of 6 joint angles, raises ValueError for any other shape.
+    """
+    configs = np.asarray(values, dtype=float)
+    if configs.size == 0:
+        return []
+    if configs.ndim != 2 or configs.shape[1] != 6:
+        raise ValueError(f"{name} must be a list of configurations of 6 joint angles, got shape {configs.shape}")
+    return configs.tolist()
+
+
+def validateTrajectory(angles: list, interpolation):
+    """
+    Returns the indexes of the unsafe segments of a trajectory, [[0, 0]] for an unsafe trajectory of a single waypoint.
+    """
+    if len(angles) == 1:
+        # A single waypoint is checked as a motion that stays in place
+        return [[0, 0]] if interpolation.checkSafeTrajectories(angles * 2) else []
+    result = interpolation.checkSafeTrajectories(angles)
+    if interpolation.stopAtFirstError:
+        return [list(result[0])] if result else []
+    return [list(segment) for segment in result]
+
+
+def _countValidSolutions(solutions: list, backend: str, margin: float, logs: bool):
+    from .manualCheckingRobotPositon import ValidateRobotPosition
+
+    # The logs of the worker processes go to stderr too
+    with redirect_stdout(sys.stderr):
+        validation = ValidateRobotPosition(solutions, logs, False, backend, margin)
+    return [len(line) for line in validation.finalPositions]
+
+
+def validateSolutions(solutions: list, backend: str, margin: float, logs: bool, workers: int = None):
+    """
+    Returns the indexes of the waypoints without any valid solution, and the number of valid solutions of each waypoint.
+
+    With workers, the waypoints are split in one contiguous chunk per worker process, each process having its own
+    checker (and its own simulation with PyBullet).
+    """
+    if workers is None or workers <= 1 or len(solutions) <= 1:
+        counts = _countValidSolutions(solutions, backend, margin, logs)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        bounds = np.linspace(0, len(solutions), min(workers, len(solutions)) + 1).astype(int)
+        chunks = [solutions[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(len(chunks)) as executor:
+            results = executor.map(_countValidSolutions, chunks, [backend] * len(chunks), [margin] * len(chunks),
+                                   [logs] * len(chunks))
+            counts = [count for result in results for count in result]
+    return [i for i, count in enumerate(counts) if count == 0], counts
+
+
+def parseArguments(argv=None):
+    parser = argparse.ArgumentParser(prog="security", description="Validate trajectories and inverse kinematics solution sets.")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="JSON, .npy or float64 binary files, - for stdin")
+    parser.add_argument("--backend", choices=BACKENDS, default="analytic", help="collision checking backend")
+    parser.add_argument("--margin", type=float, default=0.0, help="minimum clearance in meters")
+    parser.add_argument("--workers", type=int, default=None, help="number of workers checking the segments of a trajectory or the waypoints of a solution set")
+    parser.add_argument("--stop-at-first", action="store_true", help="stop at the first unsafe segment of each trajectory, and at the first unsafe input")
+    parser.add_argument("--swept", action="store_true", help="prove segments safe from their swept volume before sampling them")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson", help="format of the results on stdout")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default=None, help="format of the inputs, from their extension by default and json for stdin")
+    parser.add_argument("--logs", action="store_true", help="print the logs of the checks on stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Validates every input and writes one result per input on stdout, and a timing summary on stderr. An input
+    that cannot be read gives a result with its error instead.
+
+    Returns:
+    - 0 when every input is safe, 1 when an input is not safe, 2 when an input cannot be read.
+    """
+    args = parseArguments(argv)
+    from .interpolation import Interpolation
+
+    interpolation = Interpolation(args.logs, args.stop_at_first, args.backend, args.margin, args.workers, args.swept)
+
+    writer = None
+    if args.format == "csv":
+        writer = csv.DictWriter(sys.stdout, fieldnames=CSV_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+
+    start = time.perf_counter()
+    summary = {"inputs": 0, "safe": 0, "unsafe": 0, "errors": 0, "waypoints": 0}
+    for path in args.inputs:
+        inputStart = time.perf_counter()
+        try:
+            kind, data = loadInput(path, args.input_format)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            record = {"input": path, "kind": None, "waypoints": 0, "safe": False, "unsafe": [],
+                      "error": f"{type(error).__name__}: {error}"}
+        else:
+            # The logs of the checks go to stderr, stdout only has the results
+            with redirect_stdout(sys.stderr):
+                if kind == "trajectory":
+                    unsafe = validateTrajectory(data, interpolation)
+                    record = {"input": path, "kind": kind, "waypoints": len(data), "safe": not unsafe, "unsafe": unsafe}
+                else:
+                    unsafe, counts = validateSolutions(data, args.backend, args.margin, args.logs, args.workers)
+                    record = {"input": path, "kind": kind, "waypoints": len(data), "safe": not unsafe, "unsafe": unsafe, "validSolutions": counts}
+        record["time"] = round(time.perf_counter() - inputStart, 6)
+
+        if writer is not None:
+            writer.writerow({**record, "unsafe": json.dumps(record["unsafe"])})
+        else:
+            sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+
+        summary["inputs"] += 1
+        summary["errors" if "error" in record else "safe" if record["safe"] else "unsafe"] += 1
+        summary["waypoints"] += record["waypoints"]
+        if args.stop_at_first and not record["safe"]:
+            break
+    interpolation.close()
+
+    elapsed = time.perf_counter() - start
+    summary["time"] = round(elapsed, 6)
+    summary["waypointsPerSecond"] = round(summary["waypoints"] / elapsed, 1) if elapsed > 0 else None
+    sys.stderr.write(json.dumps(summary) + "\n")
+    if summary["errors"]:
+        return 2
+    return 0 if summary["unsafe"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,20 +9,75 @@ from security.loadUrdf import loadPlane, loadRobot
 
 from .forwardKinematics import ForwardKinematic
 
-import plotly.graph_objects as go
-
-from urbasic import ISCoin, Joint6D
-
 
 
 
 class RobotCollisionCheck :
-    def __init__(self, gui=False, logs=False):
+    def __init__(self, gui=False, logs=False, scene=None, sceneMargin=0.0):
+        """
+        Initializes the RobotCollisionCheck class.
+
+        Parameters:
+        - gui: Show the PyBullet simulation.
+        - logs: Print the logs of the simulator.
+        - scene: Scene with the obstacles and other robots of the cell, loaded in the simulation.
+        - sceneMargin: Minimum distance in meters between the robot and the objects of the scene.
+        """
         self.simu = Simulator(robot_version=RobotVersion.GRIPPER, gui=gui, deltaT=1 / 100, log=logs)
 
         self.logs =logs
         self.gui = gui
 
+        self.scene = scene
+        self.sceneMargin = sceneMargin
+        self.sceneBodies = scene.loadInPybullet() if scene is not None else []
+        self.robotId = self._getRobotBody() if scene is not None else None
+
+    def _getRobotBody(self):
+        """
+        Returns the PyBullet id of the simulated robot, the body with the most joints if the simulator does not expose it.
+        """
+        for attribute in ("robot_id", "robotId", "robot"):
+            if isinstance(getattr(self.simu, attribute, None), int):
+                return getattr(self.simu, attribute)
+        bodies = [p.getBodyUniqueId(i) for i in range(p.getNumBodies())]
+        return max((body for body in bodies if body not in self.sceneBodies), key=p.getNumJoints)
+
+    def close(self):
+        """
+        Removes the scene from the simulation and stops the simulator, when it can be stopped.
+        """
+        for body in self.sceneBodies:
+            p.removeBody(body)
+        self.sceneBodies = []
+        for attribute in ("close", "disconnect", "stop"):
+            if callable(getattr(self.simu, attribute, None)):
+                getattr(self.simu, attribute)()
+                break
+
+    def check_scene(self):
+        """
+        Checks that the robot is not closer than sceneMargin to the obstacles and robots of the scene.
+        Only the objects indexed close to the robot are given to PyBullet.
+        """
+        if self.scene is None:
+            return True
+
+        lower, upper = (np.array(bound) for bound in p.getAABB(self.robotId, -1))
+        for link in range(p.getNumJoints(self.robotId)):
+            linkLower, linkUpper = p.getAABB(self.robotId, link)
+            lower, upper = np.minimum(lower, linkLower), np.maximum(upper, linkUpper)
+
+        bodies = {id(item): body for item, body in zip(self.scene.items, self.sceneBodies)}
+        for item in self.scene.query(lower, upper):
+            if hasattr(item, "updateInPybullet"):
+                item.updateInPybullet(bodies[id(item)])
+            if p.getClosestPoints(self.robotId, bodies[id(item)], self.sceneMargin):
+                if self.logs:
+                    print(f"⚠️ Collision with {item.name}")
+                return False
+        return True
+
     def check_working_area(self):
         x_min = -0.62
         x_max = 0.62
@@ -44,7 +99,17 @@ class RobotCollisionCheck :
         isSafe = self.simu.check_collision()
         isInArea = self.check_working_area()
 
-        return isSafe and isInArea
+        return isSafe and isInArea and self.check_scene()
+
+    def checkBatch(self, configs):
+        """
+        Checks a batch of configurations one after the other in the simulation.
+
+        Returns:
+        - (valid, clearances) arrays, the clearances are not computed by this backend and are NaN.
+        """
+        valid = np.array([self.isValidConfiguration(list(angles)) for angles in np.asarray(configs, dtype=float).reshape(-1, 6)], dtype=bool)
+        return valid, np.full(len(valid), np.nan)
 
     def runSimulation(self, angles):
 
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .scene import readStl
+
+""" Simplified collision geometry of the robot links generated from the STL meshes of the URDF: capsules
+fitted on each mesh and convex decompositions, cached on disk by mesh hash """
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_URDF = os.path.join(PACKAGE_DIR, "urdf", "iscoin_azz.urdf")
+DEFAULT_CACHE_DIR = os.path.join(PACKAGE_DIR, "urdf", "simplified")
+
+
+def meshHash(path: str, scale=(1.0, 1.0, 1.0)):
+    """
+    Returns the hash of the content of a mesh file and of its scale.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        digest.update(file.read())
+    digest.update(np.asarray(scale, dtype=float).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def meshVolume(vertices):
+    """
+    Returns the volume enclosed by a closed triangle mesh, vertices of shape (3 * number of triangles, 3).
+    """
+    triangles = np.asarray(vertices, dtype=float).reshape(-1, 3, 3)
+    return abs(np.einsum("ij,ij->i", triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])).sum()) / 6
+
+
+def fitCapsule(vertices):
+    """
+    Fits a capsule enclosing all the vertices of a mesh, along their principal axis.
+
+    Returns:
+    - A dictionary with the "start" and "end" points of the capsule segment and its "radius".
+    """
+    points = np.unique(np.asarray(vertices, dtype=float).reshape(-1, 3), axis=0)
+    center = points.mean(axis=0)
+    axis = np.linalg.svd(points - center, full_matrices=False)[2][0]
+
+    along = (points - center) @ axis
+    across = np.linalg.norm(points - center - along[:, None] * axis, axis=1)
+    radius = across.max()
+
+    # A point is inside when its projection is within sqrt(radius^2 - across^2) of the segment
+    reach = np.sqrt(np.maximum(radius ** 2 - across ** 2, 0.0))
+    low, high = np.max(along - reach), np.min(along + reach)
+    low, high = min(low, high), max(low, high)
+    return {"start": (center + low * axis).tolist(), "end": (center + high * axis).tolist(), "radius": float(radius)}
+
+
+def capsuleVolume(capsule: dict):
+    length = np.linalg.norm(np.subtract(capsule["end"], capsule["start"]))
+    return np.pi * capsule["radius"] ** 2 * (length + 4 * capsule["radius"] / 3)
+
+
+def writeObj(vertices, path: str):
+    """
+    Writes a triangle mesh, vertices of shape (3 * number of triangles, 3), to an OBJ file.
+    """
+    vertices = np.asarray(vertices, dtype=float).reshape(-1, 3)
+    with open(path, "w") as file:
+        file.writelines(f"v {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in vertices)
+        file.writelines(f"f {i + 1} {i + 2} {i + 3}\n" for i in range(0, len(vertices), 3))
+
+
+class CollisionGeometryCache():
+    def __init__(self, cacheDir: str = DEFAULT_CACHE_DIR):
+        """
+        Initializes the CollisionGeometryCache class.
+
+        Parameters:
+        - cacheDir: Directory of the generated geometry, each file is named by the hash of its mesh.
+        """
+        self.cacheDir = cacheDir
+        os.makedirs(cacheDir, exist_ok=True)
+
+    def getCapsule(self, meshPath: str, scale=(1.0, 1.0, 1.0)):
+        """
+        Returns the capsule fitted on a mesh (see fitCapsule), in the frame of the mesh.
+        """
+        path = os.path.join(self.cacheDir, f"{meshHash(meshPath, scale)}_capsule.json")
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                return json.load(file)
+
+        vertices = readStl(meshPath) * np.asarray(scale, dtype=float)
+        capsule = fitCapsule(vertices)
+        capsule["meshVolume"] = float(meshVolume(vertices))
+        capsule["volumeRatio"] = float(capsuleVolume(capsule) / capsule["meshVolume"]) if capsule["meshVolume"] > 0 else None
+        with open(path, "w") as file:
+            json.dump(capsule, file, indent=4)
+        return capsule
+
+    def getConvexDecomposition(self, meshPath: str, resolution: int = 100000):
+        """
+        Returns the path of an OBJ file with the convex decomposition of a mesh, computed with the V-HACD of PyBullet.
+        """
+        path = os.path.join(self.cacheDir, f"{meshHash(meshPath)}_convex.obj")
+        if not os.path.exists(path):
+            import pybullet as p
+
+            source = os.path.join(self.cacheDir, f"{meshHash(meshPath)}_source.obj")
+            writeObj(readStl(meshPath), source)
+            p.vhacd(source, path, os.path.join(self.cacheDir, "vhacd.log"), resolution=resolution)
+            os.remove(source)
+        return path
+
+
+def _rpyToMatrix(rpy):
+    (cr, cp, cy), (sr, sp, sy) = np.cos(rpy), np.sin(rpy)
+    return np.array([[cy * cp, cy * sp * sr - sy * cr, cy * sp * cr + sy * sr],
+                     [sy * cp, sy * sp * sr + cy * cr, sy * sp * cr - cy * sr],
+                     [-sp, cp * sr, cp * cr]])
+
+
+def _matrixToRpy(matrix):
+    return [float(np.arctan2(matrix[2, 1], matrix[2, 2])), float(np.arcsin(-np.clip(matrix[2, 0], -1.0, 1.0))),
+            float(np.arctan2(matrix[1, 0], matrix[0, 0]))]
+
+
+def _capsuleOrigin(meshOrigin, capsule: dict):
+    """
+    Origin (xyz, rpy) in the link frame of a URDF capsule, which lies along the z axis of its frame.
+    """
+    rotation = _rpyToMatrix([float(value) for value in meshOrigin.get("rpy", "0 0 0").split()]) if meshOrigin is not None else np.eye(3)
+    translation = np.array([float(value) for value in meshOrigin.get("xyz", "0 0 0").split()]) if meshOrigin is not None else np.zeros(3)
+
+    start, end = np.array(capsule["start"]), np.array(capsule["end"])
+    axis = end - start
+    axis = axis / np.linalg.norm(axis) if np.linalg.norm(axis) > 0 else np.array([0.0, 0.0, 1.0])
+    # Rotation bringing z on the axis of the capsule
+    helper = np.array([1.0, 0.0, 0.0]) if abs(axis[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    x = np.cross(helper, axis)
+    x /= np.linalg.norm(x)
+    capsuleRotation = np.column_stack((x, np.cross(axis, x), axis))
+
+    center = rotation @ (0.5 * (start + end)) + translation
+    return center, _matrixToRpy(rotation @ capsuleRotation)
+
+
+def generateSimplifiedUrdf(urdfPath: str = DEFAULT_URDF, mode: str = "capsules", cache: CollisionGeometryCache = None,
+                           outPath: str = None):
+    """
+    Writes a copy of a URDF whose collision meshes are replaced by simplified geometry.
+
+    Parameters:
+    - urdfPath: The original URDF.
+    - mode: "capsules" for one fitted capsule per mesh, "convex" for the convex decomposition of each mesh.
+    - cache: Cache of the generated geometry, the default one if None.
+    - outPath: Path of the generated URDF, next to the original with the mode as suffix if None.
+
+    Returns:
+    - The path of the generated URDF.
+    """
+    if mode not in ("capsules", "convex"):
+        raise ValueError(f"Unknown mode {mode}, available modes: capsules, convex")
+    cache = cache or CollisionGeometryCache()
+    outPath = outPath or urdfPath.replace(".urdf", f"_{mode}.urdf")
+    baseDir = os.path.dirname(os.path.abspath(urdfPath))
+
+    tree = ET.parse(urdfPath)
+    for collision in tree.getroot().iter("collision"):
+        geometry = collision.find("geometry")
+        mesh = geometry.find("mesh") if geometry is not None else None
+        if mesh is None:
+            continue
+        meshPath = os.path.join(baseDir, mesh.get("filename").replace("package://", ""))
+        scale = [float(value) for value in mesh.get("scale", "1 1 1").split()]
+
+        if mode == "convex":
+            mesh.set("filename", os.path.relpath(cache.getConvexDecomposition(meshPath), os.path.dirname(os.path.abspath(outPath))))
+            continue
+
+        capsule = cache.getCapsule(meshPath, scale)
+        center, rpy = _capsuleOrigin(collision.find("origin"), capsule)
+        origin = collision.find("origin")
+        if origin is None:
+            origin = ET.SubElement(collision, "origin")
+        origin.set("xyz", " ".join(f"{value:.6f}" for value in center))
+        origin.set("rpy", " ".join(f"{value:.6f}" for value in rpy))
+        geometry.remove(mesh)
+        length = np.linalg.norm(np.subtract(capsule["end"], capsule["start"]))
+        ET.SubElement(geometry, "capsule", radius=f"{capsule['radius']:.6f}", length=f"{length:.6f}")
+
+    tree.write(outPath)
+    return outPath
+
+
+def _collisionVerdicts(urdfPath: str, configs):
+    import pybullet as p
+
+    client = p.connect(p.DIRECT)
+    try:
+        robot = p.loadURDF(urdfPath, useFixedBase=True, flags=p.URDF_USE_SELF_COLLISION, physicsClientId=client)
+        joints = [j for j in range(p.getNumJoints(robot, physicsClientId=client))
+                  if p.getJointInfo(robot, j, physicsClientId=client)[2] == p.JOINT_REVOLUTE]
+        verdicts = []
+        start = time.perf_counter()
+        for angles in configs:
+            for joint, angle in zip(joints, angles):
+                p.resetJointState(robot, joint, angle, physicsClientId=client)
+            p.performCollisionDetection(physicsClientId=client)
+            verdicts.append(len(p.getContactPoints(robot, robot, physicsClientId=client)) == 0)
+        return np.array(verdicts), (time.perf_counter() - start) / max(1, len(configs))
+    finally:
+        p.disconnect(client)
+
+
+def compareGeometry(urdfPath: str = DEFAULT_URDF, simplifiedPath: str = None, samples: int = 500, seed: int = 0,
+                    cache: CollisionGeometryCache = None):
+    """
+    Compares the self collisions of the original and a simplified URDF on random configurations.
+
+    Returns:
+    - A dictionary with the time per check of both, the speedup, the agreement of their verdicts, the number of
+      configurations in collision with the original meshes but not with the simplified geometry (missed), and the
+      volume ratio of the fitted capsule of each mesh.
+    """
+    cache = cache or CollisionGeometryCache()
+    simplifiedPath = simplifiedPath or generateSimplifiedUrdf(urdfPath, cache=cache)
+    configs = np.random.default_rng(seed).uniform(-np.pi, np.pi, (samples, 6))
+
+    original, originalTime = _collisionVerdicts(urdfPath, configs)
+    simplified, simplifiedTime = _collisionVerdicts(simplifiedPath, configs)
+
+    baseDir = os.path.dirname(os.path.abspath(urdfPath))
+    volumeRatios = {}
+    for link in ET.parse(urdfPath).getroot().iter("link"):
+        for mesh in link.iterfind("collision/geometry/mesh"):
+            meshPath = os.path.join(baseDir, mesh.get("filename").replace("package://", ""))
+            scale = [float(value) for value in mesh.get("scale", "1 1 1").split()]
+            volumeRatios[link.get("name")] = cache.getCapsule(meshPath, scale)["volumeRatio"]
+
+    return {
+        "samples": samples,
+        "originalTime": originalTime,
+        "simplifiedTime": simplifiedTime,
+        "speedup": originalTime / simplifiedTime if simplifiedTime > 0 else None,
+        "agreement": float(np.mean(original == simplified)),
+        "missed": int(np.count_nonzero(simplified & ~original)),
+        "volumeRatios": volumeRatios,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    urdf = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_URDF
+    for mode in ("capsules", "convex"):
+        print(mode, json.dumps(compareGeometry(urdf, generateSimplifiedUrdf(urdf, mode)), indent=4))
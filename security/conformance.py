@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import time
+
+import numpy as np
+
+from .backends import BACKENDS, getChecker
+
+""" Differential conformance of the collision backends: the same random and boundary configurations are checked
+by every backend across a process pool, and the verdicts are compared with the ones of a reference backend """
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+COUNTEREXAMPLES_DIR = os.path.join(PACKAGE_DIR, "conformance_cases")
+
+_workerCheckers = None
+
+
+def parseBackend(name: str):
+    """
+    Returns (backend, margin) of a backend name, "backend" or "backend@margin" (for example "analytic@0.01").
+    """
+    backend, _, margin = name.partition("@")
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend}, available backends: {', '.join(BACKENDS)}")
+    return backend, float(margin) if margin else 0.0
+
+
+def _createCheckers(names):
+    checkers = {}
+    for name in names:
+        backend, margin = parseBackend(name)
+        checkers[name] = getChecker(backend, margin=margin)
+    return checkers
+
+
+def _initWorker(names):
+    # Each process creates its own checkers, PyBullet runs one simulation per process
+    global _workerCheckers
+    _workerCheckers = _createCheckers(names)
+
+
+def _checkChunk(configs, checkers=None):
+    """
+    Returns for each backend (valid, clearances, check time) of a chunk of configurations.
+    """
+    results = {}
+    for name, checker in (checkers or _workerCheckers).items():
+        start = time.perf_counter()
+        valid, clearances = checker.checkBatch(configs)
+        results[name] = (np.asarray(valid, dtype=bool), np.asarray(clearances, dtype=float), time.perf_counter() - start)
+    return results
+
+
+def sampleBoundaryConfigurations(count: int, iterations: int = 8, rng=None, checker=None):
+    """
+    Draws configurations close to the border between valid and not valid ones, where the backends most likely
+    disagree: each one is found by bisection on the segment between a valid and a not valid random configuration,
+    with the analytic checker.
+    """
+    rng = rng or np.random.default_rng()
+    checker = checker or getChecker("analytic")
+    inside, outside = np.empty((0, 6)), np.empty((0, 6))
+    for _ in range(100):
+        # Valid configurations are a small part of the joint space, drawn in rounds until there are enough
+        if len(inside) >= count and len(outside) >= count:
+            break
+        configs = rng.uniform(-np.pi, np.pi, (4 * count, 6))
+        valid, _ = checker.checkBatch(configs)
+        inside, outside = np.concatenate((inside, configs[valid])), np.concatenate((outside, configs[~valid]))
+    count = min(count, len(inside), len(outside))
+    low, high = inside[rng.integers(len(inside), size=count)], outside[rng.integers(len(outside), size=count)]
+
+    for _ in range(iterations):
+        middle = 0.5 * (low + high)
+        middleValid, _ = checker.checkBatch(middle)
+        low[middleValid], high[~middleValid] = middle[middleValid], middle[~middleValid]
+    # The last valid and first not valid configurations of each segment
+    return np.concatenate((low, high))
+
+
+def runConformance(samples: int = 100000, boundaryFraction: float = 0.2, reference: str = "pybullet",
+                   backends: list = None, workers: int = None, chunkSize: int = 1000, seed: int = 0,
+                   maxCounterexamples: int = 100, logs: bool = False):
+    """
+    Checks the same configurations with every backend and compares them with the reference.
+
+    Parameters:
+    - samples: Number of configurations.
+    - boundaryFraction: Fraction of the configurations drawn close to the border between valid and not valid
+      configurations (see sampleBoundaryConfigurations), the others are uniform in [-pi, pi].
+    - reference: Name of the reference backend, "backend" or "backend@margin".
+    - backends: Names of the compared backends, every other backend if None.
+    - workers: Number of processes, the checks run in the current process if None or 1.
+    - chunkSize: Number of configurations sent to a process at once.
+    - seed: Seed of the configurations.
+    - maxCounterexamples: Number of counterexamples kept for each backend, the worst ones first.
+    - logs: Print the progress.
+
+    Returns:
+    - A dictionary with, for each backend, the number and rate of disagreements with the reference, the
+      configurations declared safe but not safe for the reference (falseSafe) and the opposite (falseUnsafe),
+      the largest clearance it reported on a falseSafe configuration and the lowest on a falseUnsafe one (how
+      far its clearances are from the border of the reference), its check time and the counterexamples.
+    """
+    start = time.perf_counter()
+    backends = backends or [backend for backend in BACKENDS if backend != parseBackend(reference)[0]]
+    names = [reference] + [name for name in backends if name != reference]
+
+    rng = np.random.default_rng(seed)
+    boundaryCount = int(samples * boundaryFraction)
+    boundary = sampleBoundaryConfigurations((boundaryCount + 1) // 2, rng=rng)[:boundaryCount]
+    configs = np.concatenate((rng.uniform(-np.pi, np.pi, (samples - len(boundary), 6)), boundary))
+    chunks = [configs[index:index + chunkSize] for index in range(0, len(configs), chunkSize)]
+
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_initWorker, initargs=(names,)) as executor:
+            results = list(executor.map(_checkChunk, chunks))
+    else:
+        checkers = _createCheckers(names)
+        results = [_checkChunk(chunk, checkers) for chunk in chunks]
+
+    referenceValid = np.concatenate([result[reference][0] for result in results])
+    report = {
+        "samples": len(configs),
+        "boundarySamples": len(boundary),
+        "reference": reference,
+        "referenceValidRate": float(referenceValid.mean()) if len(configs) else 0.0,
+        "referenceCheckTime": sum(result[reference][2] for result in results),
+        "backends": {},
+    }
+    for name in names[1:]:
+        valid = np.concatenate([result[name][0] for result in results])
+        clearances = np.concatenate([result[name][1] for result in results])
+        falseSafe, falseUnsafe = valid & ~referenceValid, ~valid & referenceValid
+        disagreements = np.flatnonzero(falseSafe | falseUnsafe)
+        # Worst first: the configurations declared safe with the largest clearance, then the other ones
+        severity = np.where(falseSafe, np.nan_to_num(clearances, nan=0.0) + 1e3, -np.nan_to_num(clearances, nan=0.0))
+        worst = disagreements[np.argsort(-severity[disagreements], kind="stable")][:maxCounterexamples]
+        report["backends"][name] = {
+            "disagreements": len(disagreements),
+            "disagreementRate": len(disagreements) / len(configs) if len(configs) else 0.0,
+            "falseSafe": int(falseSafe.sum()),
+            "falseUnsafe": int(falseUnsafe.sum()),
+            "worstFalseSafeClearance": float(np.nanmax(clearances[falseSafe])) if falseSafe.any() and not np.isnan(clearances[falseSafe]).all() else None,
+            "worstFalseUnsafeClearance": float(np.nanmin(clearances[falseUnsafe])) if falseUnsafe.any() and not np.isnan(clearances[falseUnsafe]).all() else None,
+            "checkTime": sum(result[name][2] for result in results),
+            "counterexamples": [{
+                "positions": configs[i].tolist(),
+                "referenceValid": bool(referenceValid[i]),
+                "valid": bool(valid[i]),
+                "clearance": None if np.isnan(clearances[i]) else float(clearances[i]),
+            } for i in worst],
+        }
+        if logs:
+            print(f"{name}: {len(disagreements)} disagreements with {reference} ({falseSafe.sum()} false safe)")
+    report["time"] = time.perf_counter() - start
+    return report
+
+
+def saveCounterexamples(report: dict, directory: str = COUNTEREXAMPLES_DIR):
+    """
+    Saves the counterexamples of each backend as a fixture file <backend>_vs_<reference>.json.
+
+    Returns:
+    - The paths of the written files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for name, result in report["backends"].items():
+        if not result["counterexamples"]:
+            continue
+        path = os.path.join(directory, f"{name}_vs_{report['reference']}.json")
+        with open(path, "w") as file:
+            json.dump({"reference": report["reference"], "backend": name, "cases": result["counterexamples"]}, file, indent=4)
+        paths.append(path)
+    return paths
+
+
+def loadCounterexamples(path: str):
+    """
+    Returns the configurations of a fixture file, array of shape (N, 6), and the verdicts of the reference.
+    """
+    with open(path, "r") as file:
+        cases = json.load(file)["cases"]
+    return np.array([case["positions"] for case in cases]).reshape(-1, 6), np.array([case["referenceValid"] for case in cases], dtype=bool)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare the collision backends with a reference backend")
+    parser.add_argument("--samples", type=int, default=100000)
+    parser.add_argument("--boundary-fraction", type=float, default=0.2)
+    parser.add_argument("--reference", default="pybullet", help="backend or backend@margin")
+    parser.add_argument("--backends", nargs="*", help="compared backends, every other one by default")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=COUNTEREXAMPLES_DIR, help="directory of the counterexamples")
+    args = parser.parse_args()
+
+    report = runConformance(args.samples, args.boundary_fraction, args.reference, args.backends, args.workers,
+                            seed=args.seed, logs=True)
+    paths = saveCounterexamples(report, args.output)
+    for result in report["backends"].values():
+        del result["counterexamples"]
+    print(json.dumps(report, indent=4))
+    for path in paths:
+        print(f"Counterexamples saved in {path}")
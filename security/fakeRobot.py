@@ -0,0 +1,276 @@
+import json
+import math
+import threading
+import time
+
+import numpy as np
+
+""" Local stand-in for urbasic.ISCoin serving recorded or synthetic joint positions,
+used to load test the real time checking without hardware """
+
+
+class FakeJoint6D():
+    def __init__(self, angles):
+        self.angles = [float(angle) for angle in angles]
+
+    @staticmethod
+    def createFromRadList(angles):
+        return FakeJoint6D(angles)
+
+    def toList(self):
+        return list(self.angles)
+
+
+def _toList(joints):
+    return joints.toList() if hasattr(joints, "toList") else [float(angle) for angle in joints]
+
+
+def loadTrajectorySamples(path, rate: float = 125.0, defaultDuration: float = 1.0):
+    """
+    Resamples the waypoints of a trajectory file (modTraj format) at the given rate.
+
+    Parameters:
+    - path: Path of the json trajectory file.
+    - rate: Sampling rate in Hz.
+    - defaultDuration: Time in seconds between two waypoints when time_from_start is missing or not increasing.
+
+    Returns:
+    - An array of shape (N, 6) with one joint position per tick.
+    """
+    with open(path, "r") as file:
+        data = json.load(file)["modTraj"]
+
+    positions = np.array([point["positions"] for point in data], dtype=float)
+    times = np.array([point.get("time_from_start", [0, 0])[0] + point.get("time_from_start", [0, 0])[1] * 1e-9
+                      for point in data], dtype=float)
+    if len(times) < 2 or np.any(np.diff(times) <= 0):
+        times = np.arange(len(positions)) * defaultDuration
+
+    ticks = np.arange(times[0], times[-1] + 1 / (2 * rate), 1 / rate)
+    return np.column_stack([np.interp(ticks, times, positions[:, j]) for j in range(6)])
+
+
+def syntheticSamples(start: list, amplitude: float = 0.2, frequency: float = 0.5, duration: float = 10.0,
+                     rate: float = 125.0):
+    """
+    Generates a smooth sinusoidal motion around a start position.
+
+    Parameters:
+    - start: Joint angles around which the robot moves.
+    - amplitude: Amplitude of the motion of each joint in radians.
+    - frequency: Frequency of the motion in Hz.
+    - duration: Duration of the motion in seconds.
+    - rate: Sampling rate in Hz.
+
+    Returns:
+    - An array of shape (N, 6) with one joint position per tick.
+    """
+    ticks = np.arange(int(duration * rate))[:, None] / rate
+    phases = np.arange(6) * np.pi / 6
+    return np.asarray(start, dtype=float) + amplitude * np.sin(2 * np.pi * frequency * ticks + phases)
+
+
+class FakeRobotControl():
+    """ Subset of the urbasic robot_control interface used by the security module """
+
+    def __init__(self, robot):
+        self.robot = robot
+
+    def get_actual_joint_positions(self):
+        return FakeJoint6D(self.robot.readPosition())
+
+    def movej(self, joints, a=1.4, v=1.05, t=0, r=0, wait=True):
+        tick = self.robot.moveTo(_toList(joints), v)
+        if wait:
+            self.robot.waitTick(tick)
+
+    def stopj(self, a=1.4):
+        self.robot.stop()
+
+    def reset_error(self):
+        self.robot.errors = []
+
+
+class FakeISCoin():
+    def __init__(self, samples, rate: float = 125.0, jitter: float = 0.0, latency: float = 0.0, loop: bool = False,
+                 realTime: bool = True, seed: int = 0):
+        """
+        Initializes the FakeISCoin class.
+
+        The robot publishes sample k of its current motion at time k / rate (plus jitter). Reading the joint
+        positions returns the last sample published latency seconds ago, and commands take effect
+        latency seconds after being sent. Everything is derived from the tick index so two runs with the
+        same seed and the same read/command times behave the same.
+
+        Parameters:
+        - samples: Array of shape (N, 6) with the joint positions served at each tick.
+        - rate: Publication rate in Hz (125 Hz for RTDE on CB3, 500 Hz on e-Series).
+        - jitter: Standard deviation in seconds of the publication time of each tick, clipped to 45% of the period.
+        - latency: One way communication latency in seconds.
+        - loop: Restart the samples when the end is reached instead of holding the last position.
+        - realTime: Follow the wall clock, otherwise each read advances the clock by one tick.
+        - seed: Seed of the jitter.
+        """
+        self.rate = rate
+        self.period = 1 / rate
+        self.latency = latency
+        self.loop = loop
+        self.realTime = realTime
+        self.robot_control = FakeRobotControl(self)
+        self.errors = []
+
+        rng = np.random.default_rng(seed)
+        self._jitter = np.clip(rng.normal(0.0, jitter, 4096), -0.45 * self.period, 0.45 * self.period) if jitter > 0 else np.zeros(4096)
+
+        # Motions as (start tick, samples, loop), the last one starting before a tick is the one served
+        self._motions = [(0, np.asarray(samples, dtype=float).reshape(-1, 6), loop)]
+        self._lock = threading.Lock()
+        self._startTime = None
+        self._virtualTicks = 0
+
+        self.reads = 0
+        self.lastSampleTime = None  # Publication time of the tick of the last read, as the timestamp of RTDE
+        self.stopEvents = []  # (time the stop was sent, tick at which the robot stopped)
+        self.moveEvents = []  # (time the move was sent, tick at which the move started)
+
+    def _now(self):
+        if not self.realTime:
+            return self._virtualTicks * self.period
+        if self._startTime is None:
+            self._startTime = time.perf_counter()
+        return time.perf_counter() - self._startTime
+
+    def publishTime(self, tick: int):
+        """
+        Returns the time at which a tick is published by the robot.
+        """
+        return tick * self.period + self._jitter[tick % len(self._jitter)]
+
+    def _tickAt(self, t: float):
+        """
+        Returns the last tick published at time t.
+        """
+        base = math.floor(t * self.rate)
+        for tick in (base + 1, base, base - 1):
+            if tick >= 0 and self.publishTime(tick) <= t:
+                return tick
+        return 0
+
+    def _positionAt(self, tick: int):
+        start, samples, loop = next(motion for motion in reversed(self._motions) if motion[0] <= tick)
+        index = tick - start
+        index = index % len(samples) if loop else min(index, len(samples) - 1)
+        return samples[index]
+
+    def readPosition(self):
+        """
+        Returns the joint positions as seen by the controller at the current time.
+        """
+        with self._lock:
+            if not self.realTime:
+                self._virtualTicks += 1
+            self.reads += 1
+            tick = self._tickAt(self._now() - self.latency)
+            self.lastSampleTime = self.publishTime(tick)
+            return self._positionAt(tick).tolist()
+
+    def moveTo(self, target: list, speed: float):
+        """
+        Starts a linear joint motion to the target at the given speed (rad/s) once the command reaches the robot.
+
+        Returns:
+        - The tick at which the target is reached.
+        """
+        with self._lock:
+            sentAt = self._now()
+            tick = self._tickAt(sentAt + self.latency) + 1
+            current = self._positionAt(tick)
+            target = np.asarray(target, dtype=float)
+            steps = max(1, math.ceil(np.max(np.abs(target - current)) / speed * self.rate))
+            samples = current + np.linspace(0.0, 1.0, steps + 1)[:, None] * (target - current)
+            self._motions.append((tick, samples, False))
+            self.moveEvents.append((sentAt, tick))
+            return tick + steps
+
+    def stop(self):
+        """
+        Holds the current position once the command reaches the robot.
+        """
+        with self._lock:
+            sentAt = self._now()
+            tick = self._tickAt(sentAt + self.latency) + 1
+            self._motions.append((tick, self._positionAt(tick)[None, :], False))
+            self.stopEvents.append((sentAt, tick))
+
+    def waitTick(self, tick: int):
+        """
+        Blocks until a tick is published (returns immediately when not following the wall clock).
+        """
+        while self.realTime and self._now() < self.publishTime(tick):
+            time.sleep(min(self.period, max(0.0, self.publishTime(tick) - self._now())))
+
+    def isStopped(self):
+        return bool(self.stopEvents)
+
+    def stopReactionLatency(self, unsafeTick: int):
+        """
+        Returns the time in seconds between the publication of an unsafe tick and the moment the robot
+        actually stopped, or None if the robot was never stopped.
+        """
+        if not self.stopEvents:
+            return None
+        _, stopTick = self.stopEvents[0]
+        return float(self.publishTime(stopTick) - self.publishTime(unsafeTick))
+
+
+def runLoadTest(iscoin: FakeISCoin, duration: float, unsafeTick: int = None, checker=None, logs: bool = False):
+    """
+    Runs the real time checking against a fake robot and measures how it keeps up.
+
+    Parameters:
+    - iscoin: The FakeISCoin serving the motion, the checking interval is its period.
+    - duration: Maximum duration of the test in seconds, the test ends earlier if the robot is stopped.
+    - unsafeTick: First tick of the motion that must stop the robot, used to measure the stop reaction latency.
+    - checker: A GlobalRobotChecking to use instead of a new one stopping the robot on violation.
+    - logs: Print the logs of the checking.
+
+    Returns:
+    - A dictionary with the number of checks, the achieved checking rate, the check durations,
+      the number of checks longer than the interval, the number of collision checks run and skipped,
+      and the stop reaction latency.
+    """
+    from .globalRobotChecking import GlobalRobotChecking
+
+    if checker is None:
+        checker = GlobalRobotChecking(logs, False, iscoin.period, iscoin=iscoin, stopOnViolation=True,
+                                      getTimestamp=lambda: iscoin.lastSampleTime)
+
+    start = time.perf_counter()
+    checker.start()
+    while time.perf_counter() - start < duration and checker.running:
+        time.sleep(0.01)
+    checker.stop()
+    elapsed = time.perf_counter() - start
+
+    ticks = checker.stats["ticks"]
+    return {
+        "rate": iscoin.rate,
+        "ticks": ticks,
+        "achievedRate": ticks / elapsed,
+        "meanCheckTime": checker.stats["totalCheckTime"] / ticks if ticks else 0.0,
+        "maxCheckTime": checker.stats["maxCheckTime"],
+        "overruns": checker.stats["overruns"],
+        "fullChecks": checker.stats["fullChecks"],
+        "skippedChecks": checker.stats["skippedChecks"],
+        "stopped": iscoin.isStopped(),
+        "stopReactionLatency": iscoin.stopReactionLatency(unsafeTick) if unsafeTick is not None else None,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "security/trajectories_test/traj_test_collision_gripper.json"
+    for rate in (125.0, 250.0, 500.0):
+        robot = FakeISCoin(loadTrajectorySamples(path, rate), rate=rate, jitter=0.0005, latency=0.002)
+        print(runLoadTest(robot, duration=5.0))
@@ -1,5 +1,10 @@
 import numpy as np
 
+# DH parameters of the UR3e
+DH_ALPHA = np.array([np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
+DH_A = np.array([0, -0.24355, -0.2132, 0, 0, 0])
+DH_D = np.array([0.15185, 0, 0, 0.13105, 0.08535, 0.0921])
+
 """ This class allow to find actual position of each joint, knowing angles of each joint """
 
 
@@ -8,9 +13,9 @@ class ForwardKinematic():
 
         self.numJoints = 6
         # DH parameters as numpy arrays
-        self.alpha = np.array([np.pi/2, 0, 0, np.pi/2, -np.pi/2, 0])
-        self.a = np.array([0, -0.24355, -0.2132, 0, 0, 0])
-        self.d = np.array([0.15185, 0, 0, 0.13105, 0.08535, 0.0921])
+        self.alpha = DH_ALPHA
+        self.a = DH_A
+        self.d = DH_D
         
         # Current angles as numpy array
         self.angles = np.array(angles)
@@ -75,3 +80,55 @@ class ForwardKinematic():
         return finalCoordinates
 
 
+""" Same computation as ForwardKinematic but for a whole batch of configurations at once """
+
+
+class BatchForwardKinematic():
+    def __init__(self, angles):
+        """
+        Parameters:
+        - angles: Array-like of shape (N, 6) with the joint angles of N configurations.
+        """
+        self.numJoints = 6
+        self.angles = np.asarray(angles, dtype=float).reshape(-1, self.numJoints)
+
+        # Transformation matrices of each joint, shape (N, 6, 4, 4)
+        self.matrices = self._buildMatrices()
+
+    def _buildMatrices(self):
+        cosTheta = np.cos(self.angles)
+        sinTheta = np.sin(self.angles)
+        cosAlpha = np.cos(DH_ALPHA)
+        sinAlpha = np.sin(DH_ALPHA)
+
+        matrices = np.zeros(self.angles.shape + (4, 4))
+        matrices[..., 0, 0] = cosTheta
+        matrices[..., 0, 1] = -sinTheta * cosAlpha
+        matrices[..., 0, 2] = sinTheta * sinAlpha
+        matrices[..., 0, 3] = DH_A * cosTheta
+        matrices[..., 1, 0] = sinTheta
+        matrices[..., 1, 1] = cosTheta * cosAlpha
+        matrices[..., 1, 2] = -cosTheta * sinAlpha
+        matrices[..., 1, 3] = DH_A * sinTheta
+        matrices[..., 2, 1] = sinAlpha
+        matrices[..., 2, 2] = cosAlpha
+        matrices[..., 2, 3] = DH_D
+        matrices[..., 3, 3] = 1.0
+        return matrices
+
+    def getFrames(self):
+        """
+        Returns the frame of each joint expressed in the base frame, shape (N, 6, 4, 4).
+        """
+        frames = np.empty_like(self.matrices)
+        frames[:, 0] = self.matrices[:, 0]
+        for j in range(1, self.numJoints):
+            frames[:, j] = frames[:, j-1] @ self.matrices[:, j]
+        return frames
+
+    def getCoordinates(self):
+        """
+        Returns the coordinates of each joint, shape (N, 6, 3), in the same order as
+        ForwardKinematic.getCoordinates (joint 1 first).
+        """
+        return self.getFrames()[:, :, :3, 3]
@@ -1,15 +1,27 @@
 from math import radians
 import threading
+import time
+from typing import TYPE_CHECKING
 
-from urbasic import ISCoin
 import numpy as np
 
 from .checkAnglesVariation import checkAngleVariation
 from .workingAreaChecking import WorkingAreaRobotChecking
 from .collisionChecking import RobotCollisionCheck 
+from .motionBudget import MotionBudget
+from .singularityChecking import getNearSingularities
+from .tcpSpeedMonitoring import TcpSpeedMonitor
+
+# Number of samples over which the speed of the pen tip is measured when only the read times are known
+TCP_SPEED_WINDOW = 5
+
+if TYPE_CHECKING:
+    from urbasic import ISCoin
 
 class GlobalRobotChecking():
-    def __init__(self, logs=True, gui=False, interval: float = None, iscoin: ISCoin = None):
+    def __init__(self, logs=True, gui=False, interval: float = None, iscoin: "ISCoin" = None, stopOnViolation: bool = False,
+                 singularityThresholds: dict = None, tcpSpeedLimit: float = None, eventDriven: bool = False,
+                 getTimestamp=None):
         """
         Initializes the GlobalRobotChecking class.
 
@@ -17,6 +29,16 @@ class GlobalRobotChecking():
         - angles: List of initial joint angles for the robot.
         - interval: Time interval for real-time checking.
         - iscoin: Instance of ISCoin for robot control.
+        - stopOnViolation: Stop the robot with stopj and end the real-time checking when a position is not valid.
+        - singularityThresholds: Positions closer to a singularity than these thresholds are not valid
+          (see singularityChecking.SINGULARITY_THRESHOLDS), not checked if None.
+        - tcpSpeedLimit: Maximum speed of the pen tip in mm/s during the real-time checking (see
+          tcpSpeedMonitoring.TCP_SPEED_LIMIT), not checked if None.
+        - eventDriven: Skip the collision check of the positions proven safe by the last one (see MotionBudget),
+          the other checks still run at every tick.
+        - getTimestamp: Function returning the time in seconds at which the robot sampled the last joint angles read
+          (for example the timestamp of the RTDE data), used for the speed of the pen tip. The time of the read is
+          used if None, and the speed is then smoothed over TCP_SPEED_WINDOW samples to absorb the read jitter.
         """
         self.interval = interval  # Time interval for periodic checks
         self.running = False  # Flag to indicate if the checking is running
@@ -30,6 +52,17 @@ class GlobalRobotChecking():
         self.logs = logs  # Flag to indicate if logs should be printed
 
         self.check = True  # Flag to indicate if the robot is in a valid state
+        self.stopOnViolation = stopOnViolation  # Flag to stop the robot when a position is not valid
+        self.singularityThresholds = singularityThresholds  # Thresholds of the singularity check
+        self.getTimestamp = getTimestamp  # Time of the robot sample of the last angles read
+        self.timestamp = None  # Time of the robot sample of the current angles
+        window = 1 if getTimestamp is not None else TCP_SPEED_WINDOW
+        self.tcpSpeedMonitor = TcpSpeedMonitor(tcpSpeedLimit, window=window) if tcpSpeedLimit is not None else None
+        self.motionBudget = MotionBudget() if eventDriven else None  # Motion proven safe by the last collision check
+
+        # Statistics of the real-time loop, and of the collision checks run or skipped in event-driven mode
+        self.stats = {"ticks": 0, "totalCheckTime": 0.0, "maxCheckTime": 0.0, "overruns": 0,
+                      "fullChecks": 0, "skippedChecks": 0, "fullCheckTime": 0.0}
 
         self.checkingCollison= RobotCollisionCheck(gui,logs)
 
@@ -48,20 +81,46 @@ class GlobalRobotChecking():
         """
         self.angles = self.iscoin.robot_control.get_actual_joint_positions().toList()
         self.oldAngles = self.angles  # Store the initial angles
-        while True:  # Continue running until stop is requested
+        while not self._stop_event.is_set():  # Continue running until stop is requested
+            start = time.perf_counter()
             # Get the current joint positions from the robot
             self.angles = self.iscoin.robot_control.get_actual_joint_positions().toList()
+            timestamp = self.getTimestamp() if self.getTimestamp is not None else start
             self.validPositions = []
-            self.validPositions=self.checkNextBehaviour(self.angles) 
-            # if not self.validPositions: 
-            #     print("No valid positions found")
-            #     radAcc = radians(5)
-            #     self.iscoin.robot_control.stopj([radAcc, radAcc, radAcc, radAcc, radAcc, radAcc])
-            #     self.check = False
-            #     break
-            self._stop_event.wait(self.interval)  # Wait for the specified interval (non-blocking sleep)
-    
-
+            self.validPositions=self.checkNextBehaviour(self.angles, timestamp) 
+            elapsed = time.perf_counter() - start
+            self._updateStats(elapsed)
+
+            if not self.validPositions and self.stopOnViolation:
+                if self.logs:
+                    print("No valid positions found")
+                radAcc = radians(5)
+                self.iscoin.robot_control.stopj([radAcc, radAcc, radAcc, radAcc, radAcc, radAcc])
+                self.check = False
+                break
+            # Wait for the rest of the interval (non-blocking sleep), without an interval only stop when asked to
+            if self.interval is not None:
+                self._stop_event.wait(max(0.0, self.interval - elapsed))
+        self.running = False
+
+    def _updateStats(self, elapsed):
+        """
+        Updates the statistics of the real-time loop with the duration of the last check.
+        """
+        self.stats["ticks"] += 1
+        self.stats["totalCheckTime"] += elapsed
+        self.stats["maxCheckTime"] = max(self.stats["maxCheckTime"], elapsed)
+        if self.interval is not None and elapsed > self.interval:
+            self.stats["overruns"] += 1
+
+    @property
+    def savedCheckTime(self):
+        """
+        Estimated time saved by the skipped collision checks, at the mean duration of the ones that ran.
+        """
+        if not self.stats["fullChecks"]:
+            return 0.0
+        return self.stats["skippedChecks"] * self.stats["fullCheckTime"] / self.stats["fullChecks"]
 
 
     def stop(self):
@@ -87,14 +146,31 @@ class GlobalRobotChecking():
             print("High variations in the angles of the joints: ", highVariations)
             self.isValid = False
 
-    def checkNextBehaviour(self,angles):
+    def _checkTcpSpeed(self):
+        """
+        Checks the Cartesian speed of the pen tip from the time of the samples, with or without an interval.
+        """
+        isSpeedValid, speed, _ = self.tcpSpeedMonitor.update(self.angles, self.timestamp)
+        if not isSpeedValid:
+            if self.logs:
+                print(f"Pen tip speed too high: {speed:.0f} mm/s")
+            self.isValid = False
+
+    def checkNextBehaviour(self,angles, timestamp: float = None):
         """
         Performs various checks to ensure the robot is operating within safe parameters.
+
+        Parameters:
+        - angles: The current joint angles.
+        - timestamp: Time in seconds at which the robot sampled the angles, the current time if None.
         """
         self.angles = angles  # Update the current angles
+        self.timestamp = timestamp if timestamp is not None else time.perf_counter()
         # Perform real-time behavior checks if an interval is specified
         if self.interval is not None:
             self._beahviourForRealTime()
+        if self.tcpSpeedMonitor is not None:
+            self._checkTcpSpeed()
         # Check if the robot is within the working area
         # self.safeAreaChecking = WorkingAreaRobotChecking(0, 0, 0, 0.62, angles)
         # areaChecking = self.safeAreaChecking.checkPointsInHalfOfSphere()
@@ -107,10 +183,32 @@ class GlobalRobotChecking():
         #         print("Robot is out of the working area")
         #     self.isCurrentAngleValid = False
 
-    
-        if self.checkingCollison.runSimulation(self.angles) and self.isValid:
+        nearSingularity = self.singularityThresholds is not None and getNearSingularities(self.angles, self.singularityThresholds)[0]
+        if nearSingularity and self.logs:
+            print("Robot is near a singularity")
+
+        if not nearSingularity and self._isCollisionFree(self.angles) and self.isValid:
             self.validPositions.append(self.angles)  # Append the current angles to the valid positions list
         else:
             self.validPositions = []
 
         return list(self.validPositions)
+
+    def _isCollisionFree(self, angles):
+        """
+        Runs the collision check in the simulation, unless the position is within the motion budget of the last one.
+        """
+        if self.motionBudget is not None and self.motionBudget.isWithinBudget(angles):
+            self.stats["skippedChecks"] += 1
+            return True
+
+        start = time.perf_counter()
+        isSafe = self.checkingCollison.runSimulation(angles)
+        self.stats["fullChecks"] += 1
+        self.stats["fullCheckTime"] += time.perf_counter() - start
+        if self.motionBudget is not None:
+            if isSafe:
+                self.motionBudget.reset(angles)
+            else:
+                self.motionBudget.invalidate()
+        return isSafe
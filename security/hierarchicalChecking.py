@@ -0,0 +1,89 @@
+import numpy as np
+
+from .batchCollisionChecking import AREA_BOUNDS, COARSE_PAIRS, RIGID_PAIRS, BatchCollisionCheck
+from .capsules import LINK_RADII, MESH_INFLATION, getCapsules
+
+""" Coarse to fine collision checking: inflated capsules first, exact meshes only where the capsules are not conclusive """
+
+
+class HierarchicalCollisionCheck():
+    def __init__(self, exactChecker=None, margin: float = 0.0, inflation: float = MESH_INFLATION, areaMargin: float = 0.01,
+                 scene=None, logs: bool = False, gui: bool = False):
+        """
+        Initializes the HierarchicalCollisionCheck class.
+
+        A configuration is declared safe without the exact check when the capsules inflated by `inflation`
+        are more than `margin` apart and the pen is more than `areaMargin` inside the working area. The
+        capsules of every pair of links that can collide are compared (COARSE_PAIRS), including the wrist,
+        gripper and pen pairs that the analytic backend leaves out. Every
+        other configuration is checked by the exact checker, so the verdict of an unsafe configuration
+        always comes from it.
+
+        Parameters:
+        - exactChecker: Checker exposing checkBatch(configs), a RobotCollisionCheck created on the first
+          escalation if None.
+        - margin: Minimum clearance in meters of the inflated capsules, and between the robot and the scene in
+          the exact check.
+        - inflation: Added to the radius of every capsule so that they enclose the meshes.
+        - areaMargin: Distance in meters from the border of the working area under which the pen is escalated.
+        - scene: Scene with the obstacles and other robots of the cell.
+        - logs: Print the logs of the checkers.
+        - gui: Show the PyBullet simulation of the exact checker.
+        """
+        self.exactChecker = exactChecker
+        self.margin = margin
+        self.areaMargin = areaMargin
+        self.scene = scene
+        self.logs = logs
+        self.gui = gui
+        self.coarseChecker = BatchCollisionCheck(margin=margin, checkArea=False, scene=scene, radii=LINK_RADII + inflation,
+                                                 pairs=COARSE_PAIRS)
+        self.stats = {"samples": 0, "exactChecks": 0}
+
+    @property
+    def avoidedChecks(self):
+        """
+        Number of configurations that did not need the exact check.
+        """
+        return self.stats["samples"] - self.stats["exactChecks"]
+
+    def _getExactChecker(self):
+        if self.exactChecker is None:
+            from .collisionChecking import RobotCollisionCheck
+            self.exactChecker = RobotCollisionCheck(self.gui, self.logs, scene=self.scene, sceneMargin=self.margin)
+        return self.exactChecker
+
+    def close(self):
+        """
+        Closes the exact checker, if it was created.
+        """
+        if hasattr(self.exactChecker, "close"):
+            self.exactChecker.close()
+        self.exactChecker = None
+
+    def checkBatch(self, configs):
+        """
+        Checks a batch of configurations.
+
+        Returns:
+        - (valid, clearances) arrays of shape (N,), the clearances are the ones of the inflated capsules.
+        """
+        configs = np.asarray(configs, dtype=float).reshape(-1, 6)
+        certain, clearances = self.coarseChecker.checkBatch(configs)
+
+        tips = getCapsules(configs, toolLength=self.coarseChecker.toolLength)[1][:, -1]
+        certain &= np.all((tips >= AREA_BOUNDS[0] + self.areaMargin) & (tips <= AREA_BOUNDS[1] - self.areaMargin), axis=1)
+
+        valid = certain.copy()
+        escalated = np.flatnonzero(~certain)
+        if len(escalated):
+            valid[escalated] = self._getExactChecker().checkBatch(configs[escalated])[0]
+
+        self.stats["samples"] += len(configs)
+        self.stats["exactChecks"] += len(escalated)
+        if self.logs:
+            print(f"{len(escalated)} of {len(configs)} configurations checked exactly")
+        return valid, clearances
+
+    def isValidConfiguration(self, angles):
+        return bool(self.checkBatch([angles])[0][0])
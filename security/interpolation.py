@@ -1,16 +1,65 @@
 import math
-import plotly.graph_objects as go
 
-from security.globalRobotChecking import GlobalRobotChecking
+import numpy as np
 
+from security.backends import getChecker
+from security.capsules import MESH_INFLATION
+from security.singularityChecking import getNearSingularities
+from security.sweptVolume import SweptVolumeCheck
+
+
+_workerInterpolation = None  # Interpolation of a worker process
+_workerFirstUnsafe = None  # Shared index of the first unsafe segment found, the later segments are not checked
+
+NO_UNSAFE_SEGMENT = 2 ** 62
+
+
+def _initWorker(logs, backend, margin, t, anglesDistanceVariation, singularityThresholds, firstUnsafe):
+    global _workerInterpolation, _workerFirstUnsafe
+    _workerInterpolation = Interpolation(logs, backend=backend, margin=margin, singularityThresholds=singularityThresholds)
+    _workerInterpolation.t = t
+    _workerInterpolation.anglesDistanceVariation = anglesDistanceVariation
+    _workerFirstUnsafe = firstUnsafe
+
+
+def _isTrajectoriesSafeInWorker(index, angles1, angles2):
+    return _workerInterpolation._isTrajectoriesSafe(angles1, angles2, lambda: index > _workerFirstUnsafe.value)
+
+
+class _SharedIndex():
+    """ Index shared by the threads of the parallel checks, with the interface of multiprocessing.Value """
+
+    def __init__(self, value: int):
+        self.value = value
 
 
 class Interpolation:
-    def __init__(self, logs=True, stopAtFirstError=True,):
+    def __init__(self, logs=True, stopAtFirstError=True, backend="pybullet", margin=0.0, workers=None, sweptBound=False, singularityThresholds=None):
         self.anglesDistanceVariation = 0.1  # Threshold for skipping interpolation
         self.t = 0.1
         self.logs = logs
         self.stopAtFirstError = stopAtFirstError
+        self.backend = backend  # Collision checking backend, see backends.getChecker
+        self.margin = margin
+        self.checker = None  # Created on the first check
+        self.workers = workers  # Number of workers checking the segments in parallel, sequential if None or 1
+        # Segments proven safe by their swept volume are not sampled
+        self.sweptChecker = None
+        if sweptBound:
+            inflation = 0.0 if backend == "analytic" else MESH_INFLATION
+            self.sweptChecker = SweptVolumeCheck(margin=margin, inflation=inflation)
+        self.provenSegments = 0  # Number of segments proven safe without sampling
+        # Interpolated positions closer to a singularity than these thresholds are unsafe, not checked if None
+        self.singularityThresholds = singularityThresholds
+        # Workers kept between the checks, with the PyBullet simulation of each process already loaded
+        self.executor = None
+        self._executorKey = None
+        self._firstUnsafe = None  # Shared index of the first unsafe segment of the running parallel check
+
+    def _getChecker(self):
+        if self.checker is None:
+            self.checker = getChecker(self.backend, self.logs, margin=self.margin)
+        return self.checker
 
     def _getLinearInterpolation(self, theta1, theta2, t):
         """Performs linear interpolation between two angles without wrapping."""
@@ -70,24 +119,142 @@ class Interpolation:
 
         return interpolated_trajectory
     
-    def _isTrajectoriesSafe(self, angles1, angles2):
-        """Check if two trajectories are safe."""
+    def _isTrajectoriesSafe(self, angles1, angles2, isCancelled=None):
+        """
+        Check if two trajectories are safe.
+
+        isCancelled is called before each position checked by the PyBullet backend, one at a time, and once
+        before the batch of the other backends: the check stops and returns None when it returns True.
+        """
         interpolated_trajectory = self._getInterpSingleTrajectory(angles1, angles2)
-        for i in range(len(interpolated_trajectory)):
-            positions = GlobalRobotChecking(interpolated_trajectory[i],self.logs).checkNextBehaviour()
-            if not positions:
-                if self.logs:
-                    print(f"Unsafe trajectory between angles {angles1} and angles {angles2}")
-                return False 
+        if isCancelled is not None and self.backend == "pybullet":
+            valid = []
+            for position in interpolated_trajectory:
+                if isCancelled():
+                    return None
+                valid.append(self._getChecker().checkBatch([position])[0][0])
+            valid = np.array(valid, dtype=bool)
+        elif isCancelled is not None and isCancelled():
+            return None
+        else:
+            # All the interpolated positions of the segment are checked in one batch
+            valid, _ = self._getChecker().checkBatch(interpolated_trajectory)
+        if not valid.all():
+            if self.logs:
+                print(f"Unsafe trajectory between angles {angles1} and angles {angles2}")
+            return False 
+        if self.singularityThresholds is not None and getNearSingularities(interpolated_trajectory, self.singularityThresholds).any():
+            if self.logs:
+                print(f"Trajectory between angles {angles1} and angles {angles2} passes near a singularity")
+            return False
     
         return True
 
 
+    def _proveSegmentsSafe(self, angles: list[list[float]]):
+        """Returns for each segment whether its swept volume proves it safe."""
+        if self.sweptChecker is None or len(angles) < 2:
+            return [False] * max(0, len(angles) - 1)
+        proven = self.sweptChecker.proveSegmentsSafe(angles[:-1], angles[1:])
+        if self.singularityThresholds is not None:
+            # The swept volume says nothing about the singularities, their check still needs the samples
+            for i in np.flatnonzero(proven):
+                samples = self._getInterpSingleTrajectory(angles[i], angles[i + 1])
+                proven[i] = not getNearSingularities(samples, self.singularityThresholds).any()
+        self.provenSegments += int(proven.sum())
+        return proven.tolist()
+
+    def _getExecutor(self):
+        """
+        Returns the executor of the parallel checks and the function checking a segment (index, angles1, angles2).
+
+        PyBullet keeps one simulation per process, so each worker gets its own process with the pybullet
+        backend. The other backends are shared by threads. The executor is kept for the next checks, it is only
+        created again when the settings given to the worker processes change.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        settings = (self.logs, self.backend, self.margin, self.t, self.anglesDistanceVariation, self.singularityThresholds)
+        key = (self.workers,) + (settings if self.backend == "pybullet" else (self.backend,))
+        if self.executor is not None and key != self._executorKey:
+            self.close()
+        if self.executor is None:
+            if self.backend == "pybullet":
+                self._firstUnsafe = multiprocessing.Value("q", NO_UNSAFE_SEGMENT)
+                self.executor = ProcessPoolExecutor(self.workers, initializer=_initWorker,
+                                                    initargs=settings + (self._firstUnsafe,))
+            else:
+                self._firstUnsafe = _SharedIndex(NO_UNSAFE_SEGMENT)
+                self.executor = ThreadPoolExecutor(self.workers)
+            self._executorKey = key
+
+        if self.backend == "pybullet":
+            return self.executor, _isTrajectoriesSafeInWorker
+        self._getChecker()
+        firstUnsafe = self._firstUnsafe
+        return self.executor, lambda index, angles1, angles2: self._isTrajectoriesSafe(
+            angles1, angles2, lambda: index > firstUnsafe.value)
+
+    def close(self):
+        """
+        Stops the workers of the parallel checks, they are started again by the next parallel check.
+        """
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+        self.executor = None
+        self._executorKey = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _checkSafeTrajectoriesParallel(self, angles: list[list[float]], proven: list[bool]):
+        """
+        Checks all the segments concurrently. When stopping at the first error, the segments after an
+        unsafe one are cancelled: the waiting ones through their futures, the running ones through the
+        shared index of the first unsafe segment, which the workers read before each position. The segments
+        before it are still waited for so the earliest unsafe segment is reported, as in the sequential check.
+        """
+        from concurrent.futures import as_completed
+
+        notSafe = []
+        executor, check = self._getExecutor()
+        self._firstUnsafe.value = NO_UNSAFE_SEGMENT
+        futures = {executor.submit(check, i, angles[i], angles[i + 1]): i for i in range(len(angles) - 1) if not proven[i]}
+        try:
+            for future in as_completed(futures):
+                # Cancelled or stopped segments come after an unsafe one
+                if future.cancelled() or future.result() is None or future.result():
+                    continue
+                i = futures[future]
+                notSafe.append(i)
+                if self.stopAtFirstError and i == min(notSafe):
+                    self._firstUnsafe.value = i
+                    for other, j in futures.items():
+                        if j > i:
+                            other.cancel()
+        finally:
+            for future in futures:
+                future.cancel()
+
+        if self.stopAtFirstError:
+            if not notSafe:
+                return {}
+            i = min(notSafe)
+            return (i, i+1), (angles[i], angles[i+1])
+        return {(i, i+1): (angles[i], angles[i+1]) for i in sorted(notSafe)}
+
     def checkSafeTrajectories(self, angles: list[list[float]]):
         """Interpolates between all sets of angles in the list."""
+        proven = self._proveSegmentsSafe(angles)
+        if self.workers is not None and self.workers > 1 and len(angles) > 2:
+            return self._checkSafeTrajectoriesParallel(angles, proven)
         allnotSafePositions = {}
         for i in range(len(angles) - 1):
-            isSafe = self._isTrajectoriesSafe(angles[i], angles[i + 1])
+            isSafe = proven[i] or self._isTrajectoriesSafe(angles[i], angles[i + 1])
             if not isSafe:
                 if self.stopAtFirstError:
                     return (i, i+1), (angles[i], angles[i+1])
@@ -96,42 +263,22 @@ class Interpolation:
                 
      
 
-    def drawTrajectory(self, trajectory):
-        """Draws a trajectory of joint angles."""
-        # Plot angles variation
-        fig_angles = go.Figure()
-
-        num_angles = len(trajectory[0])  # Number of angles (joints)
-        angle_steps = list(range(len(trajectory)))
-
-        # Prepare lists for each angle
-        angles = [[] for _ in range(num_angles)]
-
-        # Collect angle values over all steps
-        for step in trajectory:
-            for i, angle in enumerate(step):
-                angles[i].append(angle)
-
-        # Plot each angle's variation over steps
-        for i in range(num_angles):
-            fig_angles.add_trace(
-                go.Scatter(
-                    x=angle_steps,
-                    y=angles[i],
-                    mode="lines+markers",
-                    name=f"Angle {i + 1}",
-                )
-            )
-
-        fig_angles.update_layout(
-            title="Joint Angles Variation",
-            xaxis_title="Step",
-            yaxis_title="Angle (radians)",
-        )
+    def drawTrajectory(self, trajectory, violations=None, path: str = None, maxPoints: int = 4000):
+        """
+        Draws a trajectory of joint angles, downsampled to maxPoints per joint (see trajectoryPlot.plotTrajectory).
 
-        fig_angles.show()
-    
+        Parameters:
+        - trajectory: Array-like of shape (N, 6).
+        - violations: Violations overlaid as markers, for example the result of checkSafeTrajectories.
+        - path: Write the figure to this .html or .png file instead of showing it.
+        - maxPoints: Maximum number of points drawn per joint.
+        """
+        from .trajectoryPlot import exportFigure, plotTrajectory
 
+        figure = plotTrajectory(trajectory, violations=violations, maxPoints=maxPoints)
+        if path is not None:
+            return exportFigure(figure, path)
+        figure.show()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,17 @@
 import os
 import pybullet as p
 
-def loadRobot():
+def loadRobot(basePosition=(0, 0, 0), baseOrientation=(0, 0, 0, 1), physicsClientId=0, geometry=None):
+    # geometry: None for the original meshes, "capsules" or "convex" for the simplified variants of collisionGeometry
     package_path = os.path.dirname(os.path.abspath(__file__))
-    urdf_path = os.path.join(package_path, "urdf", "iscoin_azz.urdf")
+    urdf_name = "iscoin_azz.urdf" if geometry is None else f"iscoin_azz_{geometry}.urdf"
+    urdf_path = os.path.join(package_path, "urdf", urdf_name)
 
     if not os.path.exists(urdf_path):
         raise FileNotFoundError(f"URDF file not found at {urdf_path}")
     print(f"Loading URDF from: {urdf_path}")
-    robot_id =  p.loadURDF(urdf_path, useFixedBase=True, flags=p.URDF_USE_SELF_COLLISION)
+    robot_id =  p.loadURDF(urdf_path, basePosition=list(basePosition), baseOrientation=list(baseOrientation),
+                           useFixedBase=True, flags=p.URDF_USE_SELF_COLLISION, physicsClientId=physicsClientId)
     return robot_id
 
 def loadPlane(): 
@@ -0,0 +1,311 @@
+import csv
+import os
+import re
+import time
+
+import numpy as np
+
+from .checkAnglesVariation import SPEED_LIMITS, getBatchVariation
+from .forwardKinematics import BatchForwardKinematic
+from .workingAreaChecking import isPointsInHalfOfSphere
+
+""" Replay of the sessions recorded by urbasic (ur_log/<date>/<time>/UrDataLog.csv and UrEvent.log)
+through the safety checks, without a robot """
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ur_log")
+
+DATA_LOG_NAME = "UrDataLog.csv"
+EVENT_LOG_NAME = "UrEvent.log"
+
+# 2025-03-24 14:16:16,991 - urbasic_rtdeEvent - ERROR - Lost some RTDE at 4971.235 - 87.99 milliseconds since last package
+EVENT_PATTERN = re.compile(
+    r"^(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (?P<source>\S+) - (?P<level>[A-Z]+) - (?P<message>.*)$"
+)
+RTDE_LOSS_PATTERN = re.compile(r"Lost some RTDE at .* - (?P<gap>[\d.]+) milliseconds")
+FLOAT_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+TIME_COLUMNS = ("timestamp", "time", "t")
+JOINT_COLUMNS = [f"actual_q_{i}" for i in range(6)]
+
+
+def readUrEvents(path):
+    """
+    Parses a UrEvent.log file.
+
+    Returns:
+    - A list of dictionaries with the time, source, level and message of each event.
+      Lines that do not follow the urbasic format are appended to the previous message.
+    """
+    events = []
+    if not os.path.exists(path):
+        return events
+
+    with open(path, "r", errors="replace") as file:
+        for line in file:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            match = EVENT_PATTERN.match(line)
+            if match:
+                events.append(match.groupdict())
+            elif events:
+                events[-1]["message"] += "\n" + line
+    return events
+
+
+def _parseHeader(row):
+    """
+    Finds the time and joint columns of a data log header.
+
+    Returns:
+    - (timeIndex, jointIndexes) where jointIndexes is either a list of 6 column indexes
+      or a single index of a column holding the 6 values as a list.
+    """
+    names = [name.strip().lower() for name in row]
+
+    timeIndex = next((names.index(name) for name in TIME_COLUMNS if name in names), 0)
+
+    if all(name in names for name in JOINT_COLUMNS):
+        return timeIndex, [names.index(name) for name in JOINT_COLUMNS]
+    if "actual_q" in names:
+        return timeIndex, names.index("actual_q")
+
+    raise ValueError(f"No joint position columns found in data log header: {row}")
+
+
+def _isNumeric(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def iterUrDataLog(path, chunkSize=4096):
+    """
+    Streams the joint positions recorded in a UrDataLog.csv file.
+
+    The file can either have a header naming the columns (timestamp and actual_q_0..actual_q_5,
+    or a single actual_q column holding the 6 values) or no header, in which case the first
+    column is the time and the next 6 columns are the joint positions.
+
+    Parameters:
+    - path: Path of the UrDataLog.csv file.
+    - chunkSize: Maximum number of samples per chunk.
+
+    Yields:
+    - (timestamps, angles) arrays of shape (n,) and (n, 6) with n <= chunkSize.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+
+    with open(path, "r", newline="", errors="replace") as file:
+        sample = file.read(4096)
+        file.seek(0)
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t").delimiter
+        except csv.Error:
+            delimiter = ","
+
+        reader = csv.reader(file, delimiter=delimiter)
+        timeIndex, jointIndexes = None, None
+        timestamps, angles = [], []
+
+        for row in reader:
+            if not row or not any(value.strip() for value in row):
+                continue
+
+            if jointIndexes is None:
+                if not _isNumeric(row[0]):
+                    timeIndex, jointIndexes = _parseHeader(row)
+                    continue
+                timeIndex, jointIndexes = 0, list(range(1, 7))
+
+            if isinstance(jointIndexes, list):
+                joints = [float(row[i]) for i in jointIndexes]
+            else:
+                joints = [float(value) for value in FLOAT_PATTERN.findall(row[jointIndexes])]
+            if len(joints) != 6:
+                continue
+
+            timestamps.append(float(row[timeIndex]))
+            angles.append(joints)
+
+            if len(timestamps) >= chunkSize:
+                yield np.array(timestamps), np.array(angles)
+                timestamps, angles = [], []
+
+        if timestamps:
+            yield np.array(timestamps), np.array(angles)
+
+
+class UrLogReplay():
+    def __init__(self, logDir: str = DEFAULT_LOG_DIR, chunkSize: int = 4096, checkCollision: bool = True,
+                 collisionChecker=None, areaRadius: float = 0.62, speedLimits: list = SPEED_LIMITS,
+                 maxViolations: int = 100, logs: bool = False):
+        """
+        Initializes the UrLogReplay class.
+
+        Parameters:
+        - logDir: Directory holding the <date>/<time> session folders.
+        - chunkSize: Number of samples checked together in one vectorized pass.
+        - checkCollision: Run the PyBullet collision check on the replayed samples.
+        - collisionChecker: Object exposing isValidConfiguration(angles), a RobotCollisionCheck
+          is created on first use if None.
+        - areaRadius: Radius of the working area hemisphere centered on the robot base.
+        - speedLimits: Speed limit of each joint in rad/s.
+        - maxViolations: Maximum number of violations listed per check in a report (all are counted).
+        - logs: Print a summary of each replayed session.
+        """
+        self.logDir = logDir
+        self.chunkSize = chunkSize
+        self.checkCollision = checkCollision
+        self.collisionChecker = collisionChecker
+        self.areaRadius = areaRadius
+        self.speedLimits = speedLimits
+        self.maxViolations = maxViolations
+        self.logs = logs
+
+        # Collision verdicts of already checked configurations, a robot standing still is only checked once
+        self._collisionCache = {}
+
+    def listSessions(self):
+        """
+        Returns the sessions found in the log directory as "<date>/<time>" strings.
+        """
+        sessions = []
+        for root, _, files in os.walk(self.logDir):
+            if DATA_LOG_NAME in files or EVENT_LOG_NAME in files:
+                sessions.append(os.path.relpath(root, self.logDir).replace(os.sep, "/"))
+        return sorted(sessions)
+
+    def _getCollisionChecker(self):
+        if self.collisionChecker is None:
+            # Imported here so that replaying without collision checking does not need PyBullet
+            from .collisionChecking import RobotCollisionCheck
+            self.collisionChecker = RobotCollisionCheck(False, self.logs)
+        return self.collisionChecker
+
+    def _checkCollisions(self, angles):
+        """
+        Returns a boolean array, True where the configuration is in collision.
+        Identical configurations (rounded to 1e-4 rad) are only simulated once.
+        """
+        rounded = np.round(angles, 4)
+        uniqueAngles, inverse = np.unique(rounded, axis=0, return_inverse=True)
+        collisions = np.zeros(len(uniqueAngles), dtype=bool)
+
+        for i, configuration in enumerate(uniqueAngles):
+            key = configuration.tobytes()
+            if key not in self._collisionCache:
+                isValid = self._getCollisionChecker().isValidConfiguration(configuration.tolist())
+                self._collisionCache[key] = not isValid
+            collisions[i] = self._collisionCache[key]
+
+        return collisions[inverse.reshape(-1)]
+
+    def _addViolations(self, report, indexes, timestamps, joints=None):
+        report["count"] += len(indexes)
+        room = self.maxViolations - len(report["violations"])
+        for k in range(min(room, len(indexes))):
+            violation = {"index": int(indexes[k]), "time": float(timestamps[k])}
+            if joints is not None:
+                violation["joints"] = joints[k]
+            report["violations"].append(violation)
+
+    def _summarizeEvents(self, events):
+        rtdeGaps = [float(match.group("gap")) for match in
+                    (RTDE_LOSS_PATTERN.search(event["message"]) for event in events) if match]
+        return {
+            "count": len(events),
+            "errors": sum(event["level"] in ("ERROR", "CRITICAL") for event in events),
+            "safetyStops": sum("Safety Stop" in event["message"] for event in events),
+            "rtdeLosses": len(rtdeGaps),
+            "maxRtdeGapMs": max(rtdeGaps, default=0.0),
+            "items": events[:self.maxViolations],
+        }
+
+    def replaySession(self, session: str):
+        """
+        Streams one recorded session through the velocity, working area and collision checks.
+
+        Parameters:
+        - session: "<date>/<time>" folder relative to the log directory.
+
+        Returns:
+        - A dictionary report with the number of samples, the violations of each check,
+          the events of the session and the replay speed compared to the recording.
+        """
+        start = time.perf_counter()
+        sessionDir = os.path.join(self.logDir, session)
+
+        report = {
+            "session": session,
+            "samples": 0,
+            "duration": 0.0,
+            "velocity": {"count": 0, "violations": []},
+            "area": {"count": 0, "violations": []},
+            "collision": {"count": 0, "violations": [], "checked": self.checkCollision},
+        }
+
+        firstTime, lastTime, lastAngles = None, None, None
+        offset = 0
+
+        for timestamps, angles in iterUrDataLog(os.path.join(sessionDir, DATA_LOG_NAME), self.chunkSize):
+            if firstTime is None:
+                firstTime = timestamps[0]
+
+            # Velocity, the last sample of the previous chunk is prepended to catch variations across chunks
+            if lastAngles is not None:
+                variation = getBatchVariation(np.vstack((lastAngles, angles)), np.concatenate(([lastTime], timestamps)), self.speedLimits)
+            else:
+                variation = np.vstack((np.zeros((1, 6), dtype=bool), getBatchVariation(angles, timestamps, self.speedLimits)))
+            rows = np.flatnonzero(variation.any(axis=1))
+            self._addViolations(report["velocity"], offset + rows, timestamps[rows],
+                                [[int(j) + 1 for j in np.flatnonzero(variation[i])] for i in rows[:self.maxViolations]])
+
+            # Working area, checked on the last joint like the real time checking
+            flange = BatchForwardKinematic(angles).getCoordinates()[:, -1]
+            rows = np.flatnonzero(~isPointsInHalfOfSphere(flange, 0, 0, 0, self.areaRadius))
+            self._addViolations(report["area"], offset + rows, timestamps[rows])
+
+            if self.checkCollision:
+                rows = np.flatnonzero(self._checkCollisions(angles))
+                self._addViolations(report["collision"], offset + rows, timestamps[rows])
+
+            offset += len(timestamps)
+            lastTime, lastAngles = timestamps[-1], angles[-1]
+
+        report["samples"] = offset
+        if firstTime is not None:
+            report["duration"] = float(lastTime - firstTime)
+        report["events"] = self._summarizeEvents(readUrEvents(os.path.join(sessionDir, EVENT_LOG_NAME)))
+        report["valid"] = not (report["velocity"]["count"] or report["area"]["count"] or report["collision"]["count"])
+
+        report["replayTime"] = time.perf_counter() - start
+        report["speedup"] = report["duration"] / report["replayTime"] if report["replayTime"] > 0 else 0.0
+
+        if self.logs:
+            print(f"Session {session}: {report['samples']} samples, "
+                  f"{report['velocity']['count']} velocity, {report['area']['count']} area, "
+                  f"{report['collision']['count']} collision violations, "
+                  f"{report['events']['errors']} errors in the event log")
+        return report
+
+    def replayAll(self):
+        """
+        Replays every session of the log directory.
+
+        Returns:
+        - The list of session reports.
+        """
+        return [self.replaySession(session) for session in self.listSessions()]
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    replay = UrLogReplay(checkCollision="--no-collision" not in sys.argv, logs=True)
+    sessions = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or replay.listSessions()
+    print(json.dumps([replay.replaySession(session) for session in sessions], indent=4))
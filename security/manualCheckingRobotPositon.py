@@ -1,22 +1,44 @@
 import numpy as np
 
-from .globalRobotChecking import GlobalRobotChecking
+from .backends import getChecker
+from .solutionSelection import selectBestSolutions
 
 
 class ValidateRobotPosition():
-    def __init__(self, allRobotPosition: list[list[list[float]]], logs = True, gui = False):
+    def __init__(self, allRobotPosition: list[list[list[float]]], logs = True, gui = False, backend: str = "pybullet", margin: float = 0.0):
+        """
+        Filters the solutions of the inverse kinematics of each waypoint.
+
+        Parameters:
+        - allRobotPosition: For each waypoint, the list of candidate joint angles.
+        - logs: Print the logs of the checks.
+        - gui: Show the PyBullet simulation.
+        - backend: "pybullet" to check the solutions one by one in the simulation, or any batch backend
+          of backends.getChecker ("analytic") to check all the solutions of a waypoint at once.
+        - margin: Minimum clearance in meters for the batch backends.
+        """
     
         self.allRobotPosition = allRobotPosition
         self.finalPositions = []
+        self.clearances = []  # Clearance of each valid solution, NaN when the backend does not compute it
         self.line= []
-        self.checkingTasks = GlobalRobotChecking(logs,gui)
+        self.backend = backend
+        if backend == "pybullet":
+            from .globalRobotChecking import GlobalRobotChecking
+            self.checkingTasks = GlobalRobotChecking(logs,gui)
+        else:
+            self.checkingTasks = getChecker(backend, logs, gui, margin)
         for i in range(len(self.allRobotPosition)):
             self.robotPosition = self.allRobotPosition[i]
 
             
             self.line = []
-            for i in range(0,len(self.robotPosition)):
-                self._validate(self.robotPosition[i])
+            if backend == "pybullet":
+                for i in range(0,len(self.robotPosition)):
+                    self._validate(self.robotPosition[i])
+                self.clearances.append(np.full(len(self.line), np.nan))
+            else:
+                self._validateBatch(self.robotPosition)
         
             self.finalPositions.append(self.line)
 
@@ -27,4 +49,20 @@ class ValidateRobotPosition():
         if len(angle) != 0:
             self.line.append(angles)
 
+    def _validateBatch(self, solutions: list[list[float]]):
+        valid, clearances = self.checkingTasks.checkBatch(np.asarray(solutions, dtype=float).reshape(-1, 6))
+        self.line = [solutions[k] for k in np.flatnonzero(valid)]
+        self.clearances.append(clearances[valid])
+
+    def selectBestSolutions(self, startAngles: list = None, **weights):
+        """
+        Picks one valid solution per waypoint, see solutionSelection.selectBestSolutions for the weights.
+
+        Parameters:
+        - startAngles: Current joint angles of the robot.
 
+        Returns:
+        - The list of the chosen joint angles, one per waypoint.
+        """
+        _, solutions, _ = selectBestSolutions(self.finalPositions, self.clearances, startAngles, **weights)
+        return solutions
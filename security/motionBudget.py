@@ -0,0 +1,88 @@
+import numpy as np
+
+from .batchCollisionChecking import AREA_BOUNDS, GROUND_LINKS, SELF_COLLISION_PAIRS
+from .capsules import LINK_RADII, MESH_INFLATION, TOOL_LENGTH, getCapsules, segmentDistances
+from .sweptVolume import getLeverArms
+
+""" Joint motion guaranteed safe around a configuration that passed the full check, so that the real-time
+checking only runs the full check again once the robot has moved enough """
+
+
+class MotionBudget():
+    def __init__(self, margin: float = 0.0, inflation: float = MESH_INFLATION, areaMargin: float = 0.01,
+                 toolLength: float = TOOL_LENGTH, scene=None):
+        """
+        Initializes the MotionBudget class.
+
+        When the joints move by dq from a reference configuration, a point of the link l moves by at most
+        sum_j |dq_j| * arm(j, l), with the lever arms of sweptVolume.getLeverArms. Relative to a link a, the
+        link b > a only moves with the joints after a, so the clearance between both decreases by at most
+        sum_{j > a} |dq_j| * arm(j, b). A configuration is within the budget while these bounds stay below the
+        clearance of each pair of inflated capsules, of each link and the ground, of each link and the scene, and
+        below the distance of the pen to the border of the working area, all measured at the reference.
+
+        Parameters:
+        - margin: Clearance in meters kept at the end of the budget.
+        - inflation: Added to the radius of every capsule, so that they enclose the meshes of the simulation.
+        - areaMargin: Distance in meters kept between the pen and the border of the working area.
+        - toolLength: Length of the pen.
+        - scene: Scene with the obstacles and other robots of the cell. The budget ends when another robot of the
+          scene moves.
+        """
+        self.margin = margin
+        self.areaMargin = areaMargin
+        self.toolLength = toolLength
+        self.radii = LINK_RADII + inflation
+        self.scene = scene
+
+        # Bound of the decrease of each clearance per radian of each joint: pairs, ground, working area
+        arms = getLeverArms(toolLength)
+        first, second = SELF_COLLISION_PAIRS[:, 0], SELF_COLLISION_PAIRS[:, 1]
+        pairArms = arms[:, second].T * (np.arange(6) > first[:, None])
+        sceneArms = arms.T if scene is not None else np.zeros((0, 6))
+        self.arms = np.vstack((pairArms, arms[:, GROUND_LINKS].T, arms[:, -1], sceneArms))
+        self.reference = None  # Configuration of the last full check, None when the budget is used up
+        self.slacks = None  # Clearances and distance to the border of the working area at the reference
+        self.robotAngles = None  # Angles of the other robots of the scene at the reference
+
+    def _getSlacks(self, angles):
+        starts, ends = getCapsules([angles], toolLength=self.toolLength)
+        first, second = SELF_COLLISION_PAIRS[:, 0], SELF_COLLISION_PAIRS[:, 1]
+        pairClearances = segmentDistances(starts[:, first], ends[:, first], starts[:, second], ends[:, second])[0] \
+            - self.radii[first] - self.radii[second]
+        groundClearances = np.minimum(starts[0, GROUND_LINKS, 2], ends[0, GROUND_LINKS, 2]) - self.radii[GROUND_LINKS]
+        tip = ends[0, -1]
+        areaDistance = np.min(np.concatenate((tip - AREA_BOUNDS[0], AREA_BOUNDS[1] - tip))) - self.areaMargin
+        # Clearances to the scene are capped at its maxDistance, which only lowers them
+        sceneClearances = self.scene.capsuleClearances(starts, ends, self.radii)[0] - self.margin if self.scene is not None else []
+        return np.concatenate((pairClearances - self.margin, groundClearances - self.margin, [areaDistance], sceneClearances))
+
+    def _getRobotAngles(self):
+        return [list(robot.angles) for robot in self.scene.robots] if self.scene is not None else []
+
+    def reset(self, angles: list):
+        """
+        Starts a new budget around a configuration that passed the full check.
+
+        Returns:
+        - The smallest slack in meters of the budget, 0 when nothing can be skipped.
+        """
+        angles = np.asarray(angles, dtype=float)
+        self.slacks = self._getSlacks(angles)
+        self.robotAngles = self._getRobotAngles()
+        self.reference = angles if np.all(self.slacks > 0) else None
+        return float(self.slacks.min()) if self.reference is not None else 0.0
+
+    def invalidate(self):
+        """
+        Ends the budget, the next configuration needs the full check.
+        """
+        self.reference = None
+
+    def isWithinBudget(self, angles: list):
+        """
+        Checks with one small matrix product whether a configuration is proven safe by the last full check.
+        """
+        if self.reference is None or self._getRobotAngles() != self.robotAngles:
+            return False
+        return bool(np.all(self.arms @ np.abs(np.asarray(angles, dtype=float) - self.reference) < self.slacks))
@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+from itertools import combinations
+from math import radians
+import threading
+import time
+
+import numpy as np
+
+from .capsules import LINK_NAMES, LINK_RADII, getCapsules, segmentDistances
+from .checkAnglesVariation import SPEED_LIMITS
+
+
+class MultiRobotChecking():
+    def __init__(self, robots: dict, baseTransforms: dict = None, interval: float = 0.1, logs=True,
+                 stopOnViolation: bool = False, sharedWorkspaces: list = None, interRobotMargin: float = 0.05,
+                 collisionChecker=None, workers: int = None):
+        """
+        Initializes the MultiRobotChecking class, supervising several arms from one thread.
+
+        Parameters:
+        - robots: Dictionary name -> ISCoin of the supervised robots.
+        - baseTransforms: Dictionary name -> 4x4 transform of each robot base in the cell (see capsules.makeBaseTransform),
+          identity for missing robots.
+        - interval: Time interval of the checking loop.
+        - logs: Print the violations.
+        - stopOnViolation: Stop a robot with stopj when one of its positions is not valid, the other robots keep running.
+        - sharedWorkspaces: List of tuples of robot names whose arms can reach each other, all pairs if None.
+        - interRobotMargin: Minimum distance in meters between the links of two robots.
+        - collisionChecker: Shared object exposing isValidConfiguration(angles) for the self and ground collisions,
+          a single RobotCollisionCheck is created if None.
+        - workers: Number of threads acquiring the joint positions, one per robot if None.
+        """
+        self.robots = robots
+        self.names = list(robots)
+        self.baseTransforms = {name: np.eye(4) for name in self.names}
+        self.baseTransforms.update(baseTransforms or {})
+        self.interval = interval
+        self.logs = logs
+        self.stopOnViolation = stopOnViolation
+        self.interRobotMargin = interRobotMargin
+
+        if sharedWorkspaces is None:
+            self.robotPairs = list(combinations(self.names, 2))
+        else:
+            self.robotPairs = sorted({pair for group in sharedWorkspaces for pair in combinations(group, 2)})
+
+        if collisionChecker is None:
+            from .collisionChecking import RobotCollisionCheck
+            collisionChecker = RobotCollisionCheck(False, logs)
+        self.checkingCollison = collisionChecker
+
+        self._executor = ThreadPoolExecutor(max_workers=workers or len(self.names), thread_name_prefix="acquisition")
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.running = False
+
+        self.angles = {}  # Latest joint angles of each robot
+        self.oldAngles = {}  # Joint angles of each robot at the previous tick
+        self.lastCheckTime = None
+        self.isValid = {name: True for name in self.names}
+        self.stopped = {name: False for name in self.names}
+        self.stats = {"ticks": 0, "totalCheckTime": 0.0, "maxCheckTime": 0.0, "overruns": 0}
+
+    def start(self):
+        """
+        Starts the real-time checking of all robots in a separate thread.
+        """
+        self.running = True
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run_task, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the real-time checking.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _acquire(self, name):
+        return self.robots[name].robot_control.get_actual_joint_positions().toList()
+
+    def _acquireAll(self):
+        """
+        Reads the joint positions of all robots concurrently.
+        """
+        return dict(zip(self.names, self._executor.map(self._acquire, self.names)))
+
+    def _run_task(self):
+        """
+        The task that runs periodically to check all robots.
+        """
+        self.oldAngles = self._acquireAll()
+        self.lastCheckTime = time.perf_counter()
+        while not self._stop_event.is_set():
+            start = time.perf_counter()
+            self.angles = self._acquireAll()
+            deltaT = start - self.lastCheckTime
+            self.lastCheckTime = start
+
+            results = self.checkPoses(self.angles, self.oldAngles, deltaT)
+            self.oldAngles = self.angles
+
+            for name, result in results.items():
+                if not result["valid"]:
+                    self.isValid[name] = False
+                    if self.logs:
+                        print(f"Robot {name} is not in a valid position: {result}")
+                    if self.stopOnViolation and not self.stopped[name]:
+                        self._stopRobot(name)
+
+            elapsed = time.perf_counter() - start
+            self.stats["ticks"] += 1
+            self.stats["totalCheckTime"] += elapsed
+            self.stats["maxCheckTime"] = max(self.stats["maxCheckTime"], elapsed)
+            if elapsed > self.interval:
+                self.stats["overruns"] += 1
+            self._stop_event.wait(max(0.0, self.interval - elapsed))
+        self.running = False
+
+    def _stopRobot(self, name):
+        radAcc = radians(5)
+        self.robots[name].robot_control.stopj([radAcc, radAcc, radAcc, radAcc, radAcc, radAcc])
+        self.stopped[name] = True
+
+    def checkInterRobot(self, angles: dict):
+        """
+        Computes the distance between the links of every pair of robots sharing a workspace.
+
+        Parameters:
+        - angles: Dictionary name -> joint angles.
+
+        Returns:
+        - A list of (robot1, robot2, link1, link2, clearance) for the pairs closer than the margin.
+        """
+        names = [name for name in self.names if name in angles]
+        pairs = [(a, b) for a, b in self.robotPairs if a in angles and b in angles]
+        if not pairs:
+            return []
+
+        # Capsules of all robots in one batch, then each robot is moved to its base pose
+        starts, ends = getCapsules([angles[name] for name in names])
+        for k, name in enumerate(names):
+            rotation, translation = self.baseTransforms[name][:3, :3], self.baseTransforms[name][:3, 3]
+            starts[k] = starts[k] @ rotation.T + translation
+            ends[k] = ends[k] @ rotation.T + translation
+
+        index = {name: k for k, name in enumerate(names)}
+        first = np.array([index[a] for a, _ in pairs])
+        second = np.array([index[b] for _, b in pairs])
+
+        # (pairs, links, links) distances between all links of both robots
+        distances = segmentDistances(starts[first][:, :, None], ends[first][:, :, None],
+                                     starts[second][:, None, :], ends[second][:, None, :])
+        clearances = distances - (LINK_RADII[:, None] + LINK_RADII[None, :])
+
+        collisions = []
+        for p, l1, l2 in zip(*np.nonzero(clearances < self.interRobotMargin)):
+            a, b = pairs[p]
+            collisions.append((a, b, LINK_NAMES[l1], LINK_NAMES[l2], float(clearances[p, l1, l2])))
+        return collisions
+
+    def checkPoses(self, angles: dict, oldAngles: dict = None, deltaT: float = None):
+        """
+        Checks the latest poses of all robots together.
+
+        Parameters:
+        - angles: Dictionary name -> joint angles.
+        - oldAngles: Dictionary name -> joint angles at the previous check, for the speed check.
+        - deltaT: Time in seconds since the previous check.
+
+        Returns:
+        - A dictionary name -> {"valid", "highVariations", "collision", "interRobot"} for each robot.
+        """
+        results = {name: {"valid": True, "highVariations": [], "collision": False, "interRobot": []} for name in angles}
+
+        # Speed of all robots at once
+        if oldAngles and deltaT:
+            names = [name for name in angles if name in oldAngles]
+            if names:
+                speeds = np.abs(np.array([angles[n] for n in names]) - np.array([oldAngles[n] for n in names])) / deltaT
+                for name, row in zip(names, speeds > np.asarray(SPEED_LIMITS)):
+                    results[name]["highVariations"] = [int(j) + 1 for j in np.flatnonzero(row)]
+
+        # Self and ground collisions in the shared simulator, identical poses are only simulated once
+        verdicts = {}
+        for name, robotAngles in angles.items():
+            key = tuple(np.round(robotAngles, 4))
+            if key not in verdicts:
+                verdicts[key] = self.checkingCollison.isValidConfiguration(list(robotAngles))
+            results[name]["collision"] = not verdicts[key]
+
+        for a, b, linkA, linkB, clearance in self.checkInterRobot(angles):
+            results[a]["interRobot"].append((b, linkA, linkB, clearance))
+            results[b]["interRobot"].append((a, linkB, linkA, clearance))
+
+        for result in results.values():
+            result["valid"] = not (result["highVariations"] or result["collision"] or result["interRobot"])
+        return results
@@ -0,0 +1,195 @@
+import json
+import os
+
+import numpy as np
+
+from .backends import getChecker
+from .batchCollisionChecking import AREA_BOUNDS
+from .capsules import TOOL_LENGTH, getCapsules
+
+""" Voxel map of the working area telling which pen tip positions are reached by a collision free configuration,
+built offline from random configurations and saved as a NumPy array that can be memory mapped """
+
+# One voxel: reached by at least one valid configuration, and best clearance of those configurations
+# (-inf when not reached, NaN when only reached by configurations of a backend that does not compute the clearances)
+VOXEL_DTYPE = np.dtype([("reachable", "?"), ("clearance", "<f4")])
+
+
+class ReachabilityMap():
+    def __init__(self, voxels=None, bounds=AREA_BOUNDS, voxelSize: float = 0.02):
+        """
+        Initializes the ReachabilityMap class, an empty map when voxels is None.
+
+        Parameters:
+        - voxels: Array of VOXEL_DTYPE of shape (nx, ny, nz), possibly memory mapped.
+        - bounds: Lower and upper corners of the mapped box in meters, the working area by default.
+        - voxelSize: Edge of a voxel in meters.
+        """
+        self.bounds = np.asarray(bounds, dtype=float)
+        self.voxelSize = float(voxelSize)
+        self.shape = tuple(int(n) for n in np.ceil((self.bounds[1] - self.bounds[0]) / self.voxelSize - 1e-9))
+        if voxels is None:
+            voxels = np.zeros(self.shape, dtype=VOXEL_DTYPE)
+            voxels["clearance"] = -np.inf
+        elif voxels.shape != self.shape:
+            raise ValueError(f"Voxels of shape {voxels.shape}, expected {self.shape} for these bounds and voxel size")
+        self.voxels = voxels
+        self.samples = 0  # Number of configurations added since the creation
+
+    @staticmethod
+    def build(samples: int = 1000000, voxelSize: float = 0.02, backend: str = "analytic", margin: float = 0.0,
+              scene=None, bounds=AREA_BOUNDS, chunkSize: int = 100000, seed: int = 0, logs: bool = False):
+        """
+        Builds a map from random configurations checked with a collision backend.
+
+        Parameters:
+        - samples: Number of random configurations.
+        - voxelSize: Edge of a voxel in meters.
+        - backend: Collision backend (see backends.getChecker), "analytic" is the only one fast enough for
+          millions of configurations.
+        - margin: Minimum clearance of the configurations.
+        - scene: Scene with the obstacles and other robots of the cell.
+        - bounds: Lower and upper corners of the mapped box.
+        - chunkSize: Number of configurations checked together.
+        - seed: Seed of the random configurations.
+        - logs: Print the progress.
+        """
+        reachability = ReachabilityMap(bounds=bounds, voxelSize=voxelSize)
+        checker = getChecker(backend, margin=margin, scene=scene)
+        rng = np.random.default_rng(seed)
+        for start in range(0, samples, chunkSize):
+            reachability.addConfigurations(rng.uniform(-np.pi, np.pi, (min(chunkSize, samples - start), 6)), checker)
+            if logs:
+                print(f"{reachability.samples} configurations, {reachability.coverage():.1%} of the voxels reached")
+        return reachability
+
+    def _indexes(self, points):
+        """
+        Returns the (nx, ny, nz) indexes of the voxel of each point, and whether the point is in the map.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 3)
+        indexes = np.floor((points - self.bounds[0]) / self.voxelSize).astype(np.int64)
+        inside = np.all((points >= self.bounds[0]) & (points <= self.bounds[1]), axis=1)
+        # Points on the upper faces belong to the last voxel
+        indexes = np.minimum(np.maximum(indexes, 0), np.array(self.shape) - 1)
+        return indexes, inside
+
+    def addConfigurations(self, configs, checker=None, toolLength: float = TOOL_LENGTH):
+        """
+        Adds the pen tip positions of the valid configurations of a batch.
+
+        Parameters:
+        - configs: Array-like of shape (N, 6) with the joint angles.
+        - checker: Collision checker with a checkBatch method, the analytic one if None.
+        - toolLength: Length of the pen.
+        """
+        configs = np.asarray(configs, dtype=float).reshape(-1, 6)
+        valid, clearances = (checker or getChecker("analytic")).checkBatch(configs)
+        tips = getCapsules(configs[valid], toolLength=toolLength)[1][:, -1]
+        indexes, inside = self._indexes(tips)
+
+        flat = np.ravel_multi_index(indexes[inside].T, self.shape)
+        voxels = self.voxels.reshape(-1)  # View of the voxels, the fields of a reshaped field would be copies
+        voxels["reachable"][flat] = True
+        clearances = clearances[valid][inside].astype(np.float32)
+        np.fmax.at(voxels["clearance"], flat, clearances)
+        # fmax keeps -inf against NaN, the voxels reached without a clearance are marked NaN until one is known
+        unknown = flat[np.isnan(clearances)]
+        voxels["clearance"][unknown[voxels["clearance"][unknown] == -np.inf]] = np.nan
+        self.samples += len(configs)
+
+    def _lookup(self, points, field: str, tolerance: int):
+        indexes, inside = self._indexes(points)
+        values = self.voxels[field][tuple(indexes.T)]
+        # Best value over the voxels at most tolerance voxels away, to cover the voxels missed by the sampling
+        for offset in np.ndindex(*(2 * tolerance + 1,) * 3):
+            if tolerance > 0:
+                neighbours = np.clip(indexes + np.array(offset) - tolerance, 0, np.array(self.shape) - 1)
+                other = self.voxels[field][tuple(neighbours.T)]
+                if field == "reachable":
+                    values = values | other
+                else:
+                    # A reached voxel without a clearance (NaN) wins over a voxel never reached (-inf)
+                    unknown = (np.isnan(values) & (other == -np.inf)) | ((values == -np.inf) & np.isnan(other))
+                    values = np.where(unknown, np.nan, np.fmax(values, other))
+        return values, inside
+
+    def isReachable(self, points, minClearance: float = None, tolerance: int = 0):
+        """
+        Checks pen tip targets in O(1) each, before running the inverse kinematics.
+
+        Parameters:
+        - points: Array-like of shape (N, 3) with the targets in meters.
+        - minClearance: Also require a best clearance of at least minClearance meters.
+        - tolerance: Accept the targets whose voxel is at most tolerance voxels away from a reached one.
+
+        Returns:
+        - A boolean array of shape (N,), False for the targets outside the map or in voxels never reached.
+
+        Raises:
+        - ValueError: When minClearance is given and a target is only reached by configurations without a
+          clearance (map built with the pybullet backend).
+        """
+        reachable, inside = self._lookup(points, "reachable", tolerance)
+        reachable = reachable & inside
+        if minClearance is not None:
+            clearances = self._lookup(points, "clearance", tolerance)[0]
+            if np.isnan(clearances[reachable]).any():
+                raise ValueError("minClearance needs the clearances, this map was built with a backend that does not compute them")
+            reachable &= clearances >= minClearance
+        return reachable
+
+    def getClearances(self, points, tolerance: int = 0):
+        """
+        Returns the best clearance of the voxel of each target, -inf outside the map or when never reached, NaN when
+        only reached by configurations without a clearance.
+        """
+        clearances, inside = self._lookup(points, "clearance", tolerance)
+        return np.where(inside, clearances, -np.inf)
+
+    def coverage(self):
+        """
+        Returns the fraction of the voxels reached by a valid configuration.
+        """
+        return float(np.count_nonzero(self.voxels["reachable"])) / self.voxels.size
+
+    def save(self, path: str):
+        """
+        Saves the voxels in a .npy file and the bounds and voxel size in a .json file next to it.
+        """
+        path = path if path.endswith(".npy") else path + ".npy"
+        np.save(path, np.asarray(self.voxels))
+        with open(path[:-len(".npy")] + ".json", "w") as file:
+            json.dump({"bounds": self.bounds.tolist(), "voxelSize": self.voxelSize, "samples": self.samples}, file, indent=4)
+        return path
+
+    @staticmethod
+    def load(path: str, mmap: bool = True):
+        """
+        Loads a map saved by save, the voxels are memory mapped and read only when mmap is set.
+        """
+        path = path if path.endswith(".npy") else path + ".npy"
+        with open(path[:-len(".npy")] + ".json", "r") as file:
+            metadata = json.load(file)
+        reachability = ReachabilityMap(np.load(path, mmap_mode="r" if mmap else None), metadata["bounds"], metadata["voxelSize"])
+        reachability.samples = metadata["samples"]
+        return reachability
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the reachability map of the working area")
+    parser.add_argument("output", nargs="?", default=os.path.join(os.getcwd(), "reachability.npy"))
+    parser.add_argument("--samples", type=int, default=1000000)
+    parser.add_argument("--voxel-size", type=float, default=0.02)
+    parser.add_argument("--margin", type=float, default=0.0)
+    parser.add_argument("--scene", help="JSON file of the scene")
+    args = parser.parse_args()
+
+    scene = None
+    if args.scene:
+        from .scene import Scene
+        scene = Scene.fromJson(args.scene)
+    reachability = ReachabilityMap.build(args.samples, args.voxel_size, margin=args.margin, scene=scene, logs=True)
+    print(f"Saved in {reachability.save(args.output)}")
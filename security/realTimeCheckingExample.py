@@ -19,6 +19,8 @@ def readJson(path):
 # UR3e1 IP (closest to window): 10.30.5.158
 # UR3e2 IP: 10.30.5.159
 iscoin = ISCoin(host="10.30.5.159", opened_gripper_size_mm=40)
+# Without hardware, a local stand-in robot can serve the trajectory instead (see fakeRobot.py):
+# iscoin = FakeISCoin(loadTrajectorySamples("security/trajectories_test/traj_test_collision_gripper.json", 125), rate=125)
 
 interval = 0.1 # in case of need you cam change the interval
 
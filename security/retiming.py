@@ -0,0 +1,109 @@
+import numpy as np
+
+from .checkAnglesVariation import SPEED_LIMITS
+
+""" Time optimal parameterization of a validated joint path under per joint velocity and acceleration limits.
+The path keeps the waypoints and the linear segments checked by Interpolation, only the timing changes """
+
+# Joint accelerations in rad/s^2, default acceleration of the movej of the UR controller
+ACCELERATION_LIMITS = [1.4, 1.4, 1.4, 1.4, 1.4, 1.4]
+
+
+def _densify(angles, maxStep: float):
+    """
+    Splits each segment into equal pieces of at most maxStep radians on every joint, and at least two pieces
+    so that the robot can accelerate and stop on a single segment.
+    """
+    points = [angles[0]]
+    for start, end in zip(angles[:-1], angles[1:]):
+        pieces = max(2, int(np.ceil(np.max(np.abs(end - start)) / maxStep)))
+        points.extend((1 - i / pieces) * start + (i / pieces) * end for i in range(1, pieces + 1))
+    return np.array(points)
+
+
+def retimeTrajectory(angles, velocityLimits=SPEED_LIMITS, accelerationLimits=ACCELERATION_LIMITS,
+                     maxStep: float = 0.05):
+    """
+    Computes the fastest timing of a joint path starting and ending at rest.
+
+    The path is made of the linear segments between the waypoints, as checked by Interpolation, and is followed
+    exactly: the robot stops at the waypoints where the direction of the path changes. Each segment is split
+    in points at most maxStep radians apart, and the path velocity at each point is the largest one from which
+    the next corner can still be reached at rest (backward pass) and reachable from the previous point (forward
+    pass). Between two points, the velocity of each joint changes linearly with the time.
+
+    Parameters:
+    - angles: Array-like of shape (N, 6) with the validated waypoints.
+    - velocityLimits: Speed limit of each joint in rad/s.
+    - accelerationLimits: Acceleration limit of each joint in rad/s^2.
+    - maxStep: Maximum motion of a joint between two emitted points, in radians.
+
+    Returns:
+    - (positions, times, velocities): arrays of shape (M, 6), (M,) in seconds and (M, 6) in rad/s, the
+      waypoints are among the positions.
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    # Repeated waypoints would need a zero duration
+    keep = np.concatenate(([True], np.any(np.diff(angles, axis=0) != 0, axis=1)))
+    angles = angles[keep]
+    if len(angles) < 2:
+        return angles, np.zeros(len(angles)), np.zeros_like(angles)
+
+    positions = _densify(angles, maxStep)
+    velocityLimits = np.asarray(velocityLimits, dtype=float)
+    accelerationLimits = np.asarray(accelerationLimits, dtype=float)
+
+    # Path parameter s: length of the path in joint space, the joints move along a unit direction on each piece
+    deltas = np.diff(positions, axis=0)
+    steps = np.linalg.norm(deltas, axis=1)
+    directions = deltas / steps[:, None]
+    with np.errstate(divide="ignore"):
+        # Largest squared path velocity and path acceleration of each piece
+        maxVelocities = np.min((velocityLimits / np.abs(directions)) ** 2, axis=1)
+        maxAccelerations = np.min(accelerationLimits / np.abs(directions), axis=1)
+
+    # Squared path velocity at each point, 0 at the ends and the corners
+    limits = np.minimum(np.concatenate(([0.0], maxVelocities)), np.concatenate((maxVelocities, [0.0])))
+    corners = np.linalg.norm(directions[1:] - directions[:-1], axis=1) > 1e-9
+    limits[1:-1][corners] = 0.0
+
+    # Backward pass: slow enough to stop at the next corner
+    for k in range(len(positions) - 2, -1, -1):
+        limits[k] = min(limits[k], limits[k + 1] + 2 * steps[k] * maxAccelerations[k])
+    # Forward pass: accelerate as much as possible
+    squared = np.zeros(len(positions))
+    for k in range(len(positions) - 1):
+        squared[k + 1] = min(limits[k + 1], squared[k] + 2 * steps[k] * maxAccelerations[k])
+
+    speeds = np.sqrt(squared)
+    durations = 2 * steps / (speeds[:-1] + speeds[1:])
+    times = np.concatenate(([0.0], np.cumsum(durations)))
+    # At a corner the velocity is 0, elsewhere both pieces around a point have the same direction
+    velocities = np.vstack((directions, directions[-1:])) * speeds[:, None]
+    return positions, times, velocities
+
+
+def toModTraj(positions, times, velocities):
+    """
+    Returns the trajectory in the format of the trajectory files: {"modTraj": [{"positions", "velocities",
+    "time_from_start": [seconds, nanoseconds]}, ...]}.
+    """
+    points = []
+    for position, time, velocity in zip(positions, times, velocities):
+        seconds, nanoseconds = divmod(int(round(time * 1e9)), 1000000000)
+        points.append({
+            "positions": [float(angle) for angle in position],
+            "velocities": [float(speed) for speed in velocity],
+            "time_from_start": [seconds, nanoseconds],
+        })
+    return {"modTraj": points}
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    with open(sys.argv[1], "r") as file:
+        waypoints = [point["positions"] for point in json.load(file)["modTraj"]]
+    positions, times, velocities = retimeTrajectory(waypoints)
+    print(json.dumps(toModTraj(positions, times, velocities)))
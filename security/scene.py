@@ -0,0 +1,459 @@
+import json
+import math
+import os
+import struct
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .capsules import LINK_RADII, getCapsules, makeBaseTransform, segmentDistances
+
+""" Description of the cell around the robot: static obstacles and other robots, with a uniform grid
+to only test the obstacles close to the robot """
+
+# Distance beyond the margin of a check up to which the clearances are computed, when it exceeds maxDistance
+MARGIN_CLEARANCE = 0.01
+
+
+def readStl(path):
+    """
+    Reads the vertices of an STL file (binary or ascii).
+
+    Returns:
+    - An array of shape (3 * number of triangles, 3) with the vertices of each triangle.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) >= 84:
+        count = struct.unpack("<I", data[80:84])[0]
+        if len(data) == 84 + 50 * count:
+            triangles = np.frombuffer(data[84:], dtype=np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")]))
+            return triangles["vertices"].reshape(-1, 3).astype(float)
+
+    vertices = [line.split()[1:4] for line in data.decode(errors="replace").splitlines() if line.strip().startswith("vertex")]
+    return np.array(vertices, dtype=float).reshape(-1, 3)
+
+
+def _segmentDistancesToConvex(pointDistances, starts, ends, iterations: int = 30):
+    """
+    Minimum distance between segments and a convex obstacle, found by golden section search of the
+    (convex) distance along each segment.
+
+    Parameters:
+    - pointDistances: Function returning the distance of an array of points (..., 3) to the obstacle.
+    - starts, ends: Arrays of shape (..., 3) with the end points of the segments.
+    """
+    direction = ends - starts
+    lo = np.zeros(starts.shape[:-1])
+    hi = np.ones(starts.shape[:-1])
+    invPhi = (math.sqrt(5) - 1) / 2
+    for _ in range(iterations):
+        c = hi - (hi - lo) * invPhi
+        d = lo + (hi - lo) * invPhi
+        closer = pointDistances(starts + c[..., None] * direction) < pointDistances(starts + d[..., None] * direction)
+        hi = np.where(closer, d, hi)
+        lo = np.where(closer, lo, c)
+    middle = pointDistances(starts + ((lo + hi) / 2)[..., None] * direction)
+    return np.minimum(middle, np.minimum(pointDistances(starts), pointDistances(ends)))
+
+
+class BoxObstacle():
+    def __init__(self, center, halfExtents, name: str = None):
+        """
+        Axis aligned box.
+
+        Parameters:
+        - center: Center of the box in the world.
+        - halfExtents: Half size of the box along x, y and z.
+        """
+        self.center = np.asarray(center, dtype=float)
+        self.halfExtents = np.asarray(halfExtents, dtype=float)
+        self.name = name or "box"
+
+    def aabb(self):
+        return self.center - self.halfExtents, self.center + self.halfExtents
+
+    def pointDistances(self, points):
+        outside = np.maximum(np.abs(points - self.center) - self.halfExtents, 0.0)
+        return np.sqrt(np.sum(outside * outside, axis=-1))
+
+    def createInPybullet(self, client):
+        import pybullet as p
+        shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=self.halfExtents.tolist(), physicsClientId=client)
+        return p.createMultiBody(0, shape, basePosition=self.center.tolist(), physicsClientId=client)
+
+
+class CylinderObstacle():
+    def __init__(self, center, radius: float, height: float, name: str = None):
+        """
+        Cylinder with a vertical axis.
+
+        Parameters:
+        - center: Center of the cylinder (middle of the axis) in the world.
+        - radius: Radius of the cylinder.
+        - height: Height of the cylinder.
+        """
+        self.center = np.asarray(center, dtype=float)
+        self.radius = float(radius)
+        self.height = float(height)
+        self.name = name or "cylinder"
+
+    def aabb(self):
+        halfExtents = np.array([self.radius, self.radius, self.height / 2])
+        return self.center - halfExtents, self.center + halfExtents
+
+    def pointDistances(self, points):
+        offset = points - self.center
+        radial = np.maximum(np.sqrt(offset[..., 0]**2 + offset[..., 1]**2) - self.radius, 0.0)
+        axial = np.maximum(np.abs(offset[..., 2]) - self.height / 2, 0.0)
+        return np.sqrt(radial**2 + axial**2)
+
+    def createInPybullet(self, client):
+        import pybullet as p
+        shape = p.createCollisionShape(p.GEOM_CYLINDER, radius=self.radius, height=self.height, physicsClientId=client)
+        return p.createMultiBody(0, shape, basePosition=self.center.tolist(), physicsClientId=client)
+
+
+class SphereObstacle():
+    def __init__(self, center, radius: float, name: str = None):
+        self.center = np.asarray(center, dtype=float)
+        self.radius = float(radius)
+        self.name = name or "sphere"
+
+    def aabb(self):
+        return self.center - self.radius, self.center + self.radius
+
+    def pointDistances(self, points):
+        return np.maximum(np.sqrt(np.sum((points - self.center)**2, axis=-1)) - self.radius, 0.0)
+
+    def createInPybullet(self, client):
+        import pybullet as p
+        shape = p.createCollisionShape(p.GEOM_SPHERE, radius=self.radius, physicsClientId=client)
+        return p.createMultiBody(0, shape, basePosition=self.center.tolist(), physicsClientId=client)
+
+
+class MeshObstacle():
+    def __init__(self, path: str, position=(0.0, 0.0, 0.0), scale: float = 1.0, name: str = None):
+        """
+        Mesh loaded from an STL file. The analytic checks use its bounding box, PyBullet the mesh itself.
+
+        Parameters:
+        - path: Path of the STL file.
+        - position: Position of the mesh origin in the world.
+        - scale: Scale applied to the mesh.
+        """
+        self.path = path
+        self.position = np.asarray(position, dtype=float)
+        self.scale = float(scale)
+        self.name = name or os.path.basename(path)
+
+        vertices = readStl(path) * self.scale + self.position
+        self._box = BoxObstacle((vertices.min(axis=0) + vertices.max(axis=0)) / 2, (vertices.max(axis=0) - vertices.min(axis=0)) / 2)
+
+    def aabb(self):
+        return self._box.aabb()
+
+    def pointDistances(self, points):
+        return self._box.pointDistances(points)
+
+    def createInPybullet(self, client):
+        import pybullet as p
+        shape = p.createCollisionShape(p.GEOM_MESH, fileName=self.path, meshScale=[self.scale] * 3, physicsClientId=client)
+        return p.createMultiBody(0, shape, basePosition=self.position.tolist(), physicsClientId=client)
+
+
+class UrdfObstacle():
+    def __init__(self, path: str, position=(0.0, 0.0, 0.0), name: str = None):
+        """
+        Static object described by a URDF file. The analytic checks use the box, cylinder, sphere and mesh
+        collision elements of its links (placed with their origin xyz, the links are expected to be fixed together).
+
+        Parameters:
+        - path: Path of the URDF file.
+        - position: Position of the base of the object in the world.
+
+        Raises:
+        - ValueError: When no collision element of the file can be used by the analytic checks.
+        """
+        self.path = path
+        self.position = np.asarray(position, dtype=float)
+        self.name = name or os.path.basename(path)
+        self.parts = []
+
+        for collision in ET.parse(path).getroot().iter("collision"):
+            origin = collision.find("origin")
+            center = self.position + (np.array(origin.get("xyz", "0 0 0").split(), dtype=float) if origin is not None else 0.0)
+            geometry = collision.find("geometry")
+            if geometry is None:
+                continue
+            for shape in geometry:
+                if shape.tag == "box":
+                    self.parts.append(BoxObstacle(center, np.array(shape.get("size").split(), dtype=float) / 2))
+                elif shape.tag == "cylinder":
+                    self.parts.append(CylinderObstacle(center, float(shape.get("radius")), float(shape.get("length"))))
+                elif shape.tag == "sphere":
+                    self.parts.append(SphereObstacle(center, float(shape.get("radius"))))
+                elif shape.tag == "mesh":
+                    meshPath = os.path.join(os.path.dirname(path), shape.get("filename").replace("package://", ""))
+                    scale = float(shape.get("scale", "1").split()[0])
+                    self.parts.append(MeshObstacle(meshPath, center, scale))
+        if not self.parts:
+            raise ValueError(f"No box, cylinder, sphere or mesh collision element found in {path}")
+
+    def aabb(self):
+        boxes = [part.aabb() for part in self.parts]
+        return np.min([box[0] for box in boxes], axis=0), np.max([box[1] for box in boxes], axis=0)
+
+    def pointDistances(self, points):
+        return np.min([part.pointDistances(points) for part in self.parts], axis=0)
+
+    def segmentDistances(self, starts, ends):
+        # The union of convex parts is not convex, each part is searched on its own
+        return np.min([_segmentDistancesToConvex(part.pointDistances, starts, ends) for part in self.parts], axis=0)
+
+    def createInPybullet(self, client):
+        import pybullet as p
+        return p.loadURDF(self.path, basePosition=self.position.tolist(), useFixedBase=True, physicsClientId=client)
+
+
+class OtherRobot():
+    def __init__(self, name: str, position=(0.0, 0.0, 0.0), yaw: float = 0.0, angles: list = None):
+        """
+        Another UR3e of the cell.
+
+        Parameters:
+        - name: Name of the robot.
+        - position, yaw: Pose of the robot base in the world.
+        - angles: Current joint angles of the robot.
+        """
+        self.name = name
+        self.position = np.asarray(position, dtype=float)
+        self.yaw = float(yaw)
+        self.baseTransform = makeBaseTransform(self.position, self.yaw)
+        self.jointIndexes = {}  # Indexes of the arm joints of each PyBullet body, (body, client): indexes
+        self.setAngles(angles if angles is not None else [0.0, -math.pi / 2, 0.0, -math.pi / 2, 0.0, 0.0])
+
+    def setAngles(self, angles: list):
+        self.angles = list(angles)
+        starts, ends = getCapsules([self.angles], self.baseTransform)
+        self.starts, self.ends = starts[0], ends[0]
+
+    def aabb(self):
+        points = np.vstack((self.starts, self.ends))
+        margin = LINK_RADII.max()
+        return points.min(axis=0) - margin, points.max(axis=0) + margin
+
+    def segmentDistances(self, starts, ends):
+        distances = segmentDistances(starts[..., None, :], ends[..., None, :], self.starts, self.ends)
+        return np.min(distances - LINK_RADII, axis=-1)
+
+    def createInPybullet(self, client):
+        import pybullet as p
+        from .loadUrdf import loadRobot
+        orientation = p.getQuaternionFromEuler([0.0, 0.0, self.yaw])
+        body = loadRobot(self.position.tolist(), orientation, physicsClientId=client)
+        self.updateInPybullet(body, client)
+        return body
+
+    def getJointIndexes(self, body: int, client: int = 0):
+        """
+        Returns the indexes of the arm joints of a PyBullet body, its first 6 revolute joints, read once per body.
+        """
+        import pybullet as p
+        if (body, client) not in self.jointIndexes:
+            joints = [j for j in range(p.getNumJoints(body, physicsClientId=client))
+                      if p.getJointInfo(body, j, physicsClientId=client)[2] == p.JOINT_REVOLUTE]
+            self.jointIndexes[(body, client)] = joints[:len(self.angles)]
+        return self.jointIndexes[(body, client)]
+
+    def updateInPybullet(self, body: int, client: int = 0):
+        import pybullet as p
+        for joint, angle in zip(self.getJointIndexes(body, client), self.angles):
+            p.resetJointState(body, joint, angle, physicsClientId=client)
+
+
+class UniformGrid():
+    def __init__(self, cellSize: float = 0.1):
+        """
+        Uniform grid indexing the bounding boxes of the objects of a scene.
+
+        Parameters:
+        - cellSize: Size of the cells in meters.
+        """
+        self.cellSize = cellSize
+        self.cells = {}
+
+    def _cellRange(self, lower, upper):
+        first = np.floor(np.asarray(lower) / self.cellSize).astype(int)
+        last = np.floor(np.asarray(upper) / self.cellSize).astype(int)
+        return [(i, j, k) for i in range(first[0], last[0] + 1)
+                for j in range(first[1], last[1] + 1)
+                for k in range(first[2], last[2] + 1)]
+
+    def insert(self, index: int, lower, upper):
+        for cell in self._cellRange(lower, upper):
+            self.cells.setdefault(cell, []).append(index)
+
+    def remove(self, index: int, lower, upper):
+        for cell in self._cellRange(lower, upper):
+            self.cells[cell].remove(index)
+
+    def query(self, lower, upper):
+        """
+        Returns the sorted indexes of the objects whose bounding box may overlap the box [lower, upper].
+        """
+        first = np.floor(np.asarray(lower) / self.cellSize).astype(int)
+        last = np.floor(np.asarray(upper) / self.cellSize).astype(int)
+        found = set()
+        if np.prod(last - first + 1) > len(self.cells):
+            # Large query, cheaper to go through the occupied cells
+            for cell, indexes in self.cells.items():
+                if np.all(first <= cell) and np.all(np.asarray(cell) <= last):
+                    found.update(indexes)
+        else:
+            for cell in self._cellRange(lower, upper):
+                found.update(self.cells.get(cell, ()))
+        return sorted(found)
+
+
+OBSTACLE_TYPES = {
+    "box": lambda data: BoxObstacle(data["center"], data["halfExtents"], data.get("name")),
+    "cylinder": lambda data: CylinderObstacle(data["center"], data["radius"], data["height"], data.get("name")),
+    "sphere": lambda data: SphereObstacle(data["center"], data["radius"], data.get("name")),
+    "mesh": lambda data: MeshObstacle(data["path"], data.get("position", (0, 0, 0)), data.get("scale", 1.0), data.get("name")),
+    "urdf": lambda data: UrdfObstacle(data["path"], data.get("position", (0, 0, 0)), data.get("name")),
+}
+
+
+class Scene():
+    def __init__(self, obstacles: list = None, robots: list = None, cellSize: float = 0.1, maxDistance: float = 0.1):
+        """
+        Initializes the Scene class.
+
+        Parameters:
+        - obstacles: List of static obstacles (BoxObstacle, CylinderObstacle, SphereObstacle, MeshObstacle, UrdfObstacle).
+        - robots: List of OtherRobot sharing the cell.
+        - cellSize: Size of the cells of the spatial index.
+        - maxDistance: Distance beyond which the obstacles are not looked at, clearances are capped at this value.
+        """
+        self.obstacles = []
+        self.robots = []
+        self.items = []  # Obstacles and robots in the order they were added, indexed by the grid
+        self.maxDistance = maxDistance
+        self.grid = UniformGrid(cellSize)
+        self.revision = 0  # Incremented at each change of the scene, so that cached verdicts can be invalidated
+
+        for obstacle in obstacles or []:
+            self.addObstacle(obstacle)
+        for robot in robots or []:
+            self.addRobot(robot)
+
+    @staticmethod
+    def fromDict(data: dict):
+        """
+        Builds a scene from a dictionary such as
+        {"obstacles": [{"type": "box", "center": [...], "halfExtents": [...]}, ...],
+         "robots": [{"name": "ur2", "position": [...], "yaw": 0.0, "angles": [...]}]}
+        Relative paths of meshes and URDF files are resolved from the current directory.
+        """
+        obstacles = [OBSTACLE_TYPES[obstacle["type"]](obstacle) for obstacle in data.get("obstacles", [])]
+        robots = [OtherRobot(robot["name"], robot.get("position", (0, 0, 0)), robot.get("yaw", 0.0), robot.get("angles"))
+                  for robot in data.get("robots", [])]
+        return Scene(obstacles, robots, data.get("cellSize", 0.1), data.get("maxDistance", 0.1))
+
+    @staticmethod
+    def fromJson(path: str):
+        with open(path, "r") as file:
+            return Scene.fromDict(json.load(file))
+
+    def _add(self, item):
+        self.items.append(item)
+        self.grid.insert(len(self.items) - 1, *item.aabb())
+        self.revision += 1
+
+    def addObstacle(self, obstacle):
+        self.obstacles.append(obstacle)
+        self._add(obstacle)
+
+    def addRobot(self, robot: OtherRobot):
+        self.robots.append(robot)
+        self._add(robot)
+
+    def setRobotAngles(self, name: str, angles: list):
+        """
+        Updates the joint angles of another robot of the cell.
+        """
+        robot = next(robot for robot in self.robots if robot.name == name)
+        index = self.items.index(robot)
+        self.grid.remove(index, *robot.aabb())
+        robot.setAngles(angles)
+        self.grid.insert(index, *robot.aabb())
+        self.revision += 1
+
+    def query(self, lower, upper, maxDistance: float = None):
+        """
+        Returns the obstacles and robots closer than maxDistance (the one of the scene if None) to the box [lower, upper].
+        """
+        maxDistance = self.maxDistance if maxDistance is None else maxDistance
+        return [self.items[i] for i in self.grid.query(np.asarray(lower) - maxDistance, np.asarray(upper) + maxDistance)]
+
+    def getMaxDistance(self, margin: float = 0.0):
+        """
+        Returns the distance up to which the clearances are computed for a margin, beyond the margin so that
+        a configuration far from every object is not declared closer than the margin.
+        """
+        return max(self.maxDistance, margin + MARGIN_CLEARANCE)
+
+    def capsuleClearances(self, starts, ends, radii=LINK_RADII, maxDistance: float = None):
+        """
+        Computes the clearance between capsules and the objects of the scene.
+
+        Parameters:
+        - starts, ends: Arrays of shape (N, L, 3) with the end points of the capsules.
+        - radii: Radius of each of the L capsules.
+        - maxDistance: Distance beyond which the objects are not looked at, the one of the scene if None.
+
+        Returns:
+        - An array of shape (N, L) with the clearance of each capsule, capped at maxDistance.
+        """
+        maxDistance = self.maxDistance if maxDistance is None else maxDistance
+        clearances = np.full(starts.shape[:-1], maxDistance)
+        if not self.obstacles and not self.robots:
+            return clearances
+
+        # One query per link over the whole batch, the batch is usually a local motion
+        for link in range(starts.shape[1]):
+            points = np.vstack((starts[:, link], ends[:, link]))
+            for item in self.query(points.min(axis=0) - radii[link], points.max(axis=0) + radii[link], maxDistance):
+                if hasattr(item, "segmentDistances"):
+                    distances = item.segmentDistances(starts[:, link], ends[:, link])
+                else:
+                    distances = _segmentDistancesToConvex(item.pointDistances, starts[:, link], ends[:, link])
+                clearances[:, link] = np.minimum(clearances[:, link], distances - radii[link])
+        return clearances
+
+    def checkConfigurations(self, angles, baseTransform=None, margin: float = 0.0):
+        """
+        Analytic check of robot configurations against the scene with the capsule model.
+
+        Parameters:
+        - angles: Array-like of shape (N, 6) with the joint angles.
+        - baseTransform: 4x4 transform of the checked robot base, identity if None.
+        - margin: Minimum clearance in meters.
+
+        Returns:
+        - (valid, clearances) arrays of shape (N,), clearances capped at getMaxDistance(margin).
+        """
+        starts, ends = getCapsules(angles, baseTransform)
+        clearances = self.capsuleClearances(starts, ends, maxDistance=self.getMaxDistance(margin)).min(axis=1)
+        return clearances > margin, clearances
+
+    def loadInPybullet(self, physicsClientId: int = 0):
+        """
+        Creates the obstacles and robots of the scene in a PyBullet simulation.
+
+        Returns:
+        - The list of created body ids, in the order the obstacles and robots were added.
+        """
+        return [item.createInPybullet(physicsClientId) for item in self.items]
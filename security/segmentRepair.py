@@ -0,0 +1,203 @@
+from collections import deque
+import time
+
+import numpy as np
+
+from .interpolation import Interpolation
+from .shortcutting import PathShortcutting
+from .solutionSelection import JOINT_LIMITS
+
+""" Repair of the unsafe segments of a trajectory: each one is re-planned between its two safe end points with a
+bidirectional rapidly exploring random tree (RRT-Connect), and the new sub-path is spliced in the trajectory """
+
+
+class _Tree():
+    """ Nodes of a tree in joint space with the index of their parent """
+
+    def __init__(self, root):
+        self.nodes = np.empty((64, 6))
+        self.parents = np.empty(64, dtype=int)
+        self.nodes[0], self.parents[0] = root, -1
+        self.size = 1
+
+    def add(self, node, parent: int):
+        if self.size == len(self.nodes):
+            self.nodes = np.concatenate((self.nodes, np.empty_like(self.nodes)))
+            self.parents = np.concatenate((self.parents, np.empty_like(self.parents)))
+        self.nodes[self.size], self.parents[self.size] = node, parent
+        self.size += 1
+        return self.size - 1
+
+    def nearest(self, node):
+        return int(np.argmin(np.abs(self.nodes[:self.size] - node).max(axis=1)))
+
+    def pathTo(self, index: int):
+        """
+        Returns the nodes from the root to the node at index.
+        """
+        path = []
+        while index >= 0:
+            path.append(self.nodes[index].copy())
+            index = self.parents[index]
+        return path[::-1]
+
+
+class RrtConnectPlanner():
+    def __init__(self, interpolation: Interpolation = None, timeBudget: float = 1.0, stepSize: float = 0.2,
+                 samplingMargin: float = 1.0, goalBias: float = 0.1, batchSize: int = 256, seed: int = 0,
+                 jointLimits=JOINT_LIMITS):
+        """
+        Initializes the RrtConnectPlanner class.
+
+        Parameters:
+        - interpolation: The Interpolation checking the edges of the trees, with its backend, margin and singularity
+          thresholds. An analytic one without logs if None.
+        - timeBudget: Time in seconds after which the planning gives up.
+        - stepSize: Largest motion of a joint along an edge of the trees, in radians.
+        - samplingMargin: The random configurations are drawn in the box of the two end points enlarged by this
+          margin on every joint, in radians.
+        - goalBias: Probability of extending a tree toward the root of the other one instead of a random sample.
+        - batchSize: Number of random configurations checked together by the collision checker.
+        - seed: Seed of the random configurations.
+        - jointLimits: Limit of each joint in radians.
+        """
+        self.interpolation = interpolation or Interpolation(logs=False, backend="analytic")
+        self.timeBudget = timeBudget
+        self.stepSize = stepSize
+        self.samplingMargin = samplingMargin
+        self.goalBias = goalBias
+        self.batchSize = batchSize
+        self.rng = np.random.default_rng(seed)
+        self.jointLimits = np.asarray(jointLimits, dtype=float)
+        self.checkedEdges = 0
+        self.samples = deque()  # Valid random configurations not used yet
+
+    def _sample(self, lower, upper):
+        """
+        Returns a random valid configuration, the samples being drawn and checked in batches, None when a
+        whole batch is not valid.
+        """
+        if not self.samples:
+            configs = self.rng.uniform(lower, upper, (self.batchSize, 6))
+            valid, _ = self.interpolation._getChecker().checkBatch(configs)
+            self.samples.extend(configs[valid])
+        return self.samples.popleft() if self.samples else None
+
+    def _isEdgeSafe(self, angles1, angles2):
+        self.checkedEdges += 1
+        return self.interpolation._isTrajectoriesSafe(list(angles1), list(angles2))
+
+    def _extend(self, tree: _Tree, target):
+        """
+        Adds to the tree a node one step from its nearest node toward the target.
+
+        Returns:
+        - (status, index): status is "reached", "advanced" or "trapped", index is the new node.
+        """
+        nearest = tree.nearest(target)
+        start = tree.nodes[nearest]
+        distance = np.abs(target - start).max()
+        reached = distance <= self.stepSize
+        node = target if reached else start + (target - start) * (self.stepSize / distance)
+        if not self._isEdgeSafe(start, node):
+            return "trapped", None
+        return ("reached" if reached else "advanced"), tree.add(node, nearest)
+
+    def _connect(self, tree: _Tree, target):
+        """
+        Extends the tree toward the target until it is reached or blocked.
+        """
+        status, index = "advanced", None
+        while status == "advanced":
+            status, added = self._extend(tree, target)
+            index = added if added is not None else index
+        return status, index
+
+    def plan(self, start, goal):
+        """
+        Plans a collision free path between two valid configurations.
+
+        Returns:
+        - The list of waypoints from start to goal, or None if no path was found within the time budget.
+        """
+        begin = time.perf_counter()
+        start, goal = np.asarray(start, dtype=float), np.asarray(goal, dtype=float)
+        if self._isEdgeSafe(start, goal):
+            return [start.tolist(), goal.tolist()]
+
+        lower = np.maximum(np.minimum(start, goal) - self.samplingMargin, -self.jointLimits)
+        upper = np.minimum(np.maximum(start, goal) + self.samplingMargin, self.jointLimits)
+        trees = (_Tree(start), _Tree(goal))
+        startTree = trees[0]
+        self.samples.clear()
+        while time.perf_counter() - begin < self.timeBudget:
+            growing, other = trees
+            target = other.nodes[0] if self.rng.random() < self.goalBias else self._sample(lower, upper)
+            if target is None:
+                continue
+            status, index = self._extend(growing, target)
+            if status != "trapped":
+                # The other tree tries to reach the new node
+                connection, otherIndex = self._connect(other, growing.nodes[index])
+                if connection == "reached":
+                    path = growing.pathTo(index) + other.pathTo(otherIndex)[::-1][1:]
+                    if growing is not startTree:
+                        path = path[::-1]
+                    return [list(waypoint) for waypoint in path]
+            trees = (other, growing)
+        return None
+
+
+def repairTrajectory(angles: list[list[float]], interpolation: Interpolation = None, timeBudget: float = 1.0,
+                     shortcut: bool = True, seed: int = 0):
+    """
+    Re-plans the unsafe segments of a trajectory between their end points and splices the new sub-paths in.
+
+    Parameters:
+    - angles: The waypoints of the trajectory.
+    - interpolation: The Interpolation checking the trajectory and the planned edges, an analytic one without
+      logs if None.
+    - timeBudget: Time in seconds given to the planning of each unsafe segment.
+    - shortcut: Shorten each planned sub-path with PathShortcutting, with a tenth of the time budget.
+    - seed: Seed of the planner.
+
+    Returns:
+    - (trajectory, report): the repaired trajectory, which contains all the original waypoints, and a dictionary
+      with the unsafe segments found, the ones repaired and not repaired (their end points are not valid, or no
+      path was found in time), the number of inserted waypoints, whether the result is safe and the time spent.
+    """
+    start = time.perf_counter()
+    interpolation = interpolation or Interpolation(logs=False, backend="analytic")
+    planner = RrtConnectPlanner(interpolation, timeBudget, seed=seed)
+    checker = interpolation._getChecker()
+
+    unsafe = [i for i in range(len(angles) - 1) if not interpolation._isTrajectoriesSafe(angles[i], angles[i + 1])]
+    trajectory = [list(angles[0])] if angles else []
+    repaired, failed = [], []
+    for i in range(len(angles) - 1):
+        subPath = [list(angles[i]), list(angles[i + 1])]
+        if i in unsafe:
+            endsValid = checker.checkBatch([angles[i], angles[i + 1]])[0].all()
+            planned = planner.plan(angles[i], angles[i + 1]) if endsValid else None
+            if planned is not None and shortcut:
+                shortened, _ = PathShortcutting(interpolation, timeBudget / 10, seed=seed).shortcut(planned)
+                # The shortcuts were checked in pieces, the spliced segments must also pass the plain check
+                if all(interpolation._isTrajectoriesSafe(a, b) for a, b in zip(shortened[:-1], shortened[1:])):
+                    planned = shortened
+            if planned is not None:
+                # The planned end points are the original waypoints, kept exactly
+                subPath = [list(angles[i])] + [list(waypoint) for waypoint in planned[1:-1]] + [list(angles[i + 1])]
+                repaired.append((i, i + 1))
+            else:
+                failed.append((i, i + 1))
+        trajectory.extend(subPath[1:])
+
+    return trajectory, {
+        "unsafeSegments": [(i, i + 1) for i in unsafe],
+        "repaired": repaired,
+        "failed": failed,
+        "insertedWaypoints": len(trajectory) - len(angles),
+        "safe": not failed,
+        "checkedEdges": planner.checkedEdges,
+        "time": time.perf_counter() - start,
+    }
@@ -0,0 +1,154 @@
+import time
+
+import numpy as np
+
+from .interpolation import Interpolation
+
+""" Shortening of validated joint paths: the redundant waypoints are removed and sub-paths are replaced by
+direct segments checked with the same Interpolation, within a time budget """
+
+
+def getJointTravel(angles):
+    """
+    Returns the joint travel of a path, sum of the absolute variations of every joint.
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    return float(np.abs(np.diff(angles, axis=0)).sum())
+
+
+def _removeCollinear(angles, fixed: set, tolerance: float = 1e-9):
+    """
+    Removes the waypoints lying on the segment between their neighbours, the path itself does not change.
+    """
+    if len(angles) < 3:
+        return list(range(len(angles)))
+    kept = [0]
+    for i in range(1, len(angles) - 1):
+        start, end = angles[kept[-1]], angles[i + 1]
+        direction = end - start
+        length = np.dot(direction, direction)
+        ratio = np.dot(angles[i] - start, direction) / length if length > 0 else 0.0
+        onSegment = 0.0 <= ratio <= 1.0 and np.linalg.norm(start + ratio * direction - angles[i]) <= tolerance
+        if i in fixed or not onSegment:
+            kept.append(i)
+    kept.append(len(angles) - 1)
+    return kept
+
+
+class PathShortcutting():
+    def __init__(self, interpolation: Interpolation = None, timeBudget: float = 1.0, maxAttempts: int = None,
+                 seed: int = 0):
+        """
+        Initializes the PathShortcutting class.
+
+        Parameters:
+        - interpolation: The Interpolation checking the shortcuts, with its backend, margin and singularity
+          thresholds (the swept volume bound is used when enabled). An analytic one without logs if None.
+        - timeBudget: Time in seconds after which no more shortcut is tried.
+        - maxAttempts: Maximum number of shortcuts tried, only the time budget if None.
+        - seed: Seed of the choice of the shortcuts.
+        """
+        self.interpolation = interpolation or Interpolation(logs=False, backend="analytic")
+        self.timeBudget = timeBudget
+        self.maxAttempts = maxAttempts
+        self.rng = np.random.default_rng(seed)
+        self.checkedSegments = 0
+
+    def _isSegmentSafe(self, angles1, angles2):
+        interpolation = self.interpolation
+        self.checkedSegments += 1
+        return interpolation._proveSegmentsSafe([angles1, angles2])[0] or interpolation._isTrajectoriesSafe(angles1, angles2)
+
+    def _isShortcutSafe(self, path, i: int, j: int):
+        """
+        Checks the direct segment between the waypoints i and j. Interpolation samples a fixed number of positions
+        per segment, so the shortcut is split in pieces no longer than the longest segment it replaces, keeping the
+        density of the checked positions of the original path.
+        """
+        longest = np.abs(np.diff(path[i:j + 1], axis=0)).max()
+        pieces = max(1, int(np.ceil(np.abs(path[j] - path[i]).max() / longest))) if longest > 0 else 1
+        points = [(1 - k / pieces) * path[i] + (k / pieces) * path[j] for k in range(pieces + 1)]
+        return all(self._isSegmentSafe(list(a), list(b)) for a, b in zip(points[:-1], points[1:]))
+
+    def _pickShortcut(self, path, fixedFlags, failed: set, tries: int = 100):
+        """
+        Picks a random pair of waypoints (i, j) with j > i + 1, not skipping a fixed waypoint and not already
+        found unsafe. After some unsuccessful random picks the remaining pairs are listed, None when there is none.
+        """
+        def isCandidate(i, j):
+            return not fixedFlags[i + 1:j].any() and (path[i].tobytes(), path[j].tobytes()) not in failed
+
+        if len(path) < 3:
+            return None
+        for _ in range(tries):
+            i = int(self.rng.integers(0, len(path) - 2))
+            j = int(self.rng.integers(i + 2, len(path)))
+            if isCandidate(i, j):
+                return i, j
+        candidates = [(i, j) for i in range(len(path) - 2) for j in range(i + 2, len(path)) if isCandidate(i, j)]
+        return candidates[int(self.rng.integers(len(candidates)))] if candidates else None
+
+    def shortcut(self, angles, fixedIndexes=()):
+        """
+        Shortens a path whose segments are all safe.
+
+        The segments of the shortened path are longer than the original ones: validating it again with
+        checkSafeTrajectories samples them less densely than the shortcuts were checked here.
+
+        Parameters:
+        - angles: Array-like of shape (N, 6) with the waypoints.
+        - fixedIndexes: Indexes of the waypoints that must be kept, like the points of a drawing. The first and
+          last waypoints are always kept.
+
+        Returns:
+        - (path, report): the shortened path as a list of waypoints, and a dictionary with the number of waypoints
+          and the joint travel before and after, their relative reductions, the number of shortcuts tried and
+          accepted, the number of segments checked and the time spent.
+        """
+        start = time.perf_counter()
+        angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+        fixed = {index % len(angles) for index in fixedIndexes}
+        checkedSegments = self.checkedSegments
+
+        # Redundant waypoints first, free since the path does not change
+        kept = _removeCollinear(angles, fixed)
+        path = angles[kept]
+        fixedFlags = np.array([index in fixed for index in kept])
+
+        attempts, accepted = 0, 0
+        failed = set()  # Shortcuts already found unsafe, by their end points
+        while time.perf_counter() - start < self.timeBudget and (self.maxAttempts is None or attempts < self.maxAttempts):
+            pair = self._pickShortcut(path, fixedFlags, failed)
+            if pair is None:
+                break
+            i, j = pair
+
+            attempts += 1
+            if self._isShortcutSafe(path, i, j):
+                path = np.delete(path, np.arange(i + 1, j), axis=0)
+                fixedFlags = np.delete(fixedFlags, np.arange(i + 1, j))
+                accepted += 1
+            else:
+                failed.add((path[i].tobytes(), path[j].tobytes()))
+
+        originalTravel, travel = getJointTravel(angles), getJointTravel(path)
+        report = {
+            "originalWaypoints": len(angles),
+            "waypoints": len(path),
+            "waypointReduction": 1 - len(path) / len(angles) if len(angles) else 0.0,
+            "originalTravel": originalTravel,
+            "travel": travel,
+            "travelReduction": 1 - travel / originalTravel if originalTravel > 0 else 0.0,
+            "attempts": attempts,
+            "accepted": accepted,
+            "checkedSegments": self.checkedSegments - checkedSegments,
+            "time": time.perf_counter() - start,
+        }
+        return path.tolist(), report
+
+
+def shortcutPath(angles, interpolation: Interpolation = None, timeBudget: float = 1.0, fixedIndexes=(), seed: int = 0):
+    """
+    Shortens a path with a PathShortcutting, see PathShortcutting.shortcut.
+    """
+    return PathShortcutting(interpolation, timeBudget, seed=seed).shortcut(angles, fixedIndexes)
@@ -0,0 +1,83 @@
+import numpy as np
+
+from .forwardKinematics import DH_D, BatchForwardKinematic
+from .solutionSelection import JOINT_LIMITS
+
+""" Jacobian, manipulability and distance to the singularities of the UR3e for batches of configurations """
+
+# Distance under which a configuration is considered near a singularity: meters for the shoulder,
+# sine of the joint angle for the elbow (joint 3) and the wrist (joint 5)
+SINGULARITY_THRESHOLDS = {"shoulder": 0.05, "elbow": 0.1, "wrist": 0.1}
+
+
+def getJacobians(angles, toolLength: float = 0.0):
+    """
+    Computes the geometric Jacobian of a batch of configurations.
+
+    Parameters:
+    - angles: Array-like of shape (N, 6) with the joint angles.
+    - toolLength: Distance of the controlled point from the flange, along the z axis of the last joint.
+
+    Returns:
+    - An array of shape (N, 6, 6), the rows are the linear then the angular velocity, the columns the joints.
+    """
+    frames = BatchForwardKinematic(angles).getFrames()
+    count = len(frames)
+
+    # Axis and origin of each joint: z of the base for the first one, then of the previous frame
+    axes = np.concatenate((np.broadcast_to([0.0, 0.0, 1.0], (count, 1, 3)), frames[:, :-1, :3, 2]), axis=1)
+    origins = np.concatenate((np.zeros((count, 1, 3)), frames[:, :-1, :3, 3]), axis=1)
+    endEffector = frames[:, -1, :3, 3] + toolLength * frames[:, -1, :3, 2]
+
+    jacobians = np.empty((count, 6, 6))
+    jacobians[:, :3] = np.cross(axes, endEffector[:, None] - origins).transpose(0, 2, 1)
+    jacobians[:, 3:] = axes.transpose(0, 2, 1)
+    return jacobians
+
+
+def getManipulability(angles, toolLength: float = 0.0):
+    """
+    Returns the manipulability |det(J)| of each configuration, 0 at a singularity.
+    """
+    return np.abs(np.linalg.det(getJacobians(angles, toolLength)))
+
+
+def getSingularityDistances(angles):
+    """
+    Computes how far each configuration is from the three singularities of the UR arms.
+
+    - shoulder: horizontal distance in meters between the center of the wrist (origin of frame 5) and the
+      vertical plane through the base axis parallel to the shoulder axis. The wrist is always d4 away from
+      the base axis along the shoulder axis, so this is sqrt(r^2 - d4^2) with r its distance to the base axis.
+    - elbow: |sin(q3)|, the arm is fully stretched or folded when it is 0.
+    - wrist: |sin(q5)|, the axes of joints 4 and 6 are aligned when it is 0.
+
+    Returns:
+    - A dictionary name -> array of shape (N,).
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    wristCenter = BatchForwardKinematic(angles).getFrames()[:, 4, :3, 3]
+    return {
+        "shoulder": np.sqrt(np.maximum(wristCenter[:, 0] ** 2 + wristCenter[:, 1] ** 2 - DH_D[3] ** 2, 0.0)),
+        "elbow": np.abs(np.sin(angles[:, 2])),
+        "wrist": np.abs(np.sin(angles[:, 4])),
+    }
+
+
+def getNearSingularities(angles, thresholds: dict = SINGULARITY_THRESHOLDS):
+    """
+    Returns a boolean array of shape (N,), True when a configuration is closer to a singularity than its threshold.
+    """
+    distances = getSingularityDistances(angles)
+    near = np.zeros(len(distances["wrist"]), dtype=bool)
+    for name, threshold in thresholds.items():
+        near |= distances[name] < threshold
+    return near
+
+
+def isWithinJointLimits(angles, margin: float = 0.0, jointLimits=JOINT_LIMITS):
+    """
+    Returns a boolean array of shape (N,), True when every joint is more than margin radians from its limits.
+    """
+    angles = np.asarray(angles, dtype=float).reshape(-1, 6)
+    return np.all(np.abs(angles) <= np.asarray(jointLimits) - margin, axis=1)
@@ -0,0 +1,101 @@
+import numpy as np
+
+""" Choice of one inverse kinematics solution per waypoint, by dynamic programming over the
+waypoint/solution lattice """
+
+# Joint limits of the UR3e in radians (+/- 360 degrees on every joint)
+JOINT_LIMITS = np.full(6, 2 * np.pi)
+
+
+def getLimitDistances(solutions, jointLimits=JOINT_LIMITS):
+    """
+    Returns the distance in radians of the closest joint to its limit, for each solution of shape (..., 6).
+    """
+    return np.min(np.asarray(jointLimits) - np.abs(np.asarray(solutions, dtype=float)), axis=-1)
+
+
+def selectBestSolutions(waypoints: list, clearances: list = None, startAngles: list = None,
+                        clearanceWeight: float = 1.0, limitWeight: float = 0.1, travelWeight: float = 1.0,
+                        clearanceCap: float = 0.1, limitCap: float = 0.5, maxJump: float = None,
+                        jointLimits=JOINT_LIMITS):
+    """
+    Picks one solution per waypoint, minimizing the joint travel along the sequence while preferring
+    solutions far from collisions and from the joint limits.
+
+    The cost of a sequence is the sum over the waypoints of
+    travelWeight * (joint travel from the previous solution, sum of the absolute variations)
+    - clearanceWeight * min(clearance, clearanceCap) - limitWeight * min(limit distance, limitCap).
+    The clearance and limit distance are capped so that a solution far from everything is not preferred
+    to a shorter motion.
+
+    Parameters:
+    - waypoints: For each waypoint, the list of valid solutions (ValidateRobotPosition.finalPositions).
+    - clearances: For each waypoint, the clearance in meters of each solution, NaN or None when unknown.
+    - startAngles: Current joint angles of the robot, the travel to the first waypoint is counted from them.
+    - clearanceWeight: Weight of the clearance in 1/m, in radians of travel per meter.
+    - limitWeight: Weight of the distance to the joint limits.
+    - travelWeight: Weight of the joint travel.
+    - clearanceCap: Clearance in meters above which a solution is not considered safer.
+    - limitCap: Distance to the joint limits in radians above which a solution is not considered better.
+    - maxJump: Maximum variation of a joint in radians between two consecutive waypoints, no limit if None.
+    - jointLimits: Limit of each joint in radians.
+
+    Returns:
+    - (indexes, solutions, cost): the index and the angles of the chosen solution of each waypoint, and the
+      cost of the sequence.
+
+    Raises:
+    - ValueError: If a waypoint has no solution or no sequence respects maxJump.
+    """
+    counts = [len(solutions) for solutions in waypoints]
+    if not counts:
+        return [], [], 0.0
+    for i, count in enumerate(counts):
+        if count == 0:
+            raise ValueError(f"Waypoint {i} has no valid solution")
+
+    # Lattice padded to (waypoints, solutions, 6), missing solutions have an infinite cost
+    size = max(counts)
+    present = np.arange(size)[None, :] < np.array(counts)[:, None]
+    angles = np.zeros((len(waypoints), size, 6))
+    unary = np.full((len(waypoints), size), np.inf)
+    for i, solutions in enumerate(waypoints):
+        angles[i, :counts[i]] = np.asarray(solutions, dtype=float).reshape(-1, 6)
+        unary[i, :counts[i]] = 0.0
+
+    if clearances is not None:
+        capped = np.zeros_like(unary)
+        for i, values in enumerate(clearances):
+            if values is not None and len(values):
+                capped[i, :counts[i]] = np.nan_to_num(np.minimum(np.asarray(values, dtype=float), clearanceCap))
+        unary -= clearanceWeight * capped
+    unary -= limitWeight * np.minimum(getLimitDistances(angles, jointLimits), limitCap) * present
+
+    # (waypoints - 1, previous solution, next solution) transition costs in one pass
+    jumps = np.abs(angles[1:, None, :, :] - angles[:-1, :, None, :])
+    transitions = travelWeight * jumps.sum(axis=-1)
+    if maxJump is not None:
+        transitions[jumps.max(axis=-1) > maxJump] = np.inf
+
+    cost = unary[0].copy()
+    if startAngles is not None:
+        startJumps = np.abs(angles[0] - np.asarray(startAngles, dtype=float))
+        cost += travelWeight * startJumps.sum(axis=-1)
+        if maxJump is not None:
+            cost[startJumps.max(axis=-1) > maxJump] = np.inf
+
+    previous = np.zeros((len(waypoints), size), dtype=int)
+    for i in range(1, len(waypoints)):
+        total = cost[:, None] + transitions[i - 1]
+        previous[i] = np.argmin(total, axis=0)
+        cost = total[previous[i], np.arange(size)] + unary[i]
+
+    last = int(np.argmin(cost))
+    if not np.isfinite(cost[last]):
+        raise ValueError("No sequence of solutions respects the maximum joint variation")
+
+    indexes = [last]
+    for i in range(len(waypoints) - 1, 0, -1):
+        indexes.append(int(previous[i, indexes[-1]]))
+    indexes.reverse()
+    return indexes, [waypoints[i][k] for i, k in enumerate(indexes)], float(cost[last])
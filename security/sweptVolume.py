@@ -0,0 +1,126 @@
+import numpy as np
+
+from .batchCollisionChecking import AREA_BOUNDS, COARSE_PAIRS, GROUND_LINKS, SELF_COLLISION_PAIRS
+from .capsules import FOREARM_OFFSET, GRIPPER_LENGTH, LINK_RADII, TOOL_LENGTH, UPPER_ARM_OFFSET, getCapsules, segmentDistances
+from .forwardKinematics import DH_A, DH_D
+
+""" Bounds of the volume swept by the capsules along a linear joint motion, used to declare whole segments
+safe without sampling them """
+
+
+def getLeverArms(toolLength: float = TOOL_LENGTH):
+    """
+    Returns a (6, 8) array bounding the distance between the axis of each joint and the points of each link,
+    whatever the configuration (0 when the joint does not move the link).
+
+    The distance between two consecutive frame origins does not depend on the angles (sqrt(a^2 + d^2)), so the
+    distance from the origin of a joint to a link is bounded by the length of the chain between them.
+    """
+    lengths = np.concatenate((np.hypot(DH_A, DH_D), [GRIPPER_LENGTH, toolLength]))
+    offsets = np.array([0.0, UPPER_ARM_OFFSET, FOREARM_OFFSET, 0.0, 0.0, 0.0, 0.0, 0.0])
+    arms = np.zeros((6, len(lengths)))
+    for joint in range(6):
+        for link in range(joint, len(lengths)):
+            arms[joint, link] = lengths[joint:link + 1].sum() + offsets[link]
+    return arms
+
+
+class SweptVolumeCheck():
+    def __init__(self, margin: float = 0.0, inflation: float = 0.0, maxDepth: int = 3, groundHeight: float = 0.0,
+                 checkArea: bool = True, scene=None, toolLength: float = TOOL_LENGTH):
+        """
+        Initializes the SweptVolumeCheck class.
+
+        Along a linear joint motion, a point of a link moves away from its position at the middle configuration
+        by at most the sum over the joints of half their variation times their lever arm. Each capsule of the
+        middle configuration inflated by this distance thus encloses the whole motion of the link. Between two
+        links, only the joints between them change their distance, so each pair only counts these joints. Segments
+        whose bounds are not conclusive are split in two, up to maxDepth times.
+
+        Parameters:
+        - margin: Minimum clearance in meters.
+        - inflation: Added to the radius of every capsule, so that they enclose the meshes of the simulation. The
+          inflated capsules are compared on every non rigid pair of links (COARSE_PAIRS), as in the simulation.
+        - maxDepth: Maximum number of times a segment is split in two.
+        - groundHeight: Height of the ground.
+        - checkArea: Check that the pen stays in the working area.
+        - scene: Scene with the obstacles and other robots of the cell.
+        - toolLength: Length of the pen capsule.
+        """
+        self.margin = margin
+        self.radii = LINK_RADII + inflation
+        self.maxDepth = maxDepth
+        self.groundHeight = groundHeight
+        self.checkArea = checkArea
+        self.scene = scene
+        self.toolLength = toolLength
+        self.leverArms = getLeverArms(toolLength)
+        self.pairs = COARSE_PAIRS if inflation > 0 else SELF_COLLISION_PAIRS
+        # The joints before the first link of a pair move both links together without changing their distance,
+        # only the joints between them count for the pair
+        self.pairArms = np.where(np.arange(6)[:, None] > self.pairs[:, 0], self.leverArms[:, self.pairs[:, 1]], 0.0)
+
+    def sweptClearances(self, starts, ends):
+        """
+        Lower bound of the clearance of the robot along linear joint motions.
+
+        Parameters:
+        - starts, ends: Arrays of shape (M, 6) with the joint angles at both ends of each motion.
+
+        Returns:
+        - An array of shape (M,) with a lower bound of the clearance in meters (-inf when the pen may leave
+          the working area).
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 6)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 6)
+        growth = 0.5 * np.abs(ends - starts) @ self.leverArms
+        capsuleStarts, capsuleEnds = getCapsules(0.5 * (starts + ends), toolLength=self.toolLength)
+
+        first, second = self.pairs[:, 0], self.pairs[:, 1]
+        distances = segmentDistances(capsuleStarts[:, first], capsuleEnds[:, first], capsuleStarts[:, second], capsuleEnds[:, second])
+        pairGrowth = 0.5 * np.abs(ends - starts) @ self.pairArms
+        selfClearances = distances - self.radii[first] - self.radii[second] - pairGrowth
+
+        lowest = np.minimum(capsuleStarts[:, GROUND_LINKS, 2], capsuleEnds[:, GROUND_LINKS, 2])
+        groundClearances = lowest - self.radii[GROUND_LINKS] - growth[:, GROUND_LINKS] - self.groundHeight
+
+        clearances = np.minimum(selfClearances.min(axis=1), groundClearances.min(axis=1))
+        if self.scene is not None:
+            sceneClearances = self.scene.capsuleClearances(capsuleStarts, capsuleEnds, self.radii) - growth
+            clearances = np.minimum(clearances, sceneClearances.min(axis=1))
+
+        if self.checkArea:
+            tip, tipGrowth = capsuleEnds[:, -1], growth[:, -1:]
+            inArea = np.all((tip - tipGrowth >= AREA_BOUNDS[0]) & (tip + tipGrowth <= AREA_BOUNDS[1]), axis=1)
+            clearances = np.where(inArea, clearances, -np.inf)
+        return clearances
+
+    def proveSegmentsSafe(self, starts, ends):
+        """
+        Tries to prove that linear joint motions are safe without sampling them.
+
+        Parameters:
+        - starts, ends: Arrays of shape (M, 6) with the joint angles at both ends of each motion.
+
+        Returns:
+        - A boolean array of shape (M,), True when the whole motion is proven safe. False means that the
+          bounds are not conclusive, not that the motion is unsafe.
+        """
+        starts = np.asarray(starts, dtype=float).reshape(-1, 6)
+        ends = np.asarray(ends, dtype=float).reshape(-1, 6)
+        proven = np.ones(len(starts), dtype=bool)
+
+        # Pieces still to prove, with the index of their segment
+        owners = np.arange(len(starts))
+        for depth in range(self.maxDepth + 1):
+            if not len(owners):
+                break
+            unresolved = self.sweptClearances(starts, ends) <= self.margin
+            if depth == self.maxDepth:
+                proven[owners[unresolved]] = False
+                break
+            owners, starts, ends = owners[unresolved], starts[unresolved], ends[unresolved]
+            middles = 0.5 * (starts + ends)
+            owners = np.concatenate((owners, owners))
+            starts, ends = np.concatenate((starts, middles)), np.concatenate((middles, ends))
+        return proven
@@ -0,0 +1,113 @@
+from collections import deque
+
+import numpy as np
+
+from .capsules import TOOL_LENGTH, getCapsules
+
+""" Cartesian speed and acceleration of the pen tip computed from the joint samples """
+
+# Tool speed limits of the UR safety parameters in mm/s, normal and reduced mode
+TCP_SPEED_LIMIT = 1500.0
+REDUCED_TCP_SPEED_LIMIT = 750.0
+
+
+def getTipPositions(angles, toolLength: float = TOOL_LENGTH):
+    """
+    Returns the positions in millimeters of the pen tip, array of shape (N, 3).
+    """
+    return 1000.0 * getCapsules(angles, toolLength=toolLength)[1][:, -1]
+
+
+def _getSpeeds(positions, timestamps, window: int):
+    if len(positions) <= window:
+        return np.zeros(0), np.zeros(0)
+
+    deltaT = timestamps[window:] - timestamps[:-window]
+    velocities = (positions[window:] - positions[:-window]) / deltaT[:, None]
+    speeds = np.linalg.norm(velocities, axis=1)
+
+    middles = 0.5 * (timestamps[window:] + timestamps[:-window])
+    accelerations = np.linalg.norm(velocities[window:] - velocities[:-window], axis=1) / (middles[window:] - middles[:-window])
+    return speeds, accelerations
+
+
+def getTipSpeeds(angles, timestamps, window: int = 1, toolLength: float = TOOL_LENGTH):
+    """
+    Computes the linear speed and acceleration of the pen tip along a stream of joint samples.
+
+    Parameters:
+    - angles: Array-like of shape (N, 6) with the joint angles.
+    - timestamps: Array-like of shape (N,) with the time of each sample in seconds.
+    - window: Number of samples over which each speed is measured, larger windows smooth the jitter of the samples.
+    - toolLength: Length of the pen.
+
+    Returns:
+    - (speeds, accelerations): arrays of shape (N - window,) in mm/s and (N - 2 * window,) in mm/s^2, the
+      speed k being measured between the samples k and k + window.
+    """
+    return _getSpeeds(getTipPositions(angles, toolLength), np.asarray(timestamps, dtype=float), window)
+
+
+class TcpSpeedMonitor():
+    def __init__(self, speedLimit: float = TCP_SPEED_LIMIT, accelerationLimit: float = None, window: int = 1,
+                 toolLength: float = TOOL_LENGTH):
+        """
+        Initializes the TcpSpeedMonitor class, following the pen tip over the stream of joint samples.
+
+        Parameters:
+        - speedLimit: Maximum speed of the pen tip in mm/s.
+        - accelerationLimit: Maximum acceleration of the pen tip in mm/s^2, not checked if None.
+        - window: Number of samples over which each speed is measured.
+        - toolLength: Length of the pen.
+        """
+        self.speedLimit = speedLimit
+        self.accelerationLimit = accelerationLimit
+        self.window = window
+        self.toolLength = toolLength
+        # Samples needed for the latest speed and acceleration
+        self.timestamps = deque(maxlen=2 * window + 1)
+        self.positions = deque(maxlen=2 * window + 1)
+        self.maxSpeed = 0.0
+        self.maxAcceleration = 0.0
+        self._lastResult = (True, None, None)
+
+    def checkSamples(self, angles, timestamps):
+        """
+        Checks a whole stream of samples at once.
+
+        Returns:
+        - A boolean array of shape (N,), False for the samples reached too fast.
+        """
+        speeds, accelerations = getTipSpeeds(angles, timestamps, self.window, self.toolLength)
+        valid = np.ones(len(timestamps), dtype=bool)
+        valid[self.window:] &= speeds <= self.speedLimit
+        if self.accelerationLimit is not None:
+            valid[2 * self.window:] &= accelerations <= self.accelerationLimit
+        return valid
+
+    def update(self, angles: list, timestamp: float):
+        """
+        Adds the latest joint sample. A sample not newer than the last one (the same robot sample read twice)
+        is ignored and the result of the last one is returned.
+
+        Returns:
+        - (valid, speed, acceleration) of the pen tip at this sample, speed and acceleration are None until
+          enough samples are known.
+        """
+        if self.timestamps and timestamp <= self.timestamps[-1]:
+            return self._lastResult
+        self.positions.append(getTipPositions([angles], self.toolLength)[0])
+        self.timestamps.append(timestamp)
+        speeds, accelerations = _getSpeeds(np.array(self.positions), np.array(self.timestamps), self.window)
+
+        speed = float(speeds[-1]) if len(speeds) else None
+        acceleration = float(accelerations[-1]) if len(accelerations) else None
+        if speed is not None:
+            self.maxSpeed = max(self.maxSpeed, speed)
+        if acceleration is not None:
+            self.maxAcceleration = max(self.maxAcceleration, acceleration)
+
+        valid = (speed is None or speed <= self.speedLimit) and \
+            (acceleration is None or self.accelerationLimit is None or acceleration <= self.accelerationLimit)
+        self._lastResult = (valid, speed, acceleration)
+        return self._lastResult
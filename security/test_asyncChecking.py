@@ -0,0 +1,141 @@
+import asyncio
+import contextlib
+import threading
+import time
+
+import numpy as np
+
+from .asyncChecking import AsyncRobotChecker
+from .batchCollisionChecking import BatchCollisionCheck
+from .capsules import getCapsules
+from .fakeRobot import FakeISCoin, syntheticSamples
+from .scene import Scene, SphereObstacle
+
+start = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+
+
+class _SlowChecker():
+    """ Checker blocking for a while, counting the checks running at the same time """
+
+    def __init__(self, duration=0.02):
+        self.duration = duration
+        self.running = 0
+        self.maxRunning = 0
+        self._lock = threading.Lock()
+
+    def checkBatch(self, configs):
+        with self._lock:
+            self.running += 1
+            self.maxRunning = max(self.maxRunning, self.running)
+        time.sleep(self.duration)
+        with self._lock:
+            self.running -= 1
+        return np.ones(len(configs), dtype=bool), np.ones(len(configs))
+
+
+def test_checks():
+    configs = np.random.default_rng(0).uniform(-np.pi, np.pi, (200, 6))
+    expected = BatchCollisionCheck().checkBatch(configs)[0]
+
+    async def run():
+        async with AsyncRobotChecker() as checker:
+            valid, clearances = await checker.checkBatch(configs)
+            single = await asyncio.gather(*(checker.check(angles) for angles in configs[:20]))
+            trajectory = await checker.checkTrajectory([start, start], stopAtFirstError=False)
+        return valid, clearances, single, trajectory
+
+    valid, clearances, single, trajectory = asyncio.run(run())
+    assert np.array_equal(valid, expected) and len(clearances) == 200
+    assert single == expected[:20].tolist()
+    assert trajectory == {}
+
+
+def test_eventLoopNotBlocked():
+    async def run():
+        checker = AsyncRobotChecker(maxConcurrency=2, maxPending=4)
+        checker.checker = _SlowChecker()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.gather(*(checker.check(start) for _ in range(10)))
+        task.cancel()
+        checker.close()
+        return ticks, checker.checker.maxRunning
+
+    ticks, maxRunning = asyncio.run(run())
+    # 10 checks of 20 ms two at a time last about 100 ms, during which the loop kept running
+    assert ticks >= 10
+    assert maxRunning == 2
+
+
+def test_monitor():
+    samples = syntheticSamples(start, amplitude=0.05, duration=0.5)
+    unsafe = np.tile([0.0, 0.5, 0.0, 0.0, 0.0, 0.0], (10, 1))  # Upper arm below the ground
+    robot = FakeISCoin(np.vstack((samples, unsafe)), rate=125.0, realTime=False)
+    violations = []
+
+    async def run():
+        async with AsyncRobotChecker(eventDriven=True) as checker:
+            monitor = checker.monitor(lambda: robot.robot_control.get_actual_joint_positions().toList(), 0.001,
+                                      lambda angles, reasons: violations.append(reasons))
+            count = await asyncio.wait_for(monitor, 10.0)
+        return count, checker.stats
+
+    count, stats = asyncio.run(run())
+    assert count == 1 and "collision" in violations[0]
+    assert stats["ticks"] >= len(samples)
+    assert stats["fullChecks"] + stats["skippedChecks"] == stats["ticks"]
+
+
+def test_monitorWithScene():
+    # The pen tip of the second sample is inside a sphere of the scene, the first one is clear of it
+    moved = np.array(start) + [0.13, 0.0, 0.0, 0.0, 0.0, 0.0]
+    scene = Scene([SphereObstacle(getCapsules([moved])[1][0, -1], 0.005)])
+    samples = iter([start, moved.tolist()])
+    times = iter([0.0, 1.0])
+    violations = []
+
+    async def run():
+        async with AsyncRobotChecker(scene=scene, eventDriven=True) as checker:
+            count = await asyncio.wait_for(checker.monitor(lambda: next(samples), 0.001,
+                                                           lambda angles, reasons: violations.append(reasons),
+                                                           getTimestamp=lambda: next(times)), 10.0)
+        return count, checker.stats
+
+    count, stats = asyncio.run(run())
+    # The motion of 0.13 rad in one second is slow, the position is caught by a full check
+    assert count == 1 and violations == [["collision"]]
+    assert stats["fullChecks"] == 2 and stats["skippedChecks"] == 0
+
+
+def test_monitorSpeedOverElapsedTime():
+    # Samples 10 ms apart read by a monitor ticking every millisecond: 5 mrad steps of the shoulder are 0.5 rad/s,
+    # not the 5 rad/s of the tick interval
+    samples = [(np.array(start) + [0.0, 0.005 * i, 0.0, 0.0, 0.0, 0.0]).tolist() for i in range(20)]
+    violations = []
+
+    async def run():
+        async with AsyncRobotChecker(tcpSpeedLimit=1500.0) as checker:
+            reads = 0
+
+            def getAngles():
+                nonlocal reads
+                reads += 1
+                if reads == len(samples):
+                    task.cancel()
+                return samples[reads - 1]
+
+            task = checker.startMonitor(getAngles, 0.001, lambda angles, reasons: violations.append(reasons),
+                                        getTimestamp=lambda: 0.01 * (reads - 1))
+            with contextlib.suppress(asyncio.CancelledError):
+                await asyncio.wait_for(task, 10.0)
+            return checker.stats
+
+    stats = asyncio.run(run())
+    assert violations == [] and stats["ticks"] == len(samples) - 1
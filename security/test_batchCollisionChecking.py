@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from .backends import getChecker
+from .batchCollisionChecking import BatchCollisionCheck
+from .capsules import segmentDistances
+
+
+def test_segmentDistances():
+    rng = np.random.default_rng(0)
+    p0, p1, q0, q1 = rng.uniform(-1, 1, (4, 200, 3))
+    q1[:20] = q0[:20]  # Degenerate segments
+    p1[20:40] = p0[20:40] + 0.5 * (q1[20:40] - q0[20:40])  # Parallel segments
+
+    s = np.linspace(0, 1, 401)
+    first = p0[:, None] + s[None, :, None] * (p1 - p0)[:, None]
+    second = q0[:, None] + s[None, :, None] * (q1 - q0)[:, None]
+    expected = np.linalg.norm(first[:, :, None] - second[:, None, :], axis=-1).min(axis=(1, 2))
+
+    distances = segmentDistances(p0, p1, q0, q1)
+    assert np.all(distances <= expected + 1e-9)
+    assert distances == pytest.approx(expected, abs=5e-3)
+
+
+@pytest.mark.parametrize("angles, expected", [
+    ([0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0], True),
+    ([0.0, -3.14, 3.14, 0.0, 0.0, 0.0], False),  # Forearm folded on the upper arm
+    ([0.0, 0.5, 0.0, 0.0, 0.0, 0.0], False),  # Arm under the ground
+])
+def test_isValidConfiguration(angles, expected):
+    assert BatchCollisionCheck().isValidConfiguration(angles) == expected
+
+
+def test_chunkSize():
+    configs = np.random.default_rng(1).uniform(-np.pi, np.pi, (1000, 6))
+    valid, clearances = BatchCollisionCheck(chunkSize=64).checkBatch(configs)
+    expectedValid, expectedClearances = BatchCollisionCheck(chunkSize=4096).checkBatch(configs)
+    assert np.array_equal(valid, expectedValid)
+    assert np.allclose(clearances, expectedClearances)
+    assert valid.any() and not valid.all()
+
+
+def test_margin():
+    safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+    _, clearances = BatchCollisionCheck().checkBatch([safe])
+    assert BatchCollisionCheck(margin=clearances[0] - 1e-3).isValidConfiguration(safe)
+    assert not BatchCollisionCheck(margin=clearances[0] + 1e-3).isValidConfiguration(safe)
+
+
+def test_getChecker():
+    assert isinstance(getChecker("analytic"), BatchCollisionCheck)
+    with pytest.raises(ValueError):
+        getChecker("unknown")
@@ -0,0 +1,113 @@
+import io
+import json
+
+import numpy as np
+
+from .cli import loadInput, main
+
+safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+unsafe = [0.0, -3.14, 3.14, 0.0, 0.0, 0.0]
+nearby = [0.9, -1.6, 0.6, -0.6, -1.5, 0.1]
+
+
+def test_loadInput(tmp_path):
+    path = tmp_path / "traj.json"
+    path.write_text(json.dumps({"modTraj": [{"positions": safe}, {"positions": nearby}]}))
+    assert loadInput(str(path)) == ("trajectory", [safe, nearby])
+
+    path = tmp_path / "solutions.npy"
+    np.save(path, np.array([[safe, unsafe]]))
+    assert loadInput(str(path)) == ("solutions", [[safe, unsafe]])
+
+    path = tmp_path / "traj.bin"
+    np.array([safe, nearby], dtype="<f8").tofile(path)
+    assert loadInput(str(path)) == ("trajectory", [safe, nearby])
+
+
+def test_main(tmp_path, capsys):
+    good, bad, solutions = tmp_path / "good.json", tmp_path / "bad.json", tmp_path / "solutions.json"
+    good.write_text(json.dumps([safe, nearby]))
+    bad.write_text(json.dumps([safe, unsafe, safe]))
+    solutions.write_text(json.dumps([[safe, unsafe], [unsafe]]))
+
+    assert main([str(good), str(bad), str(solutions), "--workers", "2"]) == 1
+    out, err = capsys.readouterr()
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record["safe"] for record in records] == [True, False, False]
+    assert records[1]["unsafe"] == [[0, 1], [1, 2]]
+    assert records[2]["validSolutions"] == [1, 0]
+    assert json.loads(err.splitlines()[-1])["inputs"] == 3
+
+    assert main([str(bad), str(good), "--stop-at-first", "--format", "csv"]) == 1
+    out, _ = capsys.readouterr()
+    lines = out.strip().splitlines()
+    assert lines[0] == "input,kind,waypoints,safe,unsafe,time,error"
+    assert len(lines) == 2 and '"[[0, 1]]"' in lines[1]
+
+
+def test_stdin(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(json.dumps([safe, nearby])))
+    assert main([]) == 0
+    assert json.loads(capsys.readouterr().out)["input"] == "-"
+
+
+def test_binaryStdin(monkeypatch, capsys):
+    stdin = io.TextIOWrapper(io.BytesIO(np.array([safe, nearby], dtype="<f8").tobytes()))
+    monkeypatch.setattr("sys.stdin", stdin)
+    assert main(["--input-format", "binary"]) == 0
+    assert json.loads(capsys.readouterr().out)["waypoints"] == 2
+
+    buffer = io.BytesIO()
+    np.save(buffer, np.array([[safe, unsafe]]))
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(buffer.getvalue())))
+    assert loadInput("-", "npy") == ("solutions", [[safe, unsafe]])
+
+
+def test_solutionsWithWorkers(tmp_path, capsys):
+    solutions = tmp_path / "solutions.json"
+    solutions.write_text(json.dumps([[safe, unsafe], [unsafe], [safe], [nearby, safe]]))
+    assert main([str(solutions), "--workers", "3"]) == 1
+    assert json.loads(capsys.readouterr().out)["validSolutions"] == [1, 0, 1, 2]
+
+
+def test_loadErrors(tmp_path, capsys):
+    good, broken = tmp_path / "good.json", tmp_path / "broken.json"
+    good.write_text(json.dumps([safe, nearby]))
+    broken.write_text("[[0.1, 0.2")
+    # Every input gives a result, the ones that cannot be read with their error
+    assert main([str(broken), str(tmp_path / "missing.npy"), str(good)]) == 2
+    out, err = capsys.readouterr()
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record["safe"] for record in records] == [False, False, True]
+    assert records[0]["error"].startswith("JSONDecodeError") and records[1]["error"].startswith("FileNotFoundError")
+    assert json.loads(err.splitlines()[-1])["errors"] == 2
+
+
+def test_malformedInputs(tmp_path, capsys):
+    inputs = []
+    for name, data in [("columns", [[0.1, 0.2, 0.3], [0.4, 0.5, 0.6]]), ("solutions", [[[0.1, 0.2]]]),
+                       ("flat", [1, 2, 3]), ("empty", [])]:
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(data))
+        inputs.append(str(path))
+    good = tmp_path / "good.json"
+    good.write_text(json.dumps([safe, nearby]))
+
+    # Every input gets a record, the malformed ones with their error
+    assert main(inputs + [str(good)]) == 2
+    out, err = capsys.readouterr()
+    records = [json.loads(line) for line in out.splitlines()]
+    assert all(record["error"].startswith("ValueError") for record in records[:4])
+    assert records[4]["safe"] and "error" not in records[4]
+    assert json.loads(err.splitlines()[-1])["errors"] == 4
+
+
+def test_singleWaypoint(tmp_path, capsys):
+    one, bad = tmp_path / "one.json", tmp_path / "bad.json"
+    one.write_text(json.dumps([safe]))
+    bad.write_text(json.dumps([unsafe]))
+    # A single waypoint is still checked
+    assert main([str(one), str(bad)]) == 1
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["safe"] for record in records] == [True, False]
+    assert records[1]["unsafe"] == [[0, 0]]
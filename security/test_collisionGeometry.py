@@ -0,0 +1,94 @@
+import json
+import os
+import struct
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from .collisionGeometry import (CollisionGeometryCache, _rpyToMatrix, compareGeometry, fitCapsule,
+                                generateSimplifiedUrdf, meshVolume, readStl)
+
+# Triangles of a unit cube centered on the origin
+CUBE = np.array([
+    [[0, 0, 0], [1, 1, 0], [1, 0, 0]], [[0, 0, 0], [0, 1, 0], [1, 1, 0]],
+    [[0, 0, 1], [1, 0, 1], [1, 1, 1]], [[0, 0, 1], [1, 1, 1], [0, 1, 1]],
+    [[0, 0, 0], [1, 0, 0], [1, 0, 1]], [[0, 0, 0], [1, 0, 1], [0, 0, 1]],
+    [[0, 1, 0], [1, 1, 1], [1, 1, 0]], [[0, 1, 0], [0, 1, 1], [1, 1, 1]],
+    [[0, 0, 0], [0, 0, 1], [0, 1, 1]], [[0, 0, 0], [0, 1, 1], [0, 1, 0]],
+    [[1, 0, 0], [1, 1, 0], [1, 1, 1]], [[1, 0, 0], [1, 1, 1], [1, 0, 1]],
+], dtype=float) - 0.5
+
+
+def _writeBox(path, size):
+    triangles = CUBE * size
+    with open(path, "wb") as file:
+        file.write(b"\0" * 80 + struct.pack("<I", len(triangles)))
+        for triangle in triangles:
+            file.write(struct.pack("<12fH", 0, 0, 0, *triangle.ravel(), 0))
+
+
+def _writeUrdf(tmp_path):
+    os.makedirs(tmp_path / "collision")
+    _writeBox(tmp_path / "collision" / "base.stl", [0.1, 0.1, 0.1])
+    _writeBox(tmp_path / "collision" / "arm.stl", [0.04, 0.04, 0.3])
+    link = """<link name="{name}"><inertial><mass value="1"/><inertia ixx="0.01" ixy="0" ixz="0" iyy="0.01" iyz="0" izz="0.01"/></inertial>
+        <collision><origin xyz="{xyz}" rpy="{rpy}"/><geometry><mesh filename="collision/{name}.stl"/></geometry></collision></link>"""
+    urdf = f"""<robot name="test">{link.format(name="base", xyz="0 0 0.05", rpy="0 0 0")}
+        {link.format(name="arm", xyz="0.1 0 0.15", rpy="0 0.3 0")}
+        <joint name="joint" type="revolute"><parent link="base"/><child link="arm"/><origin xyz="0 0 0.1"/>
+        <axis xyz="0 1 0"/><limit lower="-3.14" upper="3.14" effort="10" velocity="1"/></joint></robot>"""
+    (tmp_path / "robot.urdf").write_text(urdf)
+    return str(tmp_path / "robot.urdf")
+
+
+def test_fitCapsule():
+    rng = np.random.default_rng(0)
+    points = rng.normal(size=(500, 3)) * [0.02, 0.02, 0.2] + [0.1, -0.2, 0.3]
+    capsule = fitCapsule(points)
+    start, end = np.array(capsule["start"]), np.array(capsule["end"])
+    t = np.clip((points - start) @ (end - start) / np.sum((end - start) ** 2), 0, 1)
+    distances = np.linalg.norm(points - (start + t[:, None] * (end - start)), axis=1)
+    assert np.all(distances <= capsule["radius"] + 1e-9)
+    assert abs((end - start)[2]) > 0.5
+
+
+def test_cache(tmp_path):
+    _writeBox(tmp_path / "box.stl", [0.04, 0.04, 0.3])
+    assert meshVolume(readStl(str(tmp_path / "box.stl"))) == pytest.approx(0.04 * 0.04 * 0.3)
+
+    cache = CollisionGeometryCache(str(tmp_path / "cache"))
+    capsule = cache.getCapsule(str(tmp_path / "box.stl"))
+    assert capsule["volumeRatio"] > 1
+    files = os.listdir(tmp_path / "cache")
+    assert len(files) == 1
+
+    # Same content, same entry, another scale, another entry
+    _writeBox(tmp_path / "copy.stl", [0.04, 0.04, 0.3])
+    assert cache.getCapsule(str(tmp_path / "copy.stl")) == capsule
+    cache.getCapsule(str(tmp_path / "box.stl"), (2.0, 1.0, 1.0))
+    assert len(os.listdir(tmp_path / "cache")) == 2
+
+
+def test_generatedUrdf(tmp_path):
+    urdf = _writeUrdf(tmp_path)
+    cache = CollisionGeometryCache(str(tmp_path / "cache"))
+    simplified = generateSimplifiedUrdf(urdf, "capsules", cache)
+    assert simplified.endswith("robot_capsules.urdf")
+    text = open(simplified).read()
+    assert text.count("<capsule") == 2 and "<mesh" not in text
+
+    # The capsule of the arm lies along the tilted box
+    origin = ET.parse(simplified).getroot().find("link[@name='arm']/collision/origin")
+    assert [float(value) for value in origin.get("xyz").split()] == pytest.approx([0.1, 0.0, 0.15], abs=1e-6)
+    axis = _rpyToMatrix([float(value) for value in origin.get("rpy").split()])[:, 2]
+    assert abs(axis @ _rpyToMatrix([0.0, 0.3, 0.0])[:, 2]) == pytest.approx(1.0)
+
+    report = compareGeometry(urdf, simplified, samples=50, cache=cache)
+    assert report["samples"] == 50
+    assert set(report["volumeRatios"]) == {"base", "arm"}
+    assert report["missed"] == 0
+    json.dumps(report)
+
+    with pytest.raises(ValueError):
+        generateSimplifiedUrdf(urdf, "unknown", cache)
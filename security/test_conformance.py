@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from .backends import getChecker
+from .conformance import loadCounterexamples, parseBackend, runConformance, sampleBoundaryConfigurations, saveCounterexamples
+
+
+def test_parseBackend():
+    assert parseBackend("analytic") == ("analytic", 0.0)
+    assert parseBackend("hierarchical@0.01") == ("hierarchical", 0.01)
+    with pytest.raises(ValueError):
+        parseBackend("unknown")
+
+
+def test_sampleBoundaryConfigurations():
+    configs = sampleBoundaryConfigurations(50, rng=np.random.default_rng(0))
+    valid, _ = getChecker("analytic").checkBatch(configs)
+    # First half valid, second half not valid, each pair close to each other
+    assert valid[:len(configs) // 2].all() and not valid[len(configs) // 2:].any()
+    assert np.abs(configs[:len(configs) // 2] - configs[len(configs) // 2:]).max() < 2 * np.pi / 2 ** 8 + 1e-9
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_runConformance(workers):
+    # A larger margin only declares more configurations unsafe
+    report = runConformance(2000, reference="analytic", backends=["analytic@0.02"], workers=workers, chunkSize=500,
+                            maxCounterexamples=10)
+    result = report["backends"]["analytic@0.02"]
+    assert report["samples"] == 2000 and report["boundarySamples"] == 400
+    assert result["falseSafe"] == 0 and result["worstFalseSafeClearance"] is None
+    assert result["falseUnsafe"] > 0 and result["disagreements"] == result["falseUnsafe"]
+    assert 0 <= result["worstFalseUnsafeClearance"] < 0.02
+    assert len(result["counterexamples"]) == 10
+
+
+def test_saveCounterexamples(tmp_path):
+    report = runConformance(500, reference="analytic@0.02", backends=["analytic"], maxCounterexamples=5)
+    paths = saveCounterexamples(report, tmp_path)
+    assert [path.split("/")[-1] for path in paths] == ["analytic_vs_analytic@0.02.json"]
+
+    configs, referenceValid = loadCounterexamples(paths[0])
+    assert configs.shape == (5, 6) and not referenceValid.any()
+    # The compared backend declares them safe, the worst first
+    valid, clearances = getChecker("analytic").checkBatch(configs)
+    assert valid.all() and np.all(np.diff(clearances) <= 0)
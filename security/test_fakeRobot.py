@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from .fakeRobot import FakeISCoin, loadTrajectorySamples, syntheticSamples
+
+start = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+
+
+def test_loadTrajectorySamples():
+    samples = loadTrajectorySamples("security/trajectories_test/traj_test.json", rate=125.0)
+    # Waypoints from 4s to 10s
+    assert samples.shape == (6 * 125 + 1, 6)
+    assert samples[0] == pytest.approx([0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0])
+
+
+@pytest.mark.parametrize("jitter", [0.0, 0.002])
+def test_deterministic_serving(jitter):
+    samples = syntheticSamples(start, duration=1.0, rate=125.0)
+    reads = []
+    for _ in range(2):
+        robot = FakeISCoin(samples, rate=125.0, jitter=jitter, realTime=False, seed=3)
+        reads.append([robot.robot_control.get_actual_joint_positions().toList() for _ in range(50)])
+    assert reads[0] == reads[1]
+    if not jitter:
+        assert reads[0][9] == pytest.approx(samples[10].tolist())
+
+
+def test_latency_and_stop():
+    samples = syntheticSamples(start, duration=2.0, rate=100.0)
+    robot = FakeISCoin(samples, rate=100.0, latency=0.05, realTime=False)
+
+    # 5 ticks of latency on the readings
+    positions = [robot.robot_control.get_actual_joint_positions().toList() for _ in range(20)]
+    assert positions[19] == pytest.approx(samples[15].tolist())
+
+    robot.robot_control.stopj()
+    stopTick = robot.stopEvents[0][1]
+    assert stopTick == 26
+    # The robot keeps moving until the command arrives, then holds its position
+    positions = [robot.robot_control.get_actual_joint_positions().toList() for _ in range(20)]
+    assert positions[-1] == pytest.approx(samples[stopTick].tolist())
+    assert robot.stopReactionLatency(20) == pytest.approx(0.06)
+
+
+def test_movej():
+    robot = FakeISCoin(np.array([start]), rate=125.0, realTime=False)
+    target = list(np.array(start) + 0.1)
+    robot.robot_control.movej(target, v=1.0)
+    positions = [robot.robot_control.get_actual_joint_positions().toList() for _ in range(30)]
+    assert positions[-1] == pytest.approx(target)
@@ -1,6 +1,6 @@
 import pytest
 
-from .forwardKinematics import ForwardKinematic
+from .forwardKinematics import ForwardKinematic, BatchForwardKinematic
 
 # filepath: /home/marta/Projects/SecurityModule/test_unitTestsFk.py
 
@@ -113,4 +113,14 @@ def test_getCoordinates(angles_test, coordinates_test_case):
     coordinates = fk.getCoordinates()
     for coords_fk, coords_test in zip(coordinates.values(), coordinates_test_case.values()):
         for key in ["x", "y", "z"]:
-            assert abs(coords_fk[key] - coords_test[key]) <= tolerance
\ No newline at end of file
+            assert abs(coords_fk[key] - coords_test[key]) <= tolerance
+
+
+@pytest.mark.parametrize("angles_test", angles)
+def test_batchCoordinates(angles_test):
+    expected = ForwardKinematic(angles_test).getCoordinates()
+    coordinates = BatchForwardKinematic([angles_test, angles_test]).getCoordinates()
+    assert coordinates.shape == (2, 6, 3)
+    for i, point in expected.items():
+        for k, key in enumerate(["x", "y", "z"]):
+            assert abs(coordinates[1][i - 1][k] - point[key]) <= tolerance
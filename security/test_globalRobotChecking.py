@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+
+from .fakeRobot import FakeISCoin, syntheticSamples
+from .globalRobotChecking import TCP_SPEED_WINDOW, GlobalRobotChecking
+
+start = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+
+
+def test_runWithoutInterval():
+    robot = FakeISCoin(syntheticSamples(start, duration=1.0, rate=125.0), rate=125.0, realTime=False)
+    checker = GlobalRobotChecking(logs=False, iscoin=robot)
+    checker._isCollisionFree = lambda angles: True
+    checker.start()
+    time.sleep(0.2)
+    checker.stop()
+    # Without an interval the checks run back to back until stop, no overrun is counted
+    assert checker.stats["ticks"] > 1
+    assert checker.stats["overruns"] == 0
+    assert not checker.running
+
+
+def test_tcpSpeedOnSampleTimes():
+    robot = FakeISCoin(syntheticSamples(start, duration=1.0, rate=125.0), rate=125.0, jitter=0.002, realTime=False)
+    checker = GlobalRobotChecking(logs=False, interval=robot.period, iscoin=robot, tcpSpeedLimit=1500.0,
+                                  getTimestamp=lambda: robot.lastSampleTime)
+    checker._isCollisionFree = lambda angles: True
+    assert checker.tcpSpeedMonitor.window == 1
+    checker.oldAngles = start
+    for _ in range(50):
+        angles = robot.robot_control.get_actual_joint_positions().toList()
+        checker.checkNextBehaviour(angles, checker.getTimestamp())
+        # Each sample is timed when the robot took it, not when it was read
+        assert checker.timestamp == robot.lastSampleTime
+    assert checker.isValid
+    assert 0.0 < checker.tcpSpeedMonitor.maxSpeed < 1500.0
+
+    # Without the sample times, the speed is smoothed over several reads
+    assert GlobalRobotChecking(logs=False, tcpSpeedLimit=1500.0).tcpSpeedMonitor.window == TCP_SPEED_WINDOW
+
+
+def test_tcpSpeedWithoutInterval():
+    timestamps = iter(np.arange(20) * 0.001)
+    checker = GlobalRobotChecking(logs=False, tcpSpeedLimit=10.0, getTimestamp=lambda: next(timestamps))
+    checker._isCollisionFree = lambda angles: True
+    results = [checker.checkNextBehaviour((np.array(start) + [0.5 * i, 0, 0, 0, 0, 0]).tolist(), checker.getTimestamp())
+               for i in range(5)]
+    # The speed is checked on every call, only the first sample has no speed yet
+    assert results[0] and not any(results[1:])
+    assert checker.tcpSpeedMonitor.maxSpeed > 10.0
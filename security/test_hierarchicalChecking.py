@@ -0,0 +1,86 @@
+import types
+
+import numpy as np
+
+from .batchCollisionChecking import BatchCollisionCheck
+from .capsules import LINK_RADII, MESH_INFLATION, getCapsules, segmentDistances
+from .hierarchicalChecking import COARSE_PAIRS, RIGID_PAIRS, HierarchicalCollisionCheck
+from .interpolation import Interpolation
+
+safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+unsafe = [0.0, -3.14, 3.14, 0.0, 0.0, 0.0]
+
+
+class CountingChecker():
+    """ Exact checker stand-in recording the configurations it receives """
+
+    def __init__(self):
+        self.checker = BatchCollisionCheck()
+        self.configs = []
+
+    def checkBatch(self, configs):
+        self.configs.extend(np.asarray(configs).tolist())
+        return self.checker.checkBatch(configs)
+
+
+def test_freeSpaceAvoidsExactChecks():
+    exact = CountingChecker()
+    checker = HierarchicalCollisionCheck(exact)
+    path = np.array(safe) + np.linspace(0, 0.3, 100)[:, None] * np.array([1, 0, 0, 0, 0, 1])
+    valid, _ = checker.checkBatch(path)
+    assert valid.all()
+    assert checker.stats["samples"] == 100
+    assert checker.avoidedChecks >= 90
+
+
+def test_escalatesUnsafe():
+    exact = CountingChecker()
+    checker = HierarchicalCollisionCheck(exact)
+    valid, _ = checker.checkBatch([safe, unsafe])
+    assert valid.tolist() == [True, False]
+    assert exact.configs == [unsafe]
+
+
+def test_sameVerdictAsExact():
+    configs = np.random.default_rng(0).uniform(-np.pi, np.pi, (500, 6))
+    checker = HierarchicalCollisionCheck(CountingChecker())
+    assert np.array_equal(checker.checkBatch(configs)[0], BatchCollisionCheck().checkBatch(configs)[0])
+
+
+def test_interpolationBackend():
+    interpolation = Interpolation(False, False, backend="hierarchical")
+    interpolation.checker = HierarchicalCollisionCheck(CountingChecker())
+    assert interpolation.checkSafeTrajectories([safe, unsafe]) == {(0, 1): (safe, unsafe)}
+
+
+def test_coarsePairsCoverEveryMovingPair():
+    configs = np.random.default_rng(0).uniform(-np.pi, np.pi, (2000, 6))
+    starts, ends = getCapsules(configs)
+    for i in range(len(LINK_RADII)):
+        for j in range(i + 2, len(LINK_RADII)):
+            distances = segmentDistances(starts[:, i], ends[:, i], starts[:, j], ends[:, j])
+            # Only the pairs at a fixed distance are left out of the coarse test
+            assert ((i, j) in RIGID_PAIRS) == (np.ptp(distances) < 1e-9)
+            assert ((i, j) in RIGID_PAIRS) != ([i, j] in COARSE_PAIRS.tolist())
+
+
+def test_escalatesWristPairs():
+    # Positions where the inflated wrist 1 and gripper capsules overlap, all clear for the analytic backend
+    configs = np.random.default_rng(1).uniform(-np.pi, np.pi, (5000, 6))
+    starts, ends = getCapsules(configs)
+    radius = LINK_RADII[3] + LINK_RADII[6] + 2 * MESH_INFLATION
+    overlapping = segmentDistances(starts[:, 3], ends[:, 3], starts[:, 6], ends[:, 6]) < radius
+    configs = configs[overlapping & BatchCollisionCheck(radii=LINK_RADII + MESH_INFLATION).checkBatch(configs)[0]]
+    assert len(configs)
+
+    exact = CountingChecker()
+    HierarchicalCollisionCheck(exact).checkBatch(configs)
+    assert len(exact.configs) == len(configs)
+
+
+def test_exactCheckerSceneMargin(monkeypatch):
+    created = []
+    module = types.SimpleNamespace(RobotCollisionCheck=lambda *args, **kwargs: created.append(kwargs) or CountingChecker())
+    monkeypatch.setitem(__import__("sys").modules, "security.collisionChecking", module)
+    HierarchicalCollisionCheck(margin=0.02).checkBatch([unsafe])
+    assert created[0]["sceneMargin"] == 0.02
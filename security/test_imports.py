@@ -0,0 +1,27 @@
+import subprocess
+import sys
+
+
+def test_coreImportIsLight():
+    code = ("import sys, security; security.BatchCollisionCheck().checkBatch([[0.0] * 6]); "
+            "print(sorted(name for name in ('pybullet', 'simulator', 'urbasic', 'plotly', 'matplotlib') if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_optionalModulesAreLazy():
+    # The modules outside of the core checks, and the standard library modules they need, wait for their first use
+    code = ("import sys, security; security.Interpolation(False, False, backend='analytic').checkSafeTrajectories([[0.0] * 6] * 2); "
+            "print(sorted(name for name in ('asyncio', 'concurrent.futures', 'xml.etree.ElementTree', 'socket', "
+            "'security.scene', 'security.asyncChecking', 'security.conformance', 'security.trajectoryPlot') if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_lazyNames():
+    import security
+
+    for name in security._LAZY_NAMES:
+        if security._LAZY_NAMES[name] not in (".collisionChecking", ".globalRobotChecking"):
+            assert getattr(security, name) is not None
+    assert security.Scene.__module__ == "security.scene" and "AsyncRobotChecker" in dir(security)
@@ -57,4 +57,55 @@ def test_getInterpolatedTrajectory(angles1, angles2, expected_middle):
     
     # Verify the middle step matches the expected middle angles
         middle_index = len(result) // 2
-        assert result[middle_index] == pytest.approx(expected_middle, abs=1e-2), "Middle step should match expected angles"
\ No newline at end of file
+        assert result[middle_index] == pytest.approx(expected_middle, abs=1e-2), "Middle step should match expected angles"
+
+@pytest.mark.parametrize("stopAtFirstError", [True, False])
+def test_parallelCheckSafeTrajectories(stopAtFirstError):
+    safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+    unsafe = [0.0, -3.14, 3.14, 0.0, 0.0, 0.0]
+    angles = (np.array(safe) + np.linspace(0, 0.5, 40)[:, None] * np.array([1, 0, 0, 0, 0, 1])).tolist()
+    angles[12] = angles[30] = unsafe
+
+    sequential = Interpolation(False, stopAtFirstError, backend="analytic").checkSafeTrajectories(angles)
+    parallel = Interpolation(False, stopAtFirstError, backend="analytic", workers=4).checkSafeTrajectories(angles)
+    assert parallel == sequential
+    assert Interpolation(False, stopAtFirstError, backend="analytic", workers=4).checkSafeTrajectories(angles[:10]) == {}
+
+def test_parallelWorkersAreKept():
+    safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+    angles = (np.array(safe) + np.linspace(0, 0.5, 20)[:, None] * np.array([1, 0, 0, 0, 0, 1])).tolist()
+    with Interpolation(False, True, backend="analytic", workers=2) as interpolation:
+        assert interpolation.checkSafeTrajectories(angles) == {}
+        executor = interpolation.executor
+        assert interpolation.checkSafeTrajectories(angles) == {}
+        assert interpolation.executor is executor
+    assert interpolation.executor is None
+    # The workers are started again by the next check
+    assert interpolation.checkSafeTrajectories(angles) == {}
+    assert interpolation.executor is not None
+    interpolation.close()
+
+def test_runningChecksAreCancelled():
+    class CountingChecker():
+        def __init__(self):
+            self.calls = 0
+
+        def checkBatch(self, configs):
+            self.calls += 1
+            return np.ones(len(configs), dtype=bool), np.ones(len(configs))
+
+    safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+    interpolation = Interpolation(False, True, backend="pybullet")
+    interpolation.checker = CountingChecker()
+    steps = len(interpolation._getInterpSingleTrajectory(safe, np.add(safe, 0.5)))
+    # PyBullet checks the positions one at a time and stops as soon as the check is cancelled
+    assert interpolation._isTrajectoriesSafe(safe, np.add(safe, 0.5), lambda: interpolation.checker.calls >= 3) is None
+    assert interpolation.checker.calls == 3 < steps
+
+    interpolation = Interpolation(False, True, backend="analytic", workers=2)
+    _, check = interpolation._getExecutor()
+    interpolation._firstUnsafe.value = 4
+    # Segments after the first unsafe one are not checked, the ones before still are
+    assert check(5, safe, np.add(safe, 0.1)) is None
+    assert check(3, safe, np.add(safe, 0.1)) is True
+    interpolation.close()
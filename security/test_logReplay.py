@@ -0,0 +1,67 @@
+import pytest
+
+from .logReplay import UrLogReplay, iterUrDataLog, readUrEvents
+
+safeAngles = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+fastAngles = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.5]  # joint 6 moves 0.5 rad in 8ms
+
+
+class FakeCollisionChecker():
+    def __init__(self):
+        self.calls = 0
+
+    def isValidConfiguration(self, angles):
+        self.calls += 1
+        return True
+
+
+@pytest.fixture
+def logDir(tmp_path):
+    session = tmp_path / "2025-03-24" / "13-28-39"
+    session.mkdir(parents=True)
+    rows = ["timestamp;actual_q_0;actual_q_1;actual_q_2;actual_q_3;actual_q_4;actual_q_5"]
+    for i in range(10):
+        angles = fastAngles if i == 5 else safeAngles
+        rows.append(";".join(str(value) for value in [i * 0.008] + angles))
+    (session / "UrDataLog.csv").write_text("\n".join(rows) + "\n")
+    (session / "UrEvent.log").write_text(
+        "2025-03-24 13:44:20,231 - urbasic_realTimeClientEvent - ERROR - SendProgram: Safety Stop\n"
+        "2025-03-24 13:44:20,239 - urbasic_rtdeEvent - ERROR - Lost some RTDE at 3054.46 - 10.000000000218279 milliseconds since last package\n"
+    )
+    (tmp_path / "2025-03-24" / "13-41-51").mkdir()
+    (tmp_path / "2025-03-24" / "13-41-51" / "UrDataLog.csv").write_text("")
+    return tmp_path
+
+
+def test_iterUrDataLog_chunks(logDir):
+    chunks = list(iterUrDataLog(str(logDir / "2025-03-24" / "13-28-39" / "UrDataLog.csv"), chunkSize=4))
+    assert [len(timestamps) for timestamps, _ in chunks] == [4, 4, 2]
+    assert chunks[0][1].shape == (4, 6)
+
+
+def test_readUrEvents(logDir):
+    events = readUrEvents(str(logDir / "2025-03-24" / "13-28-39" / "UrEvent.log"))
+    assert [event["level"] for event in events] == ["ERROR", "ERROR"]
+    assert events[0]["message"] == "SendProgram: Safety Stop"
+
+
+@pytest.mark.parametrize("chunkSize", [3, 4096])
+def test_replaySession(logDir, chunkSize):
+    checker = FakeCollisionChecker()
+    replay = UrLogReplay(str(logDir), chunkSize=chunkSize, collisionChecker=checker)
+    assert replay.listSessions() == ["2025-03-24/13-28-39", "2025-03-24/13-41-51"]
+
+    report = replay.replaySession("2025-03-24/13-28-39")
+    assert report["samples"] == 10
+    # Going to and coming back from the fast sample
+    assert [violation["index"] for violation in report["velocity"]["violations"]] == [5, 6]
+    assert report["velocity"]["violations"][0]["joints"] == [6]
+    assert report["collision"]["count"] == 0
+    # Only the two distinct configurations are simulated
+    assert checker.calls == 2
+    assert report["events"]["safetyStops"] == 1
+    assert report["events"]["maxRtdeGapMs"] == pytest.approx(10.0)
+    assert not report["valid"]
+
+    empty = replay.replaySession("2025-03-24/13-41-51")
+    assert empty["samples"] == 0 and empty["valid"]
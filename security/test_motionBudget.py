@@ -0,0 +1,63 @@
+import numpy as np
+
+from .batchCollisionChecking import AREA_BOUNDS, BatchCollisionCheck
+from .capsules import LINK_RADII, MESH_INFLATION, getCapsules
+from .motionBudget import MotionBudget
+from .scene import OtherRobot, Scene, SphereObstacle
+
+start = np.array([0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0])
+
+
+def test_budgetIsSafe():
+    rng = np.random.default_rng(0)
+    budget = MotionBudget()
+    inflated = BatchCollisionCheck(checkArea=False, radii=LINK_RADII + MESH_INFLATION)
+
+    references = rng.uniform(-np.pi, np.pi, (300, 6))
+    references = references[inflated.checkBatch(references)[0]]
+    skipped = 0
+    for reference in references:
+        if budget.reset(reference) == 0.0:
+            continue
+        moved = reference + rng.uniform(-1, 1, (50, 6)) * rng.choice([0.001, 0.01, 0.05, 0.2], (50, 1))
+        within = np.array([budget.isWithinBudget(angles) for angles in moved])
+        skipped += within.sum()
+        # Every position within the budget is collision free and in the working area
+        assert inflated.checkBatch(moved[within])[0].all()
+        tips = getCapsules(moved[within])[1][:, -1]
+        assert np.all((tips >= AREA_BOUNDS[0]) & (tips <= AREA_BOUNDS[1]))
+    assert skipped > 0
+
+
+def test_budget():
+    budget = MotionBudget()
+    assert not budget.isWithinBudget(start)
+    assert budget.reset(start) > 0
+    assert budget.isWithinBudget(start)
+    assert budget.isWithinBudget(start + [0.002, 0.002, 0.002, 0.0, 0.0, 0.0])
+    assert not budget.isWithinBudget(start + [0.5, 0.0, 0.0, 0.0, 0.0, 0.0])
+    budget.invalidate()
+    assert not budget.isWithinBudget(start)
+
+    # Outside of the working area nothing is skipped
+    assert budget.reset([0.0, -1.57, 0.0, -1.57, 0.0, 0.0]) == 0.0
+    assert not budget.isWithinBudget([0.0, -1.57, 0.0, -1.57, 0.0, 0.0])
+
+
+def test_budgetWithScene():
+    # A small sphere on the way of the pen tip when the base turns
+    scene = Scene([SphereObstacle(getCapsules([start + [0.2, 0, 0, 0, 0, 0]])[1][0, -1], 0.005)])
+    moved = start + np.linspace(0, 0.2, 200)[:, None] * [1, 0, 0, 0, 0, 0]
+    plain, budget = MotionBudget(), MotionBudget(scene=scene)
+    assert plain.reset(start) > 0 and budget.reset(start) > 0
+
+    # Without the scene the budget reaches the sphere, with it every skipped position is collision free
+    within = np.array([budget.isWithinBudget(angles) for angles in moved])
+    assert not BatchCollisionCheck(scene=scene).checkBatch(moved[[plain.isWithinBudget(angles) for angles in moved]])[0].all()
+    assert within.any() and BatchCollisionCheck(scene=scene).checkBatch(moved[within])[0].all()
+
+    # The budget ends when another robot of the cell moves
+    scene.addRobot(OtherRobot("ur2", position=(2.0, 0.0, 0.0)))
+    assert budget.reset(start) > 0 and budget.isWithinBudget(start)
+    scene.setRobotAngles("ur2", [0.5, -1.57, 0.0, -1.57, 0.0, 0.0])
+    assert not budget.isWithinBudget(start)
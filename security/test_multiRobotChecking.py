@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+import pytest
+
+from .capsules import makeBaseTransform
+from .fakeRobot import FakeISCoin
+from .multiRobotChecking import MultiRobotChecking
+
+stretched = [0.0, 0.0, 0.0, 0.0, 0.0, 0.0]  # Arm stretched along -x
+
+
+class FakeCollisionChecker():
+    def isValidConfiguration(self, angles):
+        return True
+
+
+def makeChecking(distance, **kwargs):
+    robots = {name: FakeISCoin(np.array([stretched]), realTime=False) for name in ("left", "right")}
+    baseTransforms = {"right": makeBaseTransform((-distance, 0.0, 0.0), np.pi)}
+    return MultiRobotChecking(robots, baseTransforms, interval=0.01, logs=False,
+                              collisionChecker=FakeCollisionChecker(), **kwargs), robots
+
+
+@pytest.mark.parametrize("distance, expected", [(0.8, False), (1.5, True)])
+def test_interRobot(distance, expected):
+    checking, _ = makeChecking(distance)
+    results = checking.checkPoses({"left": stretched, "right": stretched})
+    assert results["left"]["valid"] == expected
+    assert results["right"]["valid"] == expected
+    if not expected:
+        assert results["left"]["interRobot"][0][0] == "right"
+
+
+def test_sharedWorkspaces():
+    checking, _ = makeChecking(0.8, sharedWorkspaces=[])
+    results = checking.checkPoses({"left": stretched, "right": stretched})
+    assert results["left"]["valid"] and results["right"]["valid"]
+
+
+def test_speed():
+    checking, _ = makeChecking(1.5)
+    moved = list(stretched)
+    moved[1] = 0.5
+    results = checking.checkPoses({"left": stretched, "right": moved}, {"left": stretched, "right": stretched}, 0.1)
+    assert results["left"]["valid"]
+    assert results["right"]["highVariations"] == [2]
+
+
+def test_stopOnViolation():
+    checking, robots = makeChecking(0.8, stopOnViolation=True)
+    checking.start()
+    time.sleep(0.1)
+    checking.stop()
+    assert checking.stats["ticks"] > 0
+    assert robots["left"].isStopped() and robots["right"].isStopped()
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from .batchCollisionChecking import BatchCollisionCheck
+from .capsules import getCapsules
+from .reachabilityMap import ReachabilityMap
+
+
+def _configurations(count=20000, seed=1):
+    configs = np.random.default_rng(seed).uniform(-np.pi, np.pi, (count, 6))
+    valid, clearances = BatchCollisionCheck().checkBatch(configs)
+    return configs, valid, clearances
+
+
+def test_reachableTargets():
+    configs, valid, clearances = _configurations()
+    reachability = ReachabilityMap(voxelSize=0.1)
+    reachability.addConfigurations(configs)
+    tips = getCapsules(configs, toolLength=0.1)[1][:, -1]
+
+    # Every tip of a valid configuration is reachable, with at least its clearance
+    assert reachability.isReachable(tips[valid]).all()
+    assert (reachability.getClearances(tips[valid]) >= clearances[valid].astype(np.float32)).all()
+    assert 0 < reachability.coverage() < 1
+
+    # Outside the working area
+    outside = [[0.0, 0.0, 0.7], [0.7, 0.0, 0.3], [0.0, 0.0, -0.05]]
+    assert not reachability.isReachable(outside).any()
+    assert (reachability.getClearances(outside) == -np.inf).all()
+
+
+def test_tolerance():
+    reachability = ReachabilityMap(voxelSize=0.1)
+    configs, valid, _ = _configurations(2000)
+    reachability.addConfigurations(configs[valid][:1])
+    tip = getCapsules(configs[valid][:1], toolLength=0.1)[1][0, -1]
+    neighbour = tip + [0.1, 0.0, 0.0] if tip[0] < 0.5 else tip - [0.1, 0.0, 0.0]
+
+    assert reachability.isReachable([tip]).all()
+    assert not reachability.isReachable([neighbour]).any()
+    assert reachability.isReachable([neighbour], tolerance=1).all()
+    assert not reachability.isReachable([tip], minClearance=1.0).any()
+
+
+def test_saveLoad(tmp_path):
+    reachability = ReachabilityMap.build(samples=5000, voxelSize=0.1, chunkSize=2000)
+    assert reachability.samples == 5000
+    path = reachability.save(str(tmp_path / "reachability"))
+
+    loaded = ReachabilityMap.load(path)
+    assert isinstance(loaded.voxels, np.memmap)
+    assert loaded.samples == 5000 and loaded.shape == reachability.shape
+    assert np.array_equal(loaded.voxels["reachable"], reachability.voxels["reachable"])
+
+    points = np.random.default_rng(0).uniform(-0.62, 0.62, (1000, 3))
+    assert np.array_equal(loaded.isReachable(points), reachability.isReachable(points))
+
+
+def test_withoutClearances():
+    class NoClearanceChecker():
+        """ Verdicts of the analytic backend without the clearances, as the pybullet backend """
+
+        def checkBatch(self, configs):
+            valid, clearances = BatchCollisionCheck().checkBatch(configs)
+            return valid, np.full(len(valid), np.nan)
+
+    configs, valid, _ = _configurations(2000)
+    reachability = ReachabilityMap(voxelSize=0.1)
+    reachability.addConfigurations(configs, NoClearanceChecker())
+    tips = getCapsules(configs[valid], toolLength=0.1)[1][:, -1]
+    assert reachability.isReachable(tips).all()
+    assert np.isnan(reachability.getClearances(tips)).all()
+    with pytest.raises(ValueError):
+        reachability.isReachable(tips, minClearance=0.0)
+    with pytest.raises(ValueError):
+        reachability.isReachable(tips + [0.1, 0.0, 0.0], minClearance=0.0, tolerance=1)
+
+    # A computed clearance replaces the unknown one
+    reachability.addConfigurations(configs)
+    assert not np.isnan(reachability.getClearances(tips)).any()
+    assert reachability.isReachable(tips, minClearance=-1.0).all()
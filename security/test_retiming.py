@@ -0,0 +1,59 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from .checkAnglesVariation import SPEED_LIMITS, getBatchVariation
+from .fakeRobot import loadTrajectorySamples
+from .retiming import ACCELERATION_LIMITS, retimeTrajectory, toModTraj
+
+trajectoryPath = os.path.join(os.path.dirname(__file__), "trajectories_test", "traj_test.json")
+
+
+def _waypoints():
+    with open(trajectoryPath, "r") as file:
+        return np.array([point["positions"] for point in json.load(file)["modTraj"]])
+
+
+def test_singleJoint():
+    # Short move: accelerate then brake, 2 * sqrt(distance / acceleration)
+    _, times, velocities = retimeTrajectory([[0.0] * 6, [1.0, 0.0, 0.0, 0.0, 0.0, 0.0]])
+    assert times[-1] == pytest.approx(2 * np.sqrt(1.0 / ACCELERATION_LIMITS[0]))
+    assert velocities[0] == pytest.approx(np.zeros(6)) and velocities[-1] == pytest.approx(np.zeros(6))
+
+    # Long move: cruise at the speed limit
+    _, times, velocities = retimeTrajectory([[0.0] * 6, [1.0, 0.0, 0.0, 0.0, 0.0, 0.0]], accelerationLimits=[100.0] * 6,
+                                            maxStep=0.001)
+    assert times[-1] == pytest.approx(1.0 / SPEED_LIMITS[0] + SPEED_LIMITS[0] / 100.0, rel=1e-3)
+    assert np.abs(velocities).max() == pytest.approx(SPEED_LIMITS[0])
+
+
+def test_limits():
+    waypoints = _waypoints()
+    positions, times, velocities = retimeTrajectory(waypoints)
+
+    assert np.all(np.diff(times) > 0)
+    assert not getBatchVariation(positions, times).any()
+    assert np.all(np.abs(velocities) <= np.array(SPEED_LIMITS) + 1e-9)
+    accelerations = np.diff(velocities, axis=0) / np.diff(times)[:, None]
+    assert np.all(np.abs(accelerations) <= np.array(ACCELERATION_LIMITS) + 1e-9)
+
+    # The waypoints are kept and the robot stops at each corner
+    indexes = [0]
+    for waypoint in waypoints[1:]:
+        indexes.append(indexes[-1] + 1 + int(np.flatnonzero(np.all(positions[indexes[-1] + 1:] == waypoint, axis=1))[0]))
+    assert velocities[indexes] == pytest.approx(np.zeros((len(waypoints), 6)))
+
+
+def test_modTraj(tmp_path):
+    positions, times, velocities = retimeTrajectory(_waypoints())
+    data = toModTraj(positions, times, velocities)
+    assert len(data["modTraj"]) == len(positions)
+    assert set(data["modTraj"][1]) == {"positions", "velocities", "time_from_start"}
+
+    path = tmp_path / "retimed.json"
+    path.write_text(json.dumps(data))
+    samples = loadTrajectorySamples(str(path), rate=125.0)
+    assert len(samples) == pytest.approx(times[-1] * 125.0, abs=1)
+    assert samples[-1] == pytest.approx(positions[-1], abs=1e-3)
@@ -0,0 +1,125 @@
+import struct
+
+import numpy as np
+import pytest
+
+from .batchCollisionChecking import BatchCollisionCheck
+from .scene import BoxObstacle, CylinderObstacle, OtherRobot, Scene, UrdfObstacle, readStl
+
+upright = [0.0, -1.5708, 0.0, -1.5708, 0.0, 0.0]  # Arm pointing up, tool at (0, -0.32, 0.69)
+
+
+@pytest.mark.parametrize("obstacle", [
+    BoxObstacle([0.3, 0.1, 0.2], [0.05, 0.1, 0.2]),
+    CylinderObstacle([-0.2, 0.3, 0.5], 0.05, 0.3),
+])
+def test_segmentClearances(obstacle):
+    rng = np.random.default_rng(1)
+    starts = rng.uniform(-0.5, 0.5, (50, 1, 3))
+    ends = rng.uniform(-0.5, 0.5, (50, 1, 3))
+    clearances = Scene([obstacle], maxDistance=10.0).capsuleClearances(starts, ends, radii=np.zeros(1))
+
+    samples = starts + np.linspace(0, 1, 2001)[None, :, None] * (ends - starts)
+    expected = obstacle.pointDistances(samples).min(axis=1)
+    assert clearances[:, 0] == pytest.approx(expected, abs=1e-3)
+
+
+@pytest.mark.parametrize("center, expected", [
+    ([0.0, -0.3, 0.72], False),  # On the tool
+    ([0.0, 0.4, 0.3], True),
+    ([5.0, 5.0, 0.3], True),
+])
+def test_checkConfigurations(center, expected):
+    scene = Scene([BoxObstacle(center, [0.03, 0.03, 0.03])])
+    valid, clearances = scene.checkConfigurations([upright])
+    assert valid[0] == expected
+
+
+def test_spatialIndex():
+    far = [BoxObstacle([x, 10.0, 0.5], [0.05, 0.05, 0.05]) for x in np.arange(-5, 5, 0.5)]
+    near = BoxObstacle([0.0, 0.2, 0.5], [0.05, 0.05, 0.05])
+    scene = Scene(far + [near])
+    assert scene.query([-0.5, -0.5, 0.0], [0.5, 0.5, 0.7]) == [near]
+
+
+def test_otherRobot():
+    scene = Scene(robots=[OtherRobot("ur2", (-0.8, 0.0, 0.0), np.pi, upright)])
+    assert scene.checkConfigurations([upright])[0][0]
+
+    # Both arms reaching the middle of the cell
+    reaching = [0.0, -0.6, 0.0, -1.5708, 0.0, 0.0]
+    scene.setRobotAngles("ur2", reaching)
+    assert not scene.checkConfigurations([reaching])[0][0]
+
+
+def test_marginBeyondMaxDistance():
+    scene = Scene([BoxObstacle([0.3, 0.0, 0.2], [0.05, 0.05, 0.2])], maxDistance=0.05)
+    far = [np.pi, -1.5708, 0.0, -1.5708, 0.0, 0.0]
+    # The clearances are computed beyond the margin, a configuration far from the box stays valid
+    valid, clearances = scene.checkConfigurations([far], margin=0.1)
+    assert valid[0] and clearances[0] > 0.1
+    scene.maxDistance = 0.02
+    safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]  # About 4 cm from the base and 8 cm from the box
+    assert BatchCollisionCheck(margin=0.03, scene=scene).checkBatch([safe])[0][0]
+
+
+def test_urdfObstacle(tmp_path):
+    path = tmp_path / "table.urdf"
+    path.write_text("""<robot name="table"><link name="top">
+        <collision><origin xyz="0 0 0.4"/><geometry><box size="0.4 0.4 0.02"/></geometry></collision>
+        <collision><origin xyz="0 0 0.2"/><geometry><cylinder radius="0.02" length="0.4"/></geometry></collision>
+    </link></robot>""")
+    table = UrdfObstacle(str(path), position=(1.0, 0.0, 0.0))
+    assert len(table.parts) == 2
+    lower, upper = table.aabb()
+    assert lower == pytest.approx([0.8, -0.2, 0.0])
+    assert upper == pytest.approx([1.2, 0.2, 0.41])
+
+    # Without any usable collision element the distances could not be computed
+    empty = tmp_path / "empty.urdf"
+    empty.write_text("""<robot name="empty"><link name="top"><visual><geometry><box size="1 1 1"/></geometry></visual></link></robot>""")
+    with pytest.raises(ValueError):
+        UrdfObstacle(str(empty))
+
+
+def test_readStl(tmp_path):
+    triangle = [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+    binary = tmp_path / "binary.stl"
+    binary.write_bytes(b"\0" * 80 + struct.pack("<I", 1) + struct.pack("<12fH", 0, 0, 1, *np.ravel(triangle), 0))
+    ascii = tmp_path / "ascii.stl"
+    ascii.write_text("solid t\nfacet normal 0 0 1\nouter loop\n" + "".join(f"vertex {x} {y} {z}\n" for x, y, z in triangle)
+                     + "endloop\nendfacet\nendsolid t\n")
+    assert readStl(str(binary)) == pytest.approx(np.array(triangle))
+    assert readStl(str(ascii)) == pytest.approx(np.array(triangle))
+
+
+def test_loadInPybullet():
+    p = pytest.importorskip("pybullet")
+    client = p.connect(p.DIRECT)
+    try:
+        bodies = Scene([BoxObstacle([0.3, 0.0, 0.2], [0.05, 0.05, 0.2]), CylinderObstacle([0, 0.3, 0.1], 0.05, 0.2)]).loadInPybullet(client)
+        assert len(bodies) == 2
+        assert p.getNumBodies(physicsClientId=client) == 2
+    finally:
+        p.disconnect(client)
+
+
+def test_otherRobotJointsInPybullet(tmp_path):
+    p = pytest.importorskip("pybullet")
+    # Fixed joints before, between and after the 6 revolute joints of the arm
+    links = "".join(f'<link name="l{i}"><inertial><mass value="1"/><inertia ixx="1" ixy="0" ixz="0" iyy="1" iyz="0" izz="1"/></inertial></link>' for i in range(10))
+    types = ["fixed", "revolute", "revolute", "fixed", "revolute", "revolute", "revolute", "revolute", "fixed"]
+    joints = "".join(f'<joint name="j{i}" type="{kind}"><parent link="l{i}"/><child link="l{i + 1}"/><axis xyz="0 0 1"/>'
+                     f'<limit lower="-6.28" upper="6.28" effort="1" velocity="1"/></joint>' for i, kind in enumerate(types))
+    path = tmp_path / "arm.urdf"
+    path.write_text(f'<robot name="arm">{links}{joints}</robot>')
+
+    client = p.connect(p.DIRECT)
+    try:
+        body = p.loadURDF(str(path), useFixedBase=True, physicsClientId=client)
+        robot = OtherRobot("ur2", angles=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6])
+        robot.updateInPybullet(body, client)
+        assert robot.getJointIndexes(body, client) == [1, 2, 4, 5, 6, 7]
+        assert [p.getJointState(body, j, physicsClientId=client)[0] for j in [1, 2, 4, 5, 6, 7]] == pytest.approx(robot.angles)
+    finally:
+        p.disconnect(client)
@@ -0,0 +1,51 @@
+import numpy as np
+
+from .batchCollisionChecking import BatchCollisionCheck
+from .interpolation import Interpolation
+from .scene import BoxObstacle, Scene
+from .segmentRepair import RrtConnectPlanner, repairTrajectory
+
+left = [-1.0, -1.9, 1.6, -1.3, -1.57, 0.0]
+right = [0.0, -1.9, 1.6, -1.3, -1.57, 0.0]
+
+
+def _blockedInterpolation():
+    """ Analytic interpolation with a box on the way of the pen between left and right """
+    interpolation = Interpolation(logs=False, backend="analytic")
+    interpolation.checker = BatchCollisionCheck(scene=Scene([BoxObstacle([-0.22, 0.0, 0.1], [0.05, 0.03, 0.1])]))
+    return interpolation
+
+
+def test_plan():
+    interpolation = _blockedInterpolation()
+    assert not interpolation._isTrajectoriesSafe(left, right)
+
+    path = RrtConnectPlanner(interpolation, timeBudget=5.0).plan(left, right)
+    assert path is not None and len(path) > 2
+    assert np.allclose(path[0], left) and np.allclose(path[-1], right)
+    assert interpolation.checkSafeTrajectories(path) == {}
+
+
+def test_repairTrajectory():
+    interpolation = _blockedInterpolation()
+    trajectory = [left, right, left]
+    repaired, report = repairTrajectory(trajectory, interpolation, timeBudget=5.0)
+
+    assert report["unsafeSegments"] == [(0, 1), (1, 2)]
+    assert report["repaired"] == [(0, 1), (1, 2)] and report["safe"]
+    assert report["insertedWaypoints"] == len(repaired) - 3 > 0
+    assert interpolation.checkSafeTrajectories(repaired) == {}
+    # The original waypoints are kept in order
+    indexes = [i for i, waypoint in enumerate(repaired) if waypoint in trajectory]
+    assert [repaired[i] for i in indexes] == trajectory
+
+
+def test_notRepairable():
+    interpolation = _blockedInterpolation()
+    unsafe = [0.0, 0.5, 0.0, 0.0, 0.0, 0.0]  # Upper arm below the ground
+    repaired, report = repairTrajectory([left, unsafe], interpolation, timeBudget=0.5)
+    assert report["failed"] == [(0, 1)] and not report["safe"]
+    assert repaired == [left, unsafe]
+
+    repaired, report = repairTrajectory([right, right], interpolation)
+    assert report["unsafeSegments"] == [] and repaired == [right, right]
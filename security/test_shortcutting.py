@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from .interpolation import Interpolation
+from .shortcutting import PathShortcutting, getJointTravel, shortcutPath
+
+start = np.array([0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0])
+end = np.array([1.1193, -1.5922, 1.1245, -1.1035, -1.572, -0.4507])
+
+
+class _BlockedInterpolation(Interpolation):
+    """ The positions whose elbow is in the blocked interval with the shoulder below -1.5 rad are unsafe """
+
+    def __init__(self, blocked):
+        super().__init__(logs=False, backend="analytic")
+        self.blocked = blocked
+
+    def _isTrajectoriesSafe(self, angles1, angles2):
+        samples = np.array(self._getInterpSingleTrajectory(angles1, angles2))
+        return not np.any((samples[:, 2] > self.blocked[0]) & (samples[:, 2] < self.blocked[1]) & (samples[:, 1] < -1.5))
+
+
+def _noisyPath(count=30, seed=0):
+    rng = np.random.default_rng(seed)
+    path = [start + (end - start) * t for t in np.linspace(0, 1, count)]
+    for waypoint in path[1:-1]:
+        waypoint += 0.02 * rng.standard_normal(6)
+    return path
+
+
+def test_shortcut():
+    interpolation = Interpolation(logs=False, backend="analytic")
+    path = _noisyPath()
+    assert interpolation.checkSafeTrajectories(path) == {}
+
+    shortened, report = shortcutPath(path, interpolation)
+    assert report["waypoints"] == len(shortened) < len(path)
+    assert report["waypointReduction"] > 0.5 and report["travelReduction"] > 0
+    assert report["travel"] == pytest.approx(getJointTravel(shortened))
+    assert shortened[0] == pytest.approx(path[0]) and shortened[-1] == pytest.approx(path[-1])
+    assert interpolation.checkSafeTrajectories(shortened) == {}
+
+
+def test_keepsDetour():
+    # Straight line through the blocked area, the detour through higher shoulder angles is kept
+    middle = 0.5 * (start + end)
+    detour = [start, middle + [0.0, 0.3, 0.0, 0.0, 0.0, 0.0], end]
+    interpolation = _BlockedInterpolation((0.85, 0.95))
+    assert interpolation.checkSafeTrajectories(detour) == {}
+    assert not interpolation._isTrajectoriesSafe(start, end)
+
+    shortened, report = PathShortcutting(interpolation, maxAttempts=10).shortcut(detour)
+    assert len(shortened) == 3 and report["accepted"] == 0 and report["attempts"] == 1
+
+
+def test_redundantAndFixedWaypoints():
+    path = [start + (end - start) * t for t in np.linspace(0, 1, 11)]
+    shortened, report = PathShortcutting(maxAttempts=0).shortcut(path, fixedIndexes=[5])
+    # Collinear waypoints are removed without any check, the fixed one is kept
+    assert np.array(shortened) == pytest.approx(np.array([path[0], path[5], path[-1]]))
+    assert report["checkedSegments"] == 0
+
+    path = _noisyPath()
+    shortened, _ = shortcutPath(path, fixedIndexes=[10, 20])
+    assert path[10].tolist() in shortened and path[20].tolist() in shortened
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from .forwardKinematics import BatchForwardKinematic
+from .interpolation import Interpolation
+from .singularityChecking import (getJacobians, getManipulability, getNearSingularities, getSingularityDistances,
+                                  isWithinJointLimits)
+
+safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+
+
+def test_jacobianMatchesFiniteDifferences():
+    angles = np.random.default_rng(0).uniform(-np.pi, np.pi, (20, 6))
+
+    def tip(q):
+        frames = BatchForwardKinematic(q).getFrames()
+        return frames[:, -1, :3, 3] + 0.1 * frames[:, -1, :3, 2]
+
+    eps = 1e-6
+    expected = np.stack([(tip(angles + eps * step) - tip(angles - eps * step)) / (2 * eps) for step in np.eye(6)], axis=-1)
+    assert getJacobians(angles, 0.1)[:, :3] == pytest.approx(expected, abs=1e-7)
+
+
+def test_singularitiesCancelManipulability():
+    angles = np.random.default_rng(1).uniform(-np.pi, np.pi, (50, 6))
+    distances = getSingularityDistances(angles)
+    # |det J| of the UR arms factors into the three singularities
+    expected = distances["shoulder"] * distances["elbow"] * distances["wrist"] * abs(0.24355 * 0.2132)
+    assert getManipulability(angles) == pytest.approx(expected, rel=1e-6, abs=1e-12)
+
+
+@pytest.mark.parametrize("angles, expected", [
+    (safe, False),
+    ([0.9509, -1.6623, 0.0, -0.5976, -1.5722, 0.0], True),  # Elbow stretched
+    ([0.9509, -1.6623, 0.6353, -0.5976, 0.02, 0.0], True),  # Wrist axes aligned
+])
+def test_nearSingularities(angles, expected):
+    assert getNearSingularities([angles])[0] == expected
+
+
+def test_jointLimits():
+    assert isWithinJointLimits([safe, [7.0, 0, 0, 0, 0, 0]]).tolist() == [True, False]
+    assert not isWithinJointLimits([[6.2, 0, 0, 0, 0, 0]], margin=0.1)[0]
+
+
+def test_interpolationSingularities():
+    stretched = [0.9509, -1.6623, -0.3, -0.5976, -1.5722, 0.0]
+    angles = [safe, stretched]  # The elbow crosses 0
+    assert Interpolation(False, False, backend="analytic").checkSafeTrajectories(angles) == {}
+    for sweptBound in (False, True):
+        interpolation = Interpolation(False, False, backend="analytic", sweptBound=sweptBound, singularityThresholds={"elbow": 0.1})
+        assert interpolation.checkSafeTrajectories(angles) == {(0, 1): (safe, stretched)}
@@ -0,0 +1,60 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from .solutionSelection import getLimitDistances, selectBestSolutions
+
+
+def _bruteForce(waypoints, clearances, startAngles, **weights):
+    best = None
+    for indexes in itertools.product(*[range(len(solutions)) for solutions in waypoints]):
+        single = [[waypoints[i][k]] for i, k in enumerate(indexes)]
+        singleClearances = [[clearances[i][k]] for i, k in enumerate(indexes)]
+        _, _, cost = selectBestSolutions(single, singleClearances, startAngles, **weights)
+        if best is None or cost < best[1]:
+            best = (list(indexes), cost)
+    return best
+
+
+def test_matchesBruteForce():
+    rng = np.random.default_rng(0)
+    waypoints = [rng.uniform(-np.pi, np.pi, (count, 6)).tolist() for count in (3, 8, 1, 5, 4)]
+    clearances = [rng.uniform(0.0, 0.2, len(solutions)).tolist() for solutions in waypoints]
+    start = [0.0] * 6
+
+    indexes, solutions, cost = selectBestSolutions(waypoints, clearances, start)
+    expectedIndexes, expectedCost = _bruteForce(waypoints, clearances, start)
+    assert cost == pytest.approx(expectedCost)
+    assert indexes == expectedIndexes
+    assert solutions == [waypoints[i][k] for i, k in enumerate(indexes)]
+
+
+def test_prefersContinuity():
+    near = [0.1, -1.5, 0.5, -0.5, -1.5, 0.0]
+    far = [-2.9, 1.5, -0.5, 2.5, 1.5, 3.0]
+    indexes, _, _ = selectBestSolutions([[near], [far, near], [near, far]], startAngles=near)
+    assert indexes == [0, 1, 0]
+
+
+def test_prefersClearance():
+    a = [0.0, -1.5, 0.5, -0.5, -1.5, 0.0]
+    b = [0.01, -1.5, 0.5, -0.5, -1.5, 0.0]
+    indexes, _, _ = selectBestSolutions([[a, b]], [[0.001, 0.08]], startAngles=a)
+    assert indexes == [1]
+    indexes, _, _ = selectBestSolutions([[a, b]], [[np.nan, np.nan]], startAngles=a)
+    assert indexes == [0]
+
+
+def test_maxJump():
+    a = [0.0] * 6
+    b = [2.0] + [0.0] * 5
+    with pytest.raises(ValueError):
+        selectBestSolutions([[a], [b]], maxJump=1.0)
+    with pytest.raises(ValueError):
+        selectBestSolutions([[a], []])
+    assert selectBestSolutions([]) == ([], [], 0.0)
+
+
+def test_limitDistances():
+    assert getLimitDistances([[0.0, 1.0, -6.0, 0.0, 0.0, 0.0]]) == pytest.approx([2 * np.pi - 6.0])
@@ -0,0 +1,74 @@
+import numpy as np
+
+from .batchCollisionChecking import COARSE_PAIRS, BatchCollisionCheck
+from .capsules import LINK_RADII, MESH_INFLATION, getCapsules, segmentDistances
+from .interpolation import Interpolation
+from .sweptVolume import SweptVolumeCheck, getLeverArms
+
+safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+unsafe = [0.0, -3.14, 3.14, 0.0, 0.0, 0.0]
+
+
+def test_leverArmsBoundMotion():
+    rng = np.random.default_rng(0)
+    starts = rng.uniform(-np.pi, np.pi, (200, 6))
+    ends = starts + rng.uniform(-0.2, 0.2, (200, 6))
+    growth = 0.5 * np.abs(ends - starts) @ getLeverArms()
+
+    middle = getCapsules(0.5 * (starts + ends))
+    for s in np.linspace(0, 1, 11):
+        moved = getCapsules(starts + s * (ends - starts))
+        for m, p in zip(middle, moved):
+            assert np.all(np.linalg.norm(p - m, axis=-1) <= growth + 1e-9)
+
+
+def test_pairGrowthBoundsDistance():
+    rng = np.random.default_rng(5)
+    starts = rng.uniform(-np.pi, np.pi, (1000, 6))
+    ends = starts + rng.uniform(-0.4, 0.4, (1000, 6))
+    checker = SweptVolumeCheck(inflation=MESH_INFLATION)
+    first, second = checker.pairs[:, 0], checker.pairs[:, 1]
+    growth = 0.5 * np.abs(ends - starts) @ checker.pairArms
+
+    middleStarts, middleEnds = getCapsules(0.5 * (starts + ends))
+    middle = segmentDistances(middleStarts[:, first], middleEnds[:, first], middleStarts[:, second], middleEnds[:, second])
+    for s in np.linspace(0, 1, 11):
+        movedStarts, movedEnds = getCapsules(starts + s * (ends - starts))
+        moved = segmentDistances(movedStarts[:, first], movedEnds[:, first], movedStarts[:, second], movedEnds[:, second])
+        assert np.all(moved >= middle - growth - 1e-9)
+
+
+def test_provenSegmentsAreSafe():
+    rng = np.random.default_rng(1)
+    starts = np.array(safe) + rng.uniform(-0.5, 0.5, (300, 6))
+    ends = starts + rng.uniform(-0.3, 0.3, (300, 6))
+    proven = SweptVolumeCheck().proveSegmentsSafe(starts, ends)
+    assert proven.any()
+
+    samples = starts[proven][:, None] + np.linspace(0, 1, 50)[None, :, None] * (ends - starts)[proven][:, None]
+    assert BatchCollisionCheck().checkBatch(samples.reshape(-1, 6))[0].all()
+
+
+def test_inflatedProofCoversEveryPair():
+    rng = np.random.default_rng(2)
+    starts = rng.uniform(-np.pi, np.pi, (20000, 6))
+    ends = starts + rng.uniform(-0.1, 0.1, (20000, 6))
+    proven = SweptVolumeCheck(inflation=MESH_INFLATION).proveSegmentsSafe(starts, ends)
+    assert proven.any()
+
+    # The inflated capsules also overlap on the pairs left out of SELF_COLLISION_PAIRS
+    samples = starts[proven][:, None] + np.linspace(0, 1, 20)[None, :, None] * (ends - starts)[proven][:, None]
+    checker = BatchCollisionCheck(radii=LINK_RADII + MESH_INFLATION, pairs=COARSE_PAIRS)
+    assert checker.checkBatch(samples.reshape(-1, 6))[0].all()
+
+
+def test_unsafeSegmentNotProven():
+    assert not SweptVolumeCheck().proveSegmentsSafe([safe], [unsafe])[0]
+
+
+def test_interpolationSkipsProvenSegments():
+    angles = (np.array(safe) + np.linspace(0, 0.3, 20)[:, None] * np.array([1, 0, 0, 0, 0, 1])).tolist()
+    angles.append(unsafe)
+    interpolation = Interpolation(False, False, backend="analytic", sweptBound=True)
+    assert interpolation.checkSafeTrajectories(angles) == {(19, 20): (angles[19], unsafe)}
+    assert interpolation.provenSegments == 19
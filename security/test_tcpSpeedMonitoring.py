@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from .tcpSpeedMonitoring import TcpSpeedMonitor, getTipPositions, getTipSpeeds
+
+start = np.array([0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0])
+
+
+def _baseRotation(speed, rate=125.0, duration=1.0):
+    """ Samples of a rotation of the base at constant speed (rad/s) """
+    timestamps = np.arange(int(duration * rate)) / rate
+    angles = np.tile(start, (len(timestamps), 1))
+    angles[:, 0] += speed * timestamps
+    return angles, timestamps
+
+
+def test_tipSpeed():
+    angles, timestamps = _baseRotation(0.5)
+    tip = getTipPositions(angles[:1])[0]
+    # The tip turns around the base axis at radius r
+    expected = 0.5 * np.hypot(tip[0], tip[1])
+    speeds, accelerations = getTipSpeeds(angles, timestamps)
+    assert speeds == pytest.approx(expected, rel=1e-3)
+    # Centripetal acceleration of the circular motion
+    assert accelerations == pytest.approx(0.5 * expected, rel=1e-2)
+
+    speeds, _ = getTipSpeeds(angles, timestamps, window=5)
+    assert len(speeds) == len(angles) - 5
+    assert speeds == pytest.approx(expected, rel=1e-2)
+
+
+def test_limits():
+    angles, timestamps = _baseRotation(0.5)
+    speed = getTipSpeeds(angles, timestamps)[0][0]
+    assert TcpSpeedMonitor(speed * 1.01).checkSamples(angles, timestamps).all()
+    assert not TcpSpeedMonitor(speed * 0.99).checkSamples(angles, timestamps)[1:].any()
+    assert not TcpSpeedMonitor(speed * 1.01, accelerationLimit=1.0).checkSamples(angles, timestamps)[2:].any()
+
+
+def test_streamMatchesBatch():
+    angles, timestamps = _baseRotation(2.0, duration=0.2)
+    angles[10:, 1] += np.linspace(0, 0.3, len(angles) - 10)  # Faster motion after the tenth sample
+    monitor = TcpSpeedMonitor(700.0, window=2)
+    expected = monitor.checkSamples(angles, timestamps)
+    stream = [monitor.update(q, t)[0] for q, t in zip(angles, timestamps)]
+    assert stream == expected.tolist()
+    assert monitor.maxSpeed == pytest.approx(getTipSpeeds(angles, timestamps, window=2)[0].max())
+
+
+def test_repeatedSamplesAreIgnored():
+    angles, timestamps = _baseRotation(0.5)
+    monitor = TcpSpeedMonitor(1000.0)
+    monitor.update(angles[0], timestamps[0])
+    result = monitor.update(angles[1], timestamps[1])
+    # The same robot sample read twice does not divide by a zero time
+    assert monitor.update(angles[1], timestamps[1]) == result
+    assert monitor.maxSpeed == pytest.approx(result[1])
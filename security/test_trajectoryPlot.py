@@ -0,0 +1,83 @@
+import numpy as np
+
+from .interpolation import Interpolation
+from .trajectoryPlot import (DownsamplingPyramid, exportFigure, getViolationIndexes, lttbIndexes, plotTrajectory,
+                             plotWorkingArea)
+from .workingAreaChecking import WorkingAreaRobotChecking
+
+
+def _longLog(samples=1000000):
+    rng = np.random.default_rng(0)
+    angles = np.cumsum(rng.normal(0, 1e-3, (samples, 6)), axis=0)
+    angles[123457, 2] += 3.0  # A single sample peak must stay visible
+    return angles
+
+
+def test_downsamplingPyramid():
+    angles = _longLog()
+    pyramid = DownsamplingPyramid(angles)
+    indexes = pyramid.query(4000)
+    assert indexes.shape[1] == 6 and len(indexes) <= 4000
+    assert np.all(np.diff(indexes, axis=0) >= 0)
+    # The extrema of every joint are kept
+    assert np.allclose(angles[indexes, np.arange(6)].max(axis=0), angles.max(axis=0))
+    assert np.allclose(angles[indexes, np.arange(6)].min(axis=0), angles.min(axis=0))
+    assert 123457 in indexes[:, 2]
+
+    # A zoomed range stays within the range, a small one is returned whole
+    zoomed = pyramid.query(1000, 200000, 300000)
+    assert len(zoomed) <= 1000 and zoomed.min() >= 200000 and zoomed.max() < 300000
+    assert np.array_equal(pyramid.query(1000, 10, 510)[:, 0], np.arange(10, 510))
+
+
+def test_lttbIndexes():
+    x = np.linspace(0, 10, 100000)
+    y = np.sin(x)
+    y[50000] = 5.0
+    indexes = lttbIndexes(x, y, 500)
+    assert len(indexes) == 500 and indexes[0] == 0 and indexes[-1] == len(x) - 1
+    assert np.all(np.diff(indexes) > 0) and 50000 in indexes
+    assert np.array_equal(lttbIndexes(x[:100], y[:100], 500), np.arange(100))
+
+
+def test_getViolationIndexes():
+    report = {"samples": 10, "velocity": {"count": 2, "violations": [{"index": 3, "time": 0.3}, {"index": 7, "time": 0.7}]},
+              "area": {"count": 0, "violations": []}}
+    violations = getViolationIndexes(report)
+    assert list(violations["velocity"]) == [3, 7] and len(violations["area"]) == 0 and "samples" not in violations
+    assert list(getViolationIndexes({(2, 3): ([0] * 6, [1] * 6)})["unsafe segment"]) == [2]
+    assert list(getViolationIndexes(((4, 5), ([0] * 6, [1] * 6)))["unsafe segment"]) == [4]
+    assert getViolationIndexes(None) == {}
+
+
+def test_plotTrajectory(tmp_path):
+    angles = _longLog()
+    times = np.arange(len(angles)) * 0.002
+    figure = plotTrajectory(angles, times, violations=[10, 123457], maxPoints=2000)
+    assert len(figure.data) == 7
+    assert all(len(trace.x) <= 2000 for trace in figure.data[:6]) and figure.data[0].mode == "lines"
+    assert len(figure.data[6].x) == 12 and np.isclose(figure.data[6].x[6], times[123457])
+
+    figure = plotTrajectory(angles[:50000], method="lttb", maxPoints=1000)
+    assert all(len(trace.x) == 1000 for trace in figure.data)
+
+    path = exportFigure(figure, str(tmp_path / "trajectory.html"))
+    assert "plotly" in open(path).read(1000000)
+
+
+def test_drawTrajectory(tmp_path):
+    angles = [[0.0, -1.9, 1.6, -1.3, -1.57, 0.0], [0.5, -1.9, 1.6, -1.3, -1.57, 0.0]]
+    path = Interpolation(False, False).drawTrajectory(angles, violations={(0, 1): angles}, path=str(tmp_path / "a.html"))
+    assert path.endswith("a.html") and (tmp_path / "a.html").stat().st_size > 0
+
+
+def test_plotWorkingArea(tmp_path):
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-0.05, 0.05, (200000, 3)) + [0.3, 0.0, 0.2]
+    figure = plotWorkingArea(points, violations=[5])
+    # One position per 5 mm voxel of the 10 cm cube
+    assert len(figure.data[1].x) <= 21 ** 3 and len(figure.data[2].x) == 1
+
+    area = WorkingAreaRobotChecking(0, 0, 0, 0.62, [0.0, -1.57, 0.0, -1.57, 0.0, 0.0])
+    assert area.points_filtered is WorkingAreaRobotChecking(0, 0, 0, 0.62, [0.0] * 6).points_filtered
+    assert area.draw(str(tmp_path / "area.png")).endswith("area.png") and (tmp_path / "area.png").stat().st_size > 0
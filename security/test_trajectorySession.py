@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from .batchCollisionChecking import BatchCollisionCheck
+from .interpolation import Interpolation
+from .scene import OtherRobot, Scene
+from .trajectorySession import TrajectoryValidationSession
+
+safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+unsafe = [0.0, -3.14, 3.14, 0.0, 0.0, 0.0]
+
+
+def _trajectory(count):
+    return (np.array(safe) + np.linspace(0, 0.5, count)[:, None] * np.array([1, 0, 0, 0, 0, 1])).tolist()
+
+
+def _session(angles):
+    return TrajectoryValidationSession(Interpolation(logs=False, stopAtFirstError=False, backend="analytic"), angles)
+
+
+def test_sameAsFullCheck():
+    angles = _trajectory(20)
+    angles[7] = unsafe
+    session = _session(angles)
+    assert session.result() == Interpolation(logs=False, stopAtFirstError=False, backend="analytic").checkSafeTrajectories(angles)
+    assert set(session.result()) == {(6, 7), (7, 8)}
+    assert session.checkedSegments == 19
+
+
+def test_editOnlyChecksTouchedSegments():
+    angles = _trajectory(50)
+    session = _session(angles)
+    assert session.isSafe()
+
+    session.editWaypoints({10: unsafe})
+    assert session.checkedSegments == 49 + 2
+    assert set(session.result()) == {(9, 10), (10, 11)}
+
+    # Reverting the edit is answered from the cache
+    session.editWaypoints({10: angles[10]})
+    assert session.checkedSegments == 51
+    assert session.isSafe()
+
+
+def test_insertAndRemove():
+    angles = _trajectory(10)
+    session = _session(angles)
+    session.insertWaypoint(4, unsafe)
+    assert len(session.verdicts) == 10
+    assert set(session.result()) == {(3, 4), (4, 5)}
+
+    session.removeWaypoint(4)
+    assert session.angles == angles
+    assert session.isSafe()
+
+    session.removeWaypoint(0)
+    session.removeWaypoint(-1)
+    assert len(session.verdicts) == len(session.angles) - 1 == 7
+
+
+def test_settingsInKey():
+    angles = _trajectory(5)
+    session = _session(angles)
+    session.interpolation.margin = 0.5
+    session.interpolation.checker = None
+    assert session.setTrajectory(angles) != {}
+    assert session.checkedSegments == 8
+
+
+def test_negativeIndexes():
+    angles = _trajectory(5)
+    session = _session(angles)
+    edited = angles[:-1] + [unsafe]
+    assert session.editWaypoints({-1: unsafe}) == Interpolation(logs=False, stopAtFirstError=False, backend="analytic").checkSafeTrajectories(edited)
+    assert set(session.result()) == {(3, 4)}
+
+    session.insertWaypoint(-1, safe)
+    assert session.angles[-2] == safe and len(session.verdicts) == 5
+    assert set(session.result()) == {(4, 5)}
+    session.insertWaypoint(6, safe)
+    assert session.angles[-1] == safe and set(session.result()) == {(4, 5), (5, 6)}
+
+    for edit in (lambda: session.editWaypoints({7: safe}), lambda: session.editWaypoints({-8: safe}),
+                 lambda: session.insertWaypoint(8, safe), lambda: session.removeWaypoint(7)):
+        with pytest.raises(IndexError):
+            edit()
+
+
+def test_cache():
+    angles = _trajectory(10)
+    session = TrajectoryValidationSession(Interpolation(logs=False, stopAtFirstError=False, backend="analytic"), angles,
+                                          maxCacheSize=5)
+    assert len(session.cache) == 5 and session.checkedSegments == 9
+
+    # Another checker with the same settings does not reuse the verdicts
+    session.interpolation.checker = None
+    session.setTrajectory(angles)
+    assert session.checkedSegments == 18
+
+
+def test_sceneChanges():
+    upright = [0.0, -1.5708, 0.0, -1.5708, 0.0, 0.0]
+    reaching = [0.0, -0.6, 0.0, -1.5708, 0.0, 0.0]
+    scene = Scene(robots=[OtherRobot("ur2", (-0.8, 0.0, 0.0), np.pi, upright)])
+    interpolation = Interpolation(logs=False, stopAtFirstError=False, backend="analytic")
+    interpolation.checker = BatchCollisionCheck(scene=scene)
+    angles = (np.array(reaching) + np.linspace(0, 0.2, 3)[:, None] * np.array([0, 0, 0, 0, 0, 1])).tolist()
+    session = TrajectoryValidationSession(interpolation, angles)
+    assert session.result() == {}
+
+    # The other robot moves into the cached safe segments, they are checked again
+    scene.setRobotAngles("ur2", reaching)
+    assert session.setTrajectory(angles) == {(0, 1): (angles[0], angles[1]), (1, 2): (angles[1], angles[2])}
+    assert session.checkedSegments == 4
@@ -0,0 +1,96 @@
+import pytest
+
+from .validationServer import ValidationClient, ValidationServer, ValidationService
+
+safe = [0.9509, -1.6623, 0.6353, -0.5976, -1.5722, 0.0]
+unsafe = [0.0, -3.14, 3.14, 0.0, 0.0, 0.0]
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def server(request, tmp_path):
+    address = ("127.0.0.1", 0) if request.param == "tcp" else str(tmp_path / "security.sock")
+    server = ValidationServer(address, workers=4)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_requests(server):
+    client = ValidationClient(server.address)
+    response = client.request({"id": 1, "type": "configurations", "configs": [safe, unsafe]})
+    assert response["id"] == 1 and response["valid"] == [True, False]
+
+    response = client.request({"type": "trajectory", "angles": [safe, unsafe, safe]})
+    assert response["unsafe"] == [[0, 1], [1, 2]]
+    response = client.request({"type": "trajectory", "angles": [safe, unsafe, safe], "stopAtFirstError": True})
+    assert response["unsafe"] == [[0, 1]]
+
+    response = client.request({"type": "solutions", "solutions": [[safe, unsafe], [unsafe]], "margin": 0.01})
+    assert response["validSolutions"] == [1, 0] and not response["safe"]
+
+    assert "error" in client.request({"type": "unknown"})
+    assert "error" in client.request({"type": "configurations"})
+    client.close()
+
+
+def test_pipelining(server):
+    client = ValidationClient(server.address)
+    requests = [{"id": i, "type": "configurations", "configs": [safe if i % 2 else unsafe] * (1 + i % 7)} for i in range(300)]
+    responses = client.pipeline(requests)
+    assert [response["id"] for response in responses] == list(range(300))
+    assert all(response["valid"][0] == bool(i % 2) for i, response in enumerate(responses))
+    client.close()
+
+
+def test_malformedRequests(server):
+    client = ValidationClient(server.address)
+    client.socket.settimeout(10.0)
+    requests = [
+        {"id": 0, "type": "trajectory", "angles": [[1, 2, 3], [4, 5, 6]]},
+        {"id": 1, "type": "configurations", "configs": [[0.0] * 5]},
+        {"id": 2, "type": "solutions", "solutions": [[[0.0] * 7]]},
+        [1, 2, 3],
+        {"id": 4, "type": "configurations", "configs": [safe]},
+    ]
+    responses = client.pipeline(requests)
+    # Every malformed request gets an error record, and the connection keeps answering the next ones
+    assert [response["id"] for response in responses] == [0, 1, 2, None, 4]
+    assert all("ValueError" in response["error"] for response in responses[:3]) and "error" in responses[3]
+    assert responses[4]["valid"] == [True]
+    client.close()
+
+
+def test_writerSurvivesFailures(server):
+    def failing(request):
+        if request.get("fail"):
+            raise IndexError("failure outside of the checks")
+        return {"id": request["id"]}
+
+    server.server.service.handle = failing
+    client = ValidationClient(server.address)
+    client.socket.settimeout(10.0)
+    responses = client.pipeline([{"id": 0, "fail": True}, {"id": 1}])
+    assert responses[0] == {"id": 0, "error": "IndexError: failure outside of the checks"} and responses[1] == {"id": 1}
+    client.close()
+
+
+def test_checkerCache():
+    service = ValidationService(maxCheckers=2)
+    for margin in (0.01, 0.0104, 0.02):
+        assert service.handle({"type": "configurations", "configs": [safe], "margin": margin})["valid"] == [True]
+    # Margins are rounded, and the least recently used checker is dropped
+    assert list(service.checkers) == [("analytic", 0.01), ("analytic", 0.02)]
+
+    class ClosingChecker():
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    evicted = service.checkers[("analytic", 0.01)] = ClosingChecker()
+    service.checkers.move_to_end(("analytic", 0.01), last=False)
+    service.handle({"type": "configurations", "configs": [safe], "margin": 0.03})
+    assert evicted.closed and len(service.checkers) == 2
+
+    for margin in (-0.01, 5.0, "nan"):
+        assert service.handle({"type": "configurations", "configs": [safe], "margin": margin})["error"].startswith("ValueError")
@@ -0,0 +1,250 @@
+from functools import lru_cache
+import os
+
+import numpy as np
+
+""" Plots of long joint trajectories and logs straight from NumPy arrays: the samples are downsampled with a min/max
+pyramid or LTTB before being drawn, the violations found by the validation are overlaid, and the figures can be
+exported to HTML or PNG without a display """
+
+JOINT_NAMES = [f"Angle {i + 1}" for i in range(6)]
+VIOLATION_COLORS = ["red", "orange", "purple", "black", "brown", "magenta"]
+
+
+class DownsamplingPyramid():
+    def __init__(self, values, factor: int = 4):
+        """
+        Initializes the DownsamplingPyramid class.
+
+        Each level splits the samples in buckets of factor times more samples than the previous one and keeps
+        the index of the minimum and of the maximum of each column in each bucket, so that the peaks of the
+        signal are never lost. It is built once in O(N), then any range can be drawn with a bounded number of
+        points.
+
+        Parameters:
+        - values: Array of shape (N,) or (N, K), one column per signal (for example the 6 joints).
+        - factor: Number of buckets of a level merged in one bucket of the next level.
+        """
+        self.values = np.asarray(values, dtype=float)
+        if self.values.ndim == 1:
+            self.values = self.values[:, None]
+        self.factor = factor
+
+        # Level k: bucket size factor ** (k + 1), arrays of shape (buckets, K) with the indexes of the extrema
+        self.levels = []
+        columns = np.arange(self.values.shape[1])
+        minIndexes = maxIndexes = np.arange(len(self.values))[:, None].repeat(self.values.shape[1], axis=1)
+        while len(minIndexes) > 1:
+            minIndexes, maxIndexes = self._reduce(minIndexes, np.argmin, columns), self._reduce(maxIndexes, np.argmax, columns)
+            self.levels.append((minIndexes, maxIndexes))
+
+    def _reduce(self, indexes, select, columns):
+        """
+        Merges the buckets of a level by groups of factor, keeping the extremum of each group.
+        """
+        count = -(-len(indexes) // self.factor) * self.factor
+        # The last group is padded with its last bucket, which does not change its extremum
+        padded = np.concatenate((indexes, indexes[-1:].repeat(count - len(indexes), axis=0)))
+        groups = padded.reshape(-1, self.factor, indexes.shape[1])
+        chosen = select(self.values[groups, columns], axis=1)
+        return np.take_along_axis(groups, chosen[:, None, :], axis=1)[:, 0]
+
+    def query(self, maxPoints: int = 4000, start: int = 0, end: int = None):
+        """
+        Returns the indexes of the samples to draw between start and end, at most about maxPoints per column.
+
+        Returns:
+        - Array of shape (M, K), sorted indexes of the samples of each column: all of them when the range is
+          small enough, else the minimum and maximum of each bucket of the finest level that fits.
+        """
+        end = len(self.values) if end is None else end
+        if end - start <= maxPoints:
+            return np.arange(start, end)[:, None].repeat(self.values.shape[1], axis=1)
+        for level, (minIndexes, maxIndexes) in enumerate(self.levels):
+            size = self.factor ** (level + 1)
+            first, last = start // size, -(-end // size)
+            if 2 * (last - first) <= maxPoints or level == len(self.levels) - 1:
+                indexes = np.sort(np.concatenate((minIndexes[first:last], maxIndexes[first:last])), axis=0)
+                return np.clip(indexes, start, end - 1)
+
+
+def lttbIndexes(x, y, threshold: int):
+    """
+    Largest Triangle Three Buckets downsampling of one signal.
+
+    Parameters:
+    - x, y: Arrays of shape (N,).
+    - threshold: Number of points kept, the first and last ones included.
+
+    Returns:
+    - The sorted indexes of the kept points.
+    """
+    x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    if threshold >= len(x) or threshold < 3:
+        return np.arange(len(x))
+    edges = np.linspace(1, len(x) - 1, threshold - 1).astype(int)
+    indexes = np.empty(threshold, dtype=int)
+    indexes[0], indexes[-1] = 0, len(x) - 1
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # The third point of the triangle is the mean of the next bucket
+        nextEnd = edges[bucket + 2] if bucket + 2 < len(edges) else len(x)
+        nextX, nextY = x[end:nextEnd].mean(), y[end:nextEnd].mean()
+        previous = indexes[bucket]
+        areas = np.abs((x[previous] - nextX) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (nextY - y[previous]))
+        indexes[bucket + 1] = start + int(np.argmax(areas))
+    return indexes
+
+
+def getViolationIndexes(violations):
+    """
+    Returns the sample indexes of each kind of violation, as a dictionary {name: array of indexes}.
+
+    Parameters:
+    - violations: A report of UrLogReplay.replaySession ({"velocity": {"violations": [{"index": ...}]}, ...}), the
+      result of Interpolation.checkSafeTrajectories (the first waypoint of each unsafe segment), or a list of
+      indexes.
+    """
+    if violations is None:
+        return {}
+    if isinstance(violations, tuple) and len(violations) == 2 and isinstance(violations[0], tuple):
+        # checkSafeTrajectories with stopAtFirstError
+        return {"unsafe segment": np.array([violations[0][0]])}
+    if isinstance(violations, dict):
+        if all(isinstance(key, tuple) for key in violations):
+            return {"unsafe segment": np.array([key[0] for key in violations], dtype=int)}
+        return {name: np.array([violation["index"] for violation in value["violations"]], dtype=int)
+                for name, value in violations.items() if isinstance(value, dict) and "violations" in value}
+    return {"violation": np.asarray(violations, dtype=int).reshape(-1)}
+
+
+def plotTrajectory(angles, times=None, violations=None, maxPoints: int = 4000, method: str = "minmax",
+                   pyramid: DownsamplingPyramid = None, title: str = "Joint Angles Variation"):
+    """
+    Plots the joint angles of a trajectory or a log.
+
+    Parameters:
+    - angles: Array-like of shape (N, 6).
+    - times: Time of each sample in seconds, the sample index if None.
+    - violations: Violations overlaid as markers, see getViolationIndexes.
+    - maxPoints: Maximum number of points drawn per joint.
+    - method: "minmax" keeps the minimum and maximum of each bucket (see DownsamplingPyramid), "lttb" the points
+      that keep the shape of the curve (see lttbIndexes).
+    - pyramid: DownsamplingPyramid of the angles built before, to draw the same log several times.
+    - title: Title of the figure.
+
+    Returns:
+    - The plotly Figure.
+    """
+    import plotly.graph_objects as go
+
+    angles = np.asarray(angles, dtype=float).reshape(len(angles), -1)
+    x = np.arange(len(angles)) if times is None else np.asarray(times, dtype=float)
+    if method == "minmax":
+        indexes = (pyramid or DownsamplingPyramid(angles)).query(maxPoints)
+    elif method == "lttb":
+        indexes = np.stack([lttbIndexes(x, angles[:, joint], maxPoints) for joint in range(angles.shape[1])], axis=1)
+    else:
+        raise ValueError(f"Unknown downsampling method {method}, use 'minmax' or 'lttb'")
+
+    # Markers on the samples only while they are all drawn and few, as for a list of waypoints
+    mode = "lines+markers" if len(indexes) == len(angles) <= 1000 else "lines"
+    figure = go.Figure()
+    for joint in range(angles.shape[1]):
+        figure.add_trace(go.Scattergl(x=x[indexes[:, joint]], y=angles[indexes[:, joint], joint], mode=mode,
+                                      name=JOINT_NAMES[joint] if joint < len(JOINT_NAMES) else f"Angle {joint + 1}"))
+
+    for color, (name, rows) in zip(VIOLATION_COLORS * 2, getViolationIndexes(violations).items()):
+        rows = rows[(rows >= 0) & (rows < len(angles))]
+        if len(rows) > maxPoints:
+            rows = rows[np.linspace(0, len(rows) - 1, maxPoints).astype(int)]
+        # One marker on every joint curve at each violating sample
+        figure.add_trace(go.Scattergl(x=np.repeat(x[rows], angles.shape[1]), y=angles[rows].reshape(-1), mode="markers",
+                                      marker={"color": color, "symbol": "x", "size": 7}, name=name))
+
+    figure.update_layout(title=title, xaxis_title="Step" if times is None else "Time (s)",
+                         yaxis_title="Angle (radians)")
+    return figure
+
+
+@lru_cache(maxsize=8)
+def getHemisphereSurface(x0: float, y0: float, z0: float, r: float, resolution: int = 30):
+    """
+    Returns the (x, y, z) grids of shape (resolution, resolution) of the upper hemisphere of the working area,
+    computed once for each working area.
+    """
+    theta, phi = np.meshgrid(np.linspace(0, 2 * np.pi, resolution), np.linspace(0, np.pi / 2, resolution))
+    return (x0 + r * np.cos(theta) * np.sin(phi), y0 + r * np.sin(theta) * np.sin(phi), z0 + r * np.cos(phi))
+
+
+def plotWorkingArea(points, x0: float = 0.0, y0: float = 0.0, z0: float = 0.0, r: float = 0.62, violations=None,
+                    voxelSize: float = 0.005, title: str = "Working Area"):
+    """
+    Plots positions of the pen or the flange inside the working area.
+
+    Parameters:
+    - points: Array of shape (N, 3) with the positions in meters.
+    - x0, y0, z0, r: Center and radius of the working area (see WorkingAreaRobotChecking).
+    - violations: Positions overlaid as markers, see getViolationIndexes.
+    - voxelSize: Only one position per voxel of this size is drawn, so that a long log costs as much as the
+      volume it covers.
+    - title: Title of the figure.
+
+    Returns:
+    - The plotly Figure.
+    """
+    import plotly.graph_objects as go
+
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    _, kept = np.unique(np.floor(points / voxelSize).astype(np.int64), axis=0, return_index=True)
+    kept = np.sort(kept)
+
+    x, y, z = getHemisphereSurface(x0, y0, z0, r)
+    figure = go.Figure(go.Surface(x=x, y=y, z=z, opacity=0.2, showscale=False, name="Working Area"))
+    figure.add_trace(go.Scatter3d(x=points[kept, 0], y=points[kept, 1], z=points[kept, 2], mode="markers",
+                                  marker={"size": 2}, name="Positions"))
+    for color, (name, rows) in zip(VIOLATION_COLORS * 2, getViolationIndexes(violations).items()):
+        rows = rows[(rows >= 0) & (rows < len(points))]
+        figure.add_trace(go.Scatter3d(x=points[rows, 0], y=points[rows, 1], z=points[rows, 2], mode="markers",
+                                      marker={"size": 4, "color": color}, name=name))
+    figure.update_layout(title=title, scene={"xaxis_title": "X-axis", "yaxis_title": "Y-axis", "zaxis_title": "Z-axis"})
+    return figure
+
+
+def exportFigure(figure, path: str):
+    """
+    Writes a figure without opening a display: a self-contained HTML page for .html, an image for .png, .svg,
+    .jpg or .pdf (needs the kaleido package).
+    """
+    if path.endswith(".html"):
+        figure.write_html(path, include_plotlyjs=True, full_html=True)
+    else:
+        figure.write_image(path)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from .cli import loadInput
+    from .logReplay import DATA_LOG_NAME, UrLogReplay, iterUrDataLog
+
+    parser = argparse.ArgumentParser(description="Plot a trajectory file or a recorded session")
+    parser.add_argument("input", help="trajectory file (see cli.loadInput), or session <date>/<time> with --log-dir")
+    parser.add_argument("output", help="output file, .html or .png")
+    parser.add_argument("--log-dir", help="log directory of the sessions, replays the session to overlay the violations")
+    parser.add_argument("--max-points", type=int, default=4000)
+    parser.add_argument("--method", choices=["minmax", "lttb"], default="minmax")
+    args = parser.parse_args()
+
+    if args.log_dir:
+        chunks = list(iterUrDataLog(os.path.join(args.log_dir, args.input, DATA_LOG_NAME)))
+        times = np.concatenate([chunk[0] for chunk in chunks])
+        angles = np.concatenate([chunk[1] for chunk in chunks])
+        violations = UrLogReplay(args.log_dir, checkCollision=False, maxViolations=100000).replaySession(args.input)
+    else:
+        _, angles = loadInput(args.input)
+        times, violations = None, None
+    figure = plotTrajectory(angles, times, violations, args.max_points, args.method)
+    print(f"Figure saved in {exportFigure(figure, args.output)}")
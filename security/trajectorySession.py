@@ -0,0 +1,127 @@
+from collections import OrderedDict
+
+from .interpolation import Interpolation
+
+""" Validation of a trajectory edited step by step, only the segments whose end points changed are checked again """
+
+
+class TrajectoryValidationSession():
+    def __init__(self, interpolation: Interpolation = None, angles: list[list[float]] = None, maxCacheSize: int = 100000):
+        """
+        Initializes the TrajectoryValidationSession class.
+
+        The verdict of each segment is cached with the angles of its two end points, the settings of the
+        interpolation and the checker and scene in use (and the revision of the scene), so an edit only checks the segments around the edited waypoints and
+        coming back to a previous version of the trajectory checks nothing.
+
+        Parameters:
+        - interpolation: The Interpolation used to check the segments, one without logs if None.
+        - angles: Initial trajectory.
+        - maxCacheSize: Number of segment verdicts kept, the least recently used ones are dropped first.
+        """
+        self.interpolation = interpolation or Interpolation(logs=False, stopAtFirstError=False)
+        self.cache = OrderedDict()  # Segment key -> safe, least recently used first
+        self.maxCacheSize = maxCacheSize
+        self.angles = []
+        self.verdicts = []  # Safe or not, for each segment (i, i + 1)
+        self.checkedSegments = 0  # Number of segments actually checked since the creation of the session
+        if angles is not None:
+            self.setTrajectory(angles)
+
+    def _settingsKey(self):
+        interpolation = self.interpolation
+        thresholds = interpolation.singularityThresholds
+        # The checker and its scene are compared by identity, another checker or scene may give another verdict, and
+        # the revision of the scene drops the verdicts once its obstacles or robots changed
+        checker = interpolation._getChecker()
+        scene = getattr(checker, "scene", None)
+        return (checker, scene, getattr(scene, "revision", None), interpolation.backend, interpolation.margin, interpolation.t, interpolation.anglesDistanceVariation,
+                None if thresholds is None else tuple(sorted(thresholds.items())))
+
+    def _segmentKey(self, angles1, angles2):
+        return (self._settingsKey(), tuple(float(angle) for angle in angles1), tuple(float(angle) for angle in angles2))
+
+    def _checkSegment(self, index: int):
+        key = self._segmentKey(self.angles[index], self.angles[index + 1])
+        if key in self.cache:
+            self.cache.move_to_end(key)
+        else:
+            self.cache[key] = self.interpolation._isTrajectoriesSafe(self.angles[index], self.angles[index + 1])
+            self.checkedSegments += 1
+            if len(self.cache) > self.maxCacheSize:
+                self.cache.popitem(last=False)
+        self.verdicts[index] = self.cache[key]
+
+    def _normalizeIndex(self, index: int, size: int):
+        """
+        Returns the positive index of a waypoint, negative indexes counting from the end as for a list.
+        """
+        if not -size <= index < size:
+            raise IndexError(f"Waypoint index {index} out of range for a trajectory of {len(self.angles)} waypoints")
+        return index % size
+
+    def _checkSegments(self, indexes):
+        for index in sorted(set(indexes)):
+            if 0 <= index < len(self.verdicts):
+                self._checkSegment(index)
+
+    def setTrajectory(self, angles: list[list[float]]):
+        """
+        Replaces the whole trajectory, the segments already checked with the same end points are not checked again.
+        """
+        self.angles = [list(waypoint) for waypoint in angles]
+        self.verdicts = [None] * max(0, len(self.angles) - 1)
+        self._checkSegments(range(len(self.verdicts)))
+        return self.result()
+
+    def editWaypoints(self, edits: dict):
+        """
+        Changes some waypoints and checks the segments touching them.
+
+        Parameters:
+        - edits: Dictionary index -> new joint angles.
+        """
+        edits = {self._normalizeIndex(index, len(self.angles)): angles for index, angles in edits.items()}
+        for index, angles in edits.items():
+            self.angles[index] = list(angles)
+        self._checkSegments(segment for index in edits for segment in (index - 1, index))
+        return self.result()
+
+    def insertWaypoint(self, index: int, angles: list[float]):
+        """
+        Inserts a waypoint before the waypoint at index, at the end when index is the number of waypoints.
+        """
+        # One more position than waypoints for a positive index, the end of the trajectory
+        size = len(self.angles) + 1 if index >= 0 else len(self.angles)
+        index = self._normalizeIndex(index, size)
+        self.angles.insert(index, list(angles))
+        if len(self.angles) > 1:
+            self.verdicts.insert(min(index, len(self.verdicts)), None)
+        self._checkSegments((index - 1, index))
+        return self.result()
+
+    def removeWaypoint(self, index: int):
+        """
+        Removes the waypoint at index, its two segments are replaced by one.
+        """
+        index = self._normalizeIndex(index, len(self.angles))
+        self.angles.pop(index)
+        if self.verdicts:
+            self.verdicts.pop(min(index, len(self.verdicts) - 1))
+        self._checkSegments((index - 1,))
+        return self.result()
+
+    def isSafe(self):
+        return all(self.verdicts)
+
+    def result(self):
+        """
+        Returns the verdict in the format of Interpolation.checkSafeTrajectories.
+        """
+        notSafePositions = {}
+        for i, safe in enumerate(self.verdicts):
+            if not safe:
+                if self.interpolation.stopAtFirstError:
+                    return (i, i + 1), (self.angles[i], self.angles[i + 1])
+                notSafePositions[(i, i + 1)] = (self.angles[i], self.angles[i + 1])
+        return notSafePositions
@@ -0,0 +1,282 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import json
+import math
+import queue
+import socket
+import socketserver
+import threading
+import time
+
+import numpy as np
+
+from .backends import getChecker
+
+""" Long running local validation service keeping the checkers warm. The protocol is one JSON request per
+line and one JSON response per line, in the order of the requests, so a client can send many requests
+before reading the responses """
+
+DEFAULT_PORT = 8765
+# Margins of the requests, rounded to the resolution so that the clients can only create a bounded number of checkers
+MAX_MARGIN = 0.1
+MARGIN_RESOLUTION = 0.001
+
+
+def _toConfigurations(values, name: str):
+    """
+    Returns the configurations of a request as an array of shape (N, 6), a single configuration being accepted,
+    raises ValueError for any other shape.
+    """
+    configs = np.asarray(values, dtype=float)
+    if configs.size == 0:
+        return configs.reshape(0, 6)
+    if configs.shape == (6,):
+        return configs.reshape(1, 6)
+    if configs.ndim != 2 or configs.shape[1] != 6:
+        raise ValueError(f"{name} must be a list of configurations of 6 joint angles, got shape {configs.shape}")
+    return configs
+
+
+def _toMargin(value):
+    """
+    Returns the margin of a request rounded to MARGIN_RESOLUTION, raises ValueError outside of [0, MAX_MARGIN].
+    """
+    margin = float(value)
+    if not (math.isfinite(margin) and 0.0 <= margin <= MAX_MARGIN):
+        raise ValueError(f"The margin must be between 0 and {MAX_MARGIN} meters, got {value}")
+    return round(round(margin / MARGIN_RESOLUTION) * MARGIN_RESOLUTION, 6)
+
+
+class ValidationService():
+    def __init__(self, logs: bool = False, warmBackends=("analytic",), maxCheckers: int = 8):
+        """
+        Initializes the ValidationService class, answering the requests of the server.
+
+        Parameters:
+        - logs: Print the logs of the checks.
+        - warmBackends: Backends whose checker is created at startup.
+        - maxCheckers: Number of checkers kept, the least recently used one is closed when another one is needed.
+        """
+        self.logs = logs
+        self.maxCheckers = maxCheckers
+        self.checkers = OrderedDict()  # (backend, margin) -> checker, least recently used first
+        self._lock = threading.Lock()
+        # PyBullet runs one simulation per process, its checks are serialized, and a simulation is only closed
+        # while no check uses it
+        self._simulationLock = threading.RLock()
+        for backend in warmBackends:
+            self._getChecker(backend, 0.0)
+
+    def _getChecker(self, backend: str, margin: float):
+        evicted = []
+        with self._lock:
+            key = (backend, margin)
+            if key in self.checkers:
+                self.checkers.move_to_end(key)
+            else:
+                self.checkers[key] = getChecker(backend, self.logs, margin=margin)
+                while len(self.checkers) > self.maxCheckers:
+                    evicted.append(self.checkers.popitem(last=False))
+            checker = self.checkers[key]
+        for (evictedBackend, _), evictedChecker in evicted:
+            if hasattr(evictedChecker, "close"):
+                with self._locked(evictedBackend):
+                    evictedChecker.close()
+        return checker
+
+    def _getInterpolation(self, backend: str, margin: float, stopAtFirstError: bool):
+        from .interpolation import Interpolation
+
+        checker = self._getChecker(backend, margin)
+        interpolation = Interpolation(self.logs, stopAtFirstError, backend, margin)
+        interpolation.checker = checker
+        return interpolation
+
+    def _locked(self, backend: str):
+        return self._simulationLock if backend != "analytic" else nullcontext()
+
+    def handle(self, request: dict):
+        """
+        Answers one request.
+
+        Requests:
+        - {"type": "configurations", "configs": [[...], ...]} -> {"valid": [...], "clearances": [...]}
+        - {"type": "trajectory", "angles": [[...], ...], "stopAtFirstError": false} -> {"safe", "unsafe": [[i, i + 1], ...]}
+        - {"type": "solutions", "solutions": [[[...], ...], ...]} -> {"validSolutions": [...], "safe"}
+        - {"type": "ping"} -> {}
+        Every request can give a "backend" (analytic by default), a "margin" between 0 and MAX_MARGIN meters (rounded
+        to MARGIN_RESOLUTION) and an "id" copied in the response.
+        """
+        start = time.perf_counter()
+        response = {"id": request.get("id") if isinstance(request, dict) else None}
+        try:
+            if not isinstance(request, dict):
+                raise TypeError("A request must be a JSON object")
+            kind = request.get("type")
+            backend = request.get("backend", "analytic")
+            margin = _toMargin(request.get("margin", 0.0))
+            if kind == "configurations":
+                with self._locked(backend):
+                    checker = self._getChecker(backend, margin)
+                    valid, clearances = checker.checkBatch(_toConfigurations(request["configs"], "configs"))
+                response["valid"] = valid.tolist()
+                response["clearances"] = [None if np.isnan(value) else float(value) for value in clearances]
+            elif kind == "trajectory":
+                angles = _toConfigurations(request["angles"], "angles").tolist()
+                with self._locked(backend):
+                    interpolation = self._getInterpolation(backend, margin, bool(request.get("stopAtFirstError", False)))
+                    result = interpolation.checkSafeTrajectories(angles)
+                unsafe = ([list(result[0])] if result else []) if interpolation.stopAtFirstError else [list(segment) for segment in result]
+                response["safe"] = not unsafe
+                response["unsafe"] = unsafe
+            elif kind == "solutions":
+                solutionSets = [_toConfigurations(solutions, "solutions") for solutions in request["solutions"]]
+                with self._locked(backend):
+                    checker = self._getChecker(backend, margin)
+                    counts = [int(checker.checkBatch(solutions)[0].sum()) for solutions in solutionSets]
+                response["validSolutions"] = counts
+                response["safe"] = all(counts)
+            elif kind != "ping":
+                raise ValueError(f"Unknown request type {kind}")
+        except Exception as error:
+            # Any failure is answered, an exception would end the connection with the requests after this one
+            response["error"] = f"{type(error).__name__}: {error}"
+        response["time"] = round(time.perf_counter() - start, 6)
+        return response
+
+
+class _ValidationHandler(socketserver.StreamRequestHandler):
+    """ Reads the requests of a connection and answers them concurrently, writing the responses in order """
+
+    def handle(self):
+        pending = queue.Queue()
+        writer = threading.Thread(target=self._writeResponses, args=(pending,), daemon=True)
+        writer.start()
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as error:
+                pending.put({"id": None, "error": f"JSONDecodeError: {error}"})
+                continue
+            requestId = request.get("id") if isinstance(request, dict) else None
+            pending.put((requestId, self.server.executor.submit(self.server.service.handle, request)))
+        pending.put(None)
+        writer.join()
+
+    def _writeResponses(self, pending):
+        while (item := pending.get()) is not None:
+            if isinstance(item, tuple):
+                requestId, future = item
+                try:
+                    response = future.result()
+                except Exception as error:
+                    # The writer must survive, else every later response of the connection is lost
+                    response = {"id": requestId, "error": f"{type(error).__name__}: {error}"}
+            else:
+                response = item
+            try:
+                self.wfile.write((json.dumps(response) + "\n").encode())
+                self.wfile.flush()
+            except OSError:
+                return
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _ThreadingUnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ValidationServer():
+    def __init__(self, address=("127.0.0.1", DEFAULT_PORT), workers: int = 4, logs: bool = False,
+                 warmBackends=("analytic",), maxCheckers: int = 8):
+        """
+        Initializes the ValidationServer class.
+
+        Parameters:
+        - address: (host, port) for TCP on localhost, or the path of a Unix socket.
+        - workers: Number of requests checked concurrently, over all the connections.
+        - logs: Print the logs of the checks.
+        - warmBackends: Backends whose checker is created at startup.
+        - maxCheckers: Number of checkers kept, one per backend and margin.
+        """
+        self.service = ValidationService(logs, warmBackends, maxCheckers)
+        serverClass = _ThreadingUnixServer if isinstance(address, str) else _ThreadingTCPServer
+        self.server = serverClass(address, _ValidationHandler)
+        self.server.service = self.service
+        self.server.executor = ThreadPoolExecutor(workers, thread_name_prefix="validation")
+        self.address = self.server.server_address
+        self._thread = None
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self):
+        """
+        Serves in a separate thread.
+        """
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.server.executor.shutdown(wait=True)
+        if self._thread is not None:
+            self._thread.join()
+
+
+class ValidationClient():
+    def __init__(self, address=("127.0.0.1", DEFAULT_PORT)):
+        """
+        Initializes the ValidationClient class, connected to a ValidationServer.
+
+        Parameters:
+        - address: (host, port) or the path of a Unix socket.
+        """
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.connect(address)
+        self.reader = self.socket.makefile("rb")
+
+    def pipeline(self, requests: list):
+        """
+        Sends all the requests without waiting for the responses, and returns the responses in the same order.
+        """
+        payload = b"".join((json.dumps(request) + "\n").encode() for request in requests)
+        # Sent from another thread so that the responses are read while large pipelines are still being sent
+        sender = threading.Thread(target=self.socket.sendall, args=(payload,), daemon=True)
+        sender.start()
+        responses = [json.loads(self.reader.readline()) for _ in requests]
+        sender.join()
+        return responses
+
+    def request(self, request: dict):
+        return self.pipeline([request])[0]
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local validation server")
+    parser.add_argument("--unix", help="path of the Unix socket, TCP on localhost if not given")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--warm", nargs="*", default=["analytic"], help="backends created at startup")
+    parser.add_argument("--max-checkers", type=int, default=8, help="checkers kept, one per backend and margin")
+    parser.add_argument("--logs", action="store_true")
+    args = parser.parse_args()
+
+    server = ValidationServer(args.unix or ("127.0.0.1", args.port), args.workers, args.logs, args.warm, args.max_checkers)
+    print(f"Validation server listening on {server.address}")
+    server.serve_forever()
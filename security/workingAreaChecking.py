@@ -1,8 +1,34 @@
+from functools import lru_cache
+
 import numpy as np
-import matplotlib.pyplot as plt
 
 from .forwardKinematics import ForwardKinematic
 
+@lru_cache(maxsize=8)
+def _getHemispherePoints(x0, y0, z0, r, num_points=50):
+    """
+    Returns the points of the lower hemisphere of the sphere's surface drawn by WorkingAreaRobotChecking.draw.
+    """
+    theta = np.linspace(0, 2 * np.pi, num_points)  # Azimuthal angle
+    phi = np.linspace(0, np.pi, num_points)       # Polar angle
+
+    # Create a meshgrid for spherical coordinates
+    theta, phi = np.meshgrid(theta, phi)
+
+    # Convert spherical coordinates to Cartesian coordinates
+    x = x0 + r * np.cos(theta) * np.sin(phi)
+    y = y0 + r * np.sin(theta) * np.sin(phi)
+    z = z0 + r * np.cos(phi)
+
+    # Combine the coordinates into a single array
+    points = np.vstack((x.flatten(), y.flatten(), z.flatten())).T
+
+    # Filter points to only include those in the lower hemisphere (z < 0)
+    points = points[points[:, 2] < 0]
+    points.flags.writeable = False  # Shared by every instance
+    return points
+
+
 class WorkingAreaRobotChecking():
     def __init__(self, x0, y0, z0, r, angles:list, unitTest = False, coordinates = None):
         """
@@ -27,29 +53,8 @@ class WorkingAreaRobotChecking():
         if unitTest:
             self.coordinates = coordinates
 
-        # Generate points on the sphere's surface
-        num_points = 50
-        theta = np.linspace(0, 2 * np.pi, num_points)  # Azimuthal angle
-        phi = np.linspace(0, np.pi, num_points)       # Polar angle
-
-        # Create a meshgrid for spherical coordinates
-        theta, phi = np.meshgrid(theta, phi)
-
-        # Convert spherical coordinates to Cartesian coordinates
-        x = self.x0 + self.r * np.cos(theta) * np.sin(phi)
-        y = self.y0 + self.r * np.sin(theta) * np.sin(phi)
-        z = self.z0 + self.r * np.cos(phi)
-
-        # Flatten the arrays for easier processing
-        x_flat = x.flatten()
-        y_flat = y.flatten()
-        z_flat = z.flatten()
-
-        # Combine the coordinates into a single array
-        points = np.vstack((x_flat, y_flat, z_flat)).T
-
-        # Filter points to only include those in the lower hemisphere (z < 0)
-        self.points_filtered = points[points[:, 2] < 0]
+        # Points of the sphere's surface, computed once for each working area
+        self.points_filtered = _getHemispherePoints(x0, y0, z0, r)
 
     def _isPointInHalfOfSphere(self, randomPoint):
         """
@@ -67,11 +72,20 @@ class WorkingAreaRobotChecking():
         # Check if the point is within the sphere's radius
         return (randomPoint[0] - self.x0)**2 + (randomPoint[1] - self.y0)**2 + (randomPoint[2] - self.z0)**2 <= self.r**2
 
-    def draw(self):
+    def draw(self, path: str = None):
         """
         Visualizes the working area and the robot's joint positions in 3D space.
+
+        Parameters:
+        - path: Save the figure to this image file instead of showing it, works without a display.
         """
-        fig = plt.figure(figsize=(6, 6))
+        if path is not None:
+            # A figure outside pyplot is drawn without a display or a GUI backend
+            from matplotlib.figure import Figure
+            fig = Figure(figsize=(6, 6))
+        else:
+            import matplotlib.pyplot as plt
+            fig = plt.figure(figsize=(6, 6))
         ax = fig.add_subplot(111, projection='3d')
 
         # Extract X, Y, Z from the filtered hemisphere points
@@ -102,6 +116,9 @@ class WorkingAreaRobotChecking():
         ax.set_ylabel("Y-axis")
         ax.set_zlabel("Z-axis")
         ax.set_zlim((0, 1))  # Limit the Z-axis range
+        if path is not None:
+            fig.savefig(path)
+            return path
         plt.show()
 
     def checkPointsInHalfOfSphere(self):
@@ -120,4 +137,21 @@ class WorkingAreaRobotChecking():
         latest_point = self.coordinates[latest_key]   # Get the corresponding point
         
         # Check if the point is within the specified region
-        return {latest_key: self._isPointInHalfOfSphere([latest_point['x'], latest_point['y'], latest_point['z']])}
\ No newline at end of file
+        return {latest_key: self._isPointInHalfOfSphere([latest_point['x'], latest_point['y'], latest_point['z']])}
+
+def isPointsInHalfOfSphere(points, x0, y0, z0, r):
+    """
+    Vectorized version of WorkingAreaRobotChecking._isPointInHalfOfSphere.
+
+    Parameters:
+    - points: Array of shape (N, 3) with the x, y, z coordinates of the points.
+    - x0, y0, z0: Coordinates of the sphere's center.
+    - r: Radius of the sphere.
+
+    Returns:
+    - A boolean array of shape (N,), True where the point is within the upper hemisphere.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 3)
+    center = np.array([x0, y0, z0])
+    inSphere = np.sum((points - center)**2, axis=1) <= r**2
+    return inSphere & (points[:, 2] >= 0)